@@ -11,6 +11,7 @@ from .models import (
     HangarTransaction,
     HangarSnapshot,
     AlertRule,
+    ItemType,
 )
 
 
@@ -20,10 +21,11 @@ class CorporationAdmin(admin.ModelAdmin):
         "corporation_name",
         "corporation_id",
         "tracking_enabled",
+        "pending_delete",
         "last_sync",
         "created_at",
     )
-    list_filter = ("tracking_enabled", "last_sync")
+    list_filter = ("tracking_enabled", "pending_delete", "last_sync")
     search_fields = ("corporation_name", "corporation_id")
     readonly_fields = ("last_sync", "last_update", "created_at")
     actions = ["enable_tracking", "disable_tracking"]
@@ -60,10 +62,17 @@ class LocationAdmin(admin.ModelAdmin):
     readonly_fields = ("last_update",)
 
 
+@admin.register(ItemType)
+class ItemTypeAdmin(admin.ModelAdmin):
+    list_display = ("name", "type_id", "last_update")
+    search_fields = ("name", "type_id")
+    readonly_fields = ("last_update",)
+
+
 @admin.register(HangarItem)
 class HangarItemAdmin(admin.ModelAdmin):
     list_display = (
-        "type_name",
+        "type",
         "quantity",
         "corporation",
         "location",
@@ -73,7 +82,8 @@ class HangarItemAdmin(admin.ModelAdmin):
         "last_seen",
     )
     list_filter = ("corporation", "is_active", "division", "location")
-    search_fields = ("type_name", "item_id")
+    list_select_related = ("type", "corporation", "location", "division")
+    search_fields = ("type__name", "item_id")
     readonly_fields = ("first_seen", "last_seen", "item_id")
     date_hierarchy = "last_seen"
 
@@ -83,7 +93,7 @@ class HangarTransactionAdmin(admin.ModelAdmin):
     list_display = (
         "detected_at",
         "transaction_type",
-        "type_name",
+        "type",
         "quantity_change",
         "character_name",
         "corporation",
@@ -96,8 +106,9 @@ class HangarTransactionAdmin(admin.ModelAdmin):
         "detected_at",
         "notification_sent",
     )
+    list_select_related = ("type", "corporation", "location")
     search_fields = (
-        "type_name",
+        "type__name",
         "character_name",
         "corporation__corporation_name",
     )
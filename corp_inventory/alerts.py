@@ -0,0 +1,228 @@
+"""
+Alert rule matching
+
+Alerts are evaluated during the sync against the transactions it is about to
+write, while they are still in memory; only the matches are handed to the
+notification task, as plain ``alert_payload`` dicts.
+
+Rules are compiled once per evaluation into a ``RuleIndex`` keyed on
+(transaction type, type_id, division_id), where None stands for "any". A
+transaction is then looked up under the eight combinations of its own values
+and None, so it is only compared with rules that can apply to it and the cost
+stays linear in the number of transactions however many rules exist.
+
+Aggregate rules (AGGREGATE_ALERT_TYPES) watch totals rather than single
+transactions. They are checked against the sync's HangarTypeTotal values and
+the deltas that produced them, and fire only on the sync where the condition
+starts to hold.
+"""
+
+import logging
+from collections import defaultdict
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import AlertRule, HangarTransaction
+
+logger = logging.getLogger(__name__)
+
+# Alert type -> the only transaction type it applies to (absent: any type)
+ALERT_TRANSACTION_TYPES = {
+    "ITEM_ADDED": "ADD",
+    "ITEM_REMOVED": "REMOVE",
+}
+
+# Alert types evaluated against per-(type, location, division) totals
+AGGREGATE_ALERT_TYPES = ("QUANTITY_BELOW", "VALUE_DROP")
+
+# (type_id, location pk, division pk) -> [quantity, value]
+TotalsKey = Tuple[int, int, Optional[int]]
+
+
+def rule_matches(rule: AlertRule, transaction: HangarTransaction) -> bool:
+    """
+    Check if a transaction should trigger an alert rule
+
+    Args:
+        rule: AlertRule object
+        transaction: HangarTransaction object
+
+    Returns:
+        True if alert should be triggered
+    """
+    if rule.alert_type in AGGREGATE_ALERT_TYPES:
+        return False
+    transaction_type = ALERT_TRANSACTION_TYPES.get(rule.alert_type)
+    if transaction_type and transaction.transaction_type != transaction_type:
+        return False
+    if rule.type_id and rule.type_id != transaction.type_id:
+        return False
+    if rule.division_id and rule.division_id != transaction.division_id:
+        return False
+    return _passes_thresholds(rule, transaction)
+
+
+def _passes_thresholds(rule: AlertRule, transaction: HangarTransaction) -> bool:
+    if rule.location_id and rule.location_id != transaction.location_id:
+        return False
+    if rule.value_threshold and transaction.estimated_value < rule.value_threshold:
+        return False
+    if rule.quantity_threshold and abs(transaction.quantity_change) < rule.quantity_threshold:
+        return False
+    return True
+
+
+class RuleIndex:
+    """Active alert rules of one corporation, indexed for lookup by transaction."""
+
+    def __init__(self, rules: Iterable[AlertRule]):
+        self._rules = defaultdict(list)
+        self.aggregate_rules = []
+        self.count = 0
+        for rule in rules:
+            if rule.alert_type in AGGREGATE_ALERT_TYPES:
+                self.aggregate_rules.append(rule)
+                continue
+            key = (
+                ALERT_TRANSACTION_TYPES.get(rule.alert_type),
+                rule.type_id or None,
+                rule.division_id or None,
+            )
+            self._rules[key].append(rule)
+            self.count += 1
+
+    def __bool__(self):
+        return self.count > 0 or bool(self.aggregate_rules)
+
+    def rules_for(self, transaction: HangarTransaction) -> List[AlertRule]:
+        """Rules triggered by one transaction."""
+        matched = []
+        # dict.fromkeys drops repeated keys when a field is itself None
+        for key in dict.fromkeys(product(
+            (transaction.transaction_type, None),
+            (transaction.type_id, None),
+            (transaction.division_id, None),
+        )):
+            for rule in self._rules.get(key, ()):
+                if _passes_thresholds(rule, transaction):
+                    matched.append(rule)
+        return matched
+
+    def match(
+        self, transactions: Iterable[HangarTransaction]
+    ) -> List[Tuple[AlertRule, HangarTransaction]]:
+        """Every (rule, transaction) pair that should raise an alert."""
+        return [
+            (rule, transaction)
+            for transaction in transactions
+            for rule in self.rules_for(transaction)
+        ]
+
+
+def compile_rules(corporation_pk: int, rules: Optional[Iterable[AlertRule]] = None) -> RuleIndex:
+    """Build the index from a corporation's active rules."""
+    if rules is None:
+        rules = AlertRule.objects.filter(
+            corporation_id=corporation_pk, is_active=True
+        ).select_related("location", "division")
+    return RuleIndex(rules)
+
+
+def alert_payload(rule: AlertRule, transaction: HangarTransaction) -> dict:
+    """
+    JSON-serializable description of one alert, for the notification task.
+
+    ``transaction`` must be saved, with its location and division loaded.
+    The transaction's primary key is left out: rows from ``bulk_create`` have
+    none on MySQL, so alerts identify the stack by ``item_id``.
+    """
+    return {
+        "rule_id": rule.pk,
+        "transaction_type": transaction.transaction_type,
+        "type_id": transaction.type_id,
+        "item_id": transaction.item_id,
+        "quantity_change": transaction.quantity_change,
+        "old_quantity": transaction.old_quantity,
+        "new_quantity": transaction.new_quantity,
+        "estimated_value": float(transaction.estimated_value),
+        "location_name": transaction.location.location_name if transaction.location else "",
+        "division_name": transaction.division.division_name if transaction.division else "",
+        "detected_at": transaction.detected_at.isoformat() if transaction.detected_at else None,
+    }
+
+
+def _in_scope(rule: AlertRule, key: TotalsKey) -> bool:
+    type_id, location_pk, division_pk = key
+    return (
+        (not rule.type_id or rule.type_id == type_id)
+        and (not rule.location_id or rule.location_id == location_pk)
+        and (not rule.division_id or rule.division_id == division_pk)
+    )
+
+
+def _scope_name(rule: AlertRule) -> str:
+    if rule.type_id:
+        name = rule.type_name or f"Type {rule.type_id}"
+    else:
+        name = "Hangar"
+    if rule.location_id:
+        name += f" at {rule.location.location_name}"
+    if rule.division_id:
+        name += f" / {rule.division.division_name}"
+    return name
+
+
+def evaluate_aggregate_rules(
+    rules: Iterable[AlertRule],
+    totals: Dict[TotalsKey, list],
+    deltas: Dict[TotalsKey, list],
+) -> List[dict]:
+    """
+    Aggregate alerts raised by one sync.
+
+    Args:
+        rules: Active QUANTITY_BELOW / VALUE_DROP rules
+        totals: Corporation's HangarTypeTotal values after the sync
+        deltas: Change of each total during the sync
+
+    Returns:
+        Payload dicts with rule_id and a ready-made summary
+    """
+    alerts = []
+    for rule in rules:
+        quantity = sum(total[0] for key, total in totals.items() if _in_scope(rule, key))
+        value = sum(total[1] for key, total in totals.items() if _in_scope(rule, key))
+        previous_quantity = quantity - sum(
+            delta[0] for key, delta in deltas.items() if _in_scope(rule, key)
+        )
+        previous_value = value - sum(
+            delta[1] for key, delta in deltas.items() if _in_scope(rule, key)
+        )
+
+        summary = None
+        if rule.alert_type == "QUANTITY_BELOW" and rule.quantity_threshold is not None:
+            if quantity < rule.quantity_threshold <= previous_quantity:
+                summary = (
+                    f"{_scope_name(rule)}: {quantity:,} units, below "
+                    f"{rule.quantity_threshold:,} (was {previous_quantity:,})"
+                )
+        elif rule.alert_type == "VALUE_DROP" and rule.percent_threshold is not None:
+            if previous_value > 0:
+                drop = (previous_value - value) * 100 / previous_value
+                if drop >= rule.percent_threshold:
+                    summary = (
+                        f"{_scope_name(rule)}: value {previous_value:,.0f} -> "
+                        f"{value:,.0f} ISK (-{drop:.1f}%)"
+                    )
+        if summary:
+            alerts.append({
+                "rule_id": rule.pk,
+                "transaction_type": rule.alert_type,
+                "type_id": rule.type_id,
+                "quantity": quantity,
+                "previous_quantity": previous_quantity,
+                "value": float(value),
+                "previous_value": float(previous_value),
+                "summary": summary,
+            })
+    return alerts
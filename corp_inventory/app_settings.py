@@ -34,9 +34,77 @@ CORPINVENTORY_ENABLE_NOTIFICATIONS = getattr(
     True,
 )
 
+# Optional webhook (e.g. a Discord channel webhook) that receives one alert
+# digest per corporation sync. None = Alliance Auth notifications only.
+CORPINVENTORY_ALERT_WEBHOOK_URL = getattr(
+    settings,
+    "CORPINVENTORY_ALERT_WEBHOOK_URL",
+    None,
+)
+
+# Maximum alerts delivered per alert rule per hour; further matches are only
+# counted in the digest. 0 = unlimited.
+CORPINVENTORY_ALERT_RATE_LIMIT = getattr(
+    settings,
+    "CORPINVENTORY_ALERT_RATE_LIMIT",
+    100,
+)
+
 # Minimum value (ISK) for transaction alerts
 CORPINVENTORY_ALERT_THRESHOLD = getattr(
     settings,
     "CORPINVENTORY_ALERT_THRESHOLD",
     100000000,  # 100M ISK
 )
+
+# Text search backend for hangar / transaction / container log searches.
+# "auto" picks trigram (PostgreSQL) or fulltext (MySQL/MariaDB) from the
+# database vendor and falls back to plain LIKE elsewhere.
+CORPINVENTORY_SEARCH_BACKEND = getattr(
+    settings,
+    "CORPINVENTORY_SEARCH_BACKEND",
+    "auto",
+)
+
+# Net each sync's transactions per (type, location, division, transaction type)
+# into one row instead of one row per item_id. The source item_ids are kept
+# on the coalesced row.
+CORPINVENTORY_COALESCE_TRANSACTIONS = getattr(
+    settings,
+    "CORPINVENTORY_COALESCE_TRANSACTIONS",
+    False,
+)
+
+# Directory for the cold archive of expired transactions and container logs.
+# When set, cleanup_old_data writes rows older than 90 days to gzip JSON-lines
+# files (one per corporation per month) before deleting them. None = just delete.
+CORPINVENTORY_ARCHIVE_PATH = getattr(
+    settings,
+    "CORPINVENTORY_ARCHIVE_PATH",
+    None,
+)
+
+# Seconds to cache the computed data behind the dashboard, hangar, location and
+# statistics pages. Entries are keyed on each corporation's sync generation, so
+# a finished sync invalidates them immediately. 0 disables the cache.
+CORPINVENTORY_VIEW_CACHE_TIMEOUT = getattr(
+    settings,
+    "CORPINVENTORY_VIEW_CACHE_TIMEOUT",
+    3600,
+)
+
+# Container log events are matched to the transactions of a sync detected at
+# most this many minutes after them (ESI caches assets for up to an hour).
+CORPINVENTORY_ATTRIBUTION_WINDOW = getattr(
+    settings,
+    "CORPINVENTORY_ATTRIBUTION_WINDOW",
+    90,
+)
+
+# Hours of transactions re-checked for attribution after each sync, so events
+# that reach the container logs late are still picked up.
+CORPINVENTORY_ATTRIBUTION_LOOKBACK_HOURS = getattr(
+    settings,
+    "CORPINVENTORY_ATTRIBUTION_LOOKBACK_HOURS",
+    24,
+)
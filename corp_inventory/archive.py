@@ -0,0 +1,233 @@
+"""
+Cold archive for expired HangarTransaction and ContainerLog rows
+
+Before cleanup_old_data deletes rows past the retention window, they are
+appended to gzip-compressed JSON-lines files, one partition per corporation
+per month:
+
+    <CORPINVENTORY_ARCHIVE_PATH>/<kind>/corporation_<id>/<YYYY-MM>.jsonl.gz
+
+Each batch is appended as its own gzip member, which gzip readers treat as
+one continuous stream. A batch is only deleted from the database after it
+has been written and the file closed, so a crash can at worst archive a
+batch twice — readers de-duplicate on the row ``id``.
+"""
+
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, Optional
+
+from django.utils.dateparse import parse_datetime
+
+from . import app_settings
+from .models import ContainerLog, HangarTransaction
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 5000
+
+# kind -> (model, timestamp field, archived columns)
+ARCHIVE_KINDS = {
+    "transactions": (
+        HangarTransaction,
+        "detected_at",
+        (
+            "id",
+            "corporation__corporation_id",
+            "transaction_type",
+            "type_id",
+            "type__name",
+            "quantity_change",
+            "old_quantity",
+            "new_quantity",
+            "location__location_id",
+            "location__location_name",
+            "from_location__location_id",
+            "division__division_id",
+            "division__division_name",
+            "estimated_value",
+            "character_id",
+            "character_name",
+            "item_id",
+            "item_ids",
+            "detected_at",
+        ),
+    ),
+    "container_logs": (
+        ContainerLog,
+        "logged_at",
+        (
+            "id",
+            "corporation__corporation_id",
+            "character_id",
+            "character_name",
+            "action",
+            "type_id",
+            "type__name",
+            "quantity",
+            "container_id",
+            "container_type_id",
+            "container_type__name",
+            "location_id",
+            "location_flag",
+            "logged_at",
+        ),
+    ),
+}
+
+# Archived column name for each lookup that spans a relation
+_RENAMED = {
+    "corporation__corporation_id": "corporation_id",
+    "type__name": "type_name",
+    "location__location_id": "location_id",
+    "location__location_name": "location_name",
+    "division__division_id": "division",
+    "division__division_name": "division_name",
+    "container_type__name": "container_type_name",
+}
+
+
+def archive_enabled() -> bool:
+    return bool(app_settings.CORPINVENTORY_ARCHIVE_PATH)
+
+
+def partition_path(kind: str, corporation_id: int, month: date) -> str:
+    """Return the archive file for one corporation and month."""
+    return os.path.join(
+        app_settings.CORPINVENTORY_ARCHIVE_PATH,
+        kind,
+        f"corporation_{corporation_id}",
+        f"{month:%Y-%m}.jsonl.gz",
+    )
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def archive_and_delete(kind: str, corporation, cutoff: datetime) -> int:
+    """
+    Archive and then delete a corporation's rows older than ``cutoff``.
+
+    Args:
+        kind: "transactions" or "container_logs"
+        corporation: Corporation object
+        cutoff: Rows with a timestamp before this are archived
+
+    Returns:
+        Number of rows archived and deleted
+    """
+    model, time_field, columns = ARCHIVE_KINDS[kind]
+    expired = model.objects.filter(
+        corporation=corporation, **{f"{time_field}__lt": cutoff}
+    ).order_by("id")
+
+    total = 0
+    while True:
+        rows = list(expired.values(*columns)[:ARCHIVE_BATCH_SIZE])
+        if not rows:
+            break
+
+        partitions = defaultdict(list)
+        for row in rows:
+            record = {_RENAMED.get(key, key): value for key, value in row.items()}
+            month = record[time_field].date().replace(day=1)
+            partitions[month].append(record)
+
+        for month, records in partitions.items():
+            path = partition_path(kind, corporation.corporation_id, month)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=_json_default))
+                    f.write("\n")
+
+        model.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        total += len(rows)
+
+    if total:
+        logger.info(
+            f"Archived {total} {kind} row(s) for {corporation.corporation_name} "
+            f"to {app_settings.CORPINVENTORY_ARCHIVE_PATH}"
+        )
+    return total
+
+
+def _month_in_range(filename: str, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    try:
+        month = datetime.strptime(filename[:7], "%Y-%m").date()
+    except ValueError:
+        return False
+    if since and month < since.date().replace(day=1):
+        return False
+    if until and month > until.date():
+        return False
+    return True
+
+
+def iter_archive(
+    kind: str,
+    corporation_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    filters: Optional[Dict] = None,
+) -> Iterator[dict]:
+    """
+    Scan archived rows, oldest partition first.
+
+    Only partitions overlapping the requested corporation and time range are
+    opened. Rows are streamed, so memory use does not grow with archive size
+    (apart from the ids used to drop duplicates).
+
+    Args:
+        kind: "transactions" or "container_logs"
+        corporation_id: EVE corporation ID, or None for all corporations
+        since: Only rows at or after this time
+        until: Only rows before this time
+        filters: Exact-match column filters, e.g. {"type_id": 34}
+
+    Yields:
+        Archived rows as dicts (timestamps as ISO strings)
+    """
+    _, time_field, _ = ARCHIVE_KINDS[kind]
+    root = os.path.join(app_settings.CORPINVENTORY_ARCHIVE_PATH, kind)
+    if not os.path.isdir(root):
+        return
+
+    if corporation_id is not None:
+        corp_dirs = [f"corporation_{corporation_id}"]
+    else:
+        corp_dirs = sorted(os.listdir(root))
+
+    filters = filters or {}
+    for corp_dir in corp_dirs:
+        corp_path = os.path.join(root, corp_dir)
+        if not os.path.isdir(corp_path):
+            continue
+        seen_ids = set()
+        for filename in sorted(os.listdir(corp_path)):
+            if not filename.endswith(".jsonl.gz") or not _month_in_range(filename, since, until):
+                continue
+            with gzip.open(os.path.join(corp_path, filename), "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["id"] in seen_ids:
+                        continue
+                    seen_ids.add(record["id"])
+                    timestamp = parse_datetime(record[time_field])
+                    if since and timestamp < since:
+                        continue
+                    if until and timestamp >= until:
+                        continue
+                    if any(record.get(key) != value for key, value in filters.items()):
+                        continue
+                    yield record
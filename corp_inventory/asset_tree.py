@@ -0,0 +1,117 @@
+"""
+Corporation hangar asset tree
+
+ESI returns assets as a flat list where ``location_id`` is either a place or
+the item_id of the item holding it (office, ship, container). The hangar
+tree is every item in a corporation hangar division (``CorpSAG*`` flag) plus
+everything nested inside those items, at any depth.
+
+Each tracked item gets its parent item_id, its depth (0 for items lying
+directly in a hangar division) and nested-set bounds ``lft`` / ``rgt``. Every
+top-level item is its own tree, identified by ``tree_id`` (the top-level
+item's item_id) and numbered from 1, so a change inside one container only
+renumbers that container's tree and the sync rewrites few rows. Within a
+tree, the contents of an item are exactly the items with
+``item.lft < lft < item.rgt``, and its containers those with
+``lft < item.lft`` and ``rgt > item.rgt``, so container browsing never needs
+a recursive query. Subtree quantity and value rollups are computed from the
+same preorder at sync time.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+HANGAR_FLAG_PREFIX = "CorpSAG"
+
+_EXIT = object()
+
+
+def build_asset_tree(assets: List[dict]) -> List[dict]:
+    """
+    Hangar assets in preorder, with their tree position.
+
+    Args:
+        assets: Full ESI asset list of a corporation
+
+    Returns:
+        One dict per tracked asset: ``asset``, ``item_id``, ``parent_item_id``
+        (None at depth 0), ``depth``, ``tree_id``, ``lft``, ``rgt`` and
+        ``hangar_flag`` (the CorpSAG flag of the top-level ancestor, which
+        gives the division)
+    """
+    children = defaultdict(list)
+    roots = []
+    for asset in assets:
+        if asset.get("location_flag", "").startswith(HANGAR_FLAG_PREFIX):
+            roots.append(asset)
+        else:
+            children[int(asset["location_id"])].append(asset)
+
+    nodes = []
+    visited = set()
+    for root in sorted(roots, key=lambda asset: int(asset["item_id"])):
+        tree_id = int(root["item_id"])
+        counter = 1
+        stack = [(root, None, 0, root["location_flag"])]
+        while stack:
+            entry = stack.pop()
+            if entry[0] is _EXIT:
+                entry[1]["rgt"] = counter
+                counter += 1
+                continue
+            asset, parent_item_id, depth, hangar_flag = entry
+            item_id = int(asset["item_id"])
+            if item_id in visited:
+                logger.warning(f"Asset {item_id} reached twice while building the asset tree")
+                continue
+            visited.add(item_id)
+            node = {
+                "asset": asset,
+                "item_id": item_id,
+                "parent_item_id": parent_item_id,
+                "depth": depth,
+                "tree_id": tree_id,
+                "lft": counter,
+                "rgt": None,
+                "hangar_flag": hangar_flag,
+            }
+            counter += 1
+            nodes.append(node)
+            stack.append((_EXIT, node))
+            for child in sorted(
+                children.get(item_id, ()),
+                key=lambda asset: int(asset["item_id"]),
+                reverse=True,
+            ):
+                stack.append((child, item_id, depth + 1, hangar_flag))
+    return nodes
+
+
+def subtree_totals(nodes: List[dict], own: Dict[int, tuple]) -> Dict[int, list]:
+    """
+    Quantity and value of each item including everything inside it.
+
+    Args:
+        nodes: build_asset_tree output
+        own: item_id -> (quantity, value) of the item itself; items missing
+            here (skipped by the sync) count as empty
+
+    Returns:
+        item_id -> [subtree quantity, subtree value]
+    """
+    totals = {}
+    # Reversed preorder visits every item after all of its contents
+    for node in reversed(nodes):
+        total = totals.setdefault(node["item_id"], [0, Decimal(0)])
+        quantity, value = own.get(node["item_id"], (0, Decimal(0)))
+        total[0] += quantity
+        total[1] += value
+        if node["parent_item_id"] is not None:
+            parent = totals.setdefault(node["parent_item_id"], [0, Decimal(0)])
+            parent[0] += total[0]
+            parent[1] += total[1]
+    return totals
@@ -0,0 +1,157 @@
+"""
+Character attribution of hangar transactions
+
+The asset diff knows what changed but not who changed it. Container logs know
+who added or took what, and when. After each sync the two are joined on
+(direction, type_id, quantity) and time: a transaction is attributed to a
+log event of the same key logged at most CORPINVENTORY_ATTRIBUTION_WINDOW
+minutes before it was detected.
+
+The join is a sort-merge: both sides are sorted by (key, time) and walked
+once in step, so the cost is O(n log n) for the sorts plus one linear pass,
+however many events share a type. Each log event is used for at most one
+transaction.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import List, Optional, Tuple
+
+from django.utils import timezone
+
+from . import app_settings
+from .models import ContainerLog, Corporation, HangarTransaction
+
+logger = logging.getLogger(__name__)
+
+# Container log action -> direction of the quantity change it explains
+ACTION_DIRECTIONS = {
+    "add": 1,
+    "take": -1,
+}
+
+ATTRIBUTED_TRANSACTION_TYPES = ("ADD", "REMOVE", "CHANGE")
+
+UPDATE_BATCH_SIZE = 1000
+
+
+def _transaction_key(transaction: HangarTransaction) -> Tuple[int, int, int]:
+    direction = 1 if transaction.quantity_change > 0 else -1
+    return (direction, transaction.type_id, abs(transaction.quantity_change))
+
+
+def _log_key(log: dict) -> Tuple[int, int, int]:
+    return (ACTION_DIRECTIONS[log["action"]], log["type_id"], log["quantity"])
+
+
+def merge_attributions(
+    transactions: List[HangarTransaction],
+    logs: List[dict],
+    window: timedelta,
+) -> List[Tuple[HangarTransaction, dict]]:
+    """
+    Pair transactions with the container log events that explain them.
+
+    Args:
+        transactions: Transactions with type_id, quantity_change and detected_at
+        logs: Log event dicts with action, type_id, quantity and logged_at
+        window: Longest time between an event and the sync that detected it
+
+    Returns:
+        List of (transaction, log event) pairs
+    """
+    transactions = sorted(
+        transactions, key=lambda t: (_transaction_key(t), t.detected_at, t.pk)
+    )
+    logs = sorted(logs, key=lambda log: (_log_key(log), log["logged_at"]))
+
+    pairs = []
+    position = 0
+    for key, group in groupby(transactions, key=_transaction_key):
+        # Skip the events of keys no transaction has
+        while position < len(logs) and _log_key(logs[position]) < key:
+            position += 1
+        for transaction in group:
+            earliest = transaction.detected_at - window
+            # Events too old for this transaction are too old for the later
+            # ones as well; leave them behind
+            while (
+                position < len(logs)
+                and _log_key(logs[position]) == key
+                and logs[position]["logged_at"] < earliest
+            ):
+                position += 1
+            if (
+                position < len(logs)
+                and _log_key(logs[position]) == key
+                and logs[position]["logged_at"] <= transaction.detected_at
+            ):
+                pairs.append((transaction, logs[position]))
+                position += 1
+    return pairs
+
+
+def attribute_transactions(corporation: Corporation, since: Optional[datetime] = None) -> int:
+    """
+    Fill character_id / character_name of a corporation's recent transactions
+    from its container logs.
+
+    Transactions that already have a character keep it, but still take part
+    in the join so the events explaining them are not handed to another one.
+
+    Args:
+        corporation: Corporation to attribute
+        since: Oldest transaction considered (default: the lookback setting)
+
+    Returns:
+        Number of transactions attributed
+    """
+    window = timedelta(minutes=app_settings.CORPINVENTORY_ATTRIBUTION_WINDOW)
+    if since is None:
+        since = timezone.now() - timedelta(
+            hours=app_settings.CORPINVENTORY_ATTRIBUTION_LOOKBACK_HOURS
+        )
+
+    transactions = list(
+        HangarTransaction.objects.filter(
+            corporation=corporation,
+            transaction_type__in=ATTRIBUTED_TRANSACTION_TYPES,
+            detected_at__gte=since,
+        )
+        .exclude(quantity_change=0)
+        .only("pk", "type_id", "quantity_change", "detected_at", "character_id")
+    )
+    if not any(t.character_id is None for t in transactions):
+        return 0
+
+    # Both range scans are served by the (corporation, -time) indexes
+    logs = list(
+        ContainerLog.objects.filter(
+            corporation=corporation,
+            action__in=ACTION_DIRECTIONS,
+            type__isnull=False,
+            quantity__gt=0,
+            logged_at__gte=since - window,
+        )
+        .values("action", "type_id", "quantity", "logged_at", "character_id", "character_name")
+    )
+    if not logs:
+        return 0
+
+    attributed = []
+    for transaction, log in merge_attributions(transactions, logs, window):
+        if transaction.character_id is not None:
+            continue
+        transaction.character_id = log["character_id"]
+        transaction.character_name = log["character_name"]
+        attributed.append(transaction)
+
+    HangarTransaction.objects.bulk_update(
+        attributed, ["character_id", "character_name"], batch_size=UPDATE_BATCH_SIZE
+    )
+    logger.info(
+        f"Attributed {len(attributed)} transaction(s) for {corporation.corporation_name} "
+        f"from {len(logs)} container log event(s)"
+    )
+    return len(attributed)
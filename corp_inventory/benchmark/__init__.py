@@ -0,0 +1,4 @@
+"""
+Synthetic data and benchmarks for the sync pipeline (see the benchmark_sync
+management command)
+"""
@@ -0,0 +1,199 @@
+"""
+Synthetic corporation asset payloads
+
+Produces ESI-shaped asset lists with the structure of a real corporation:
+an office per station, items in the seven CorpSAG hangar divisions,
+containers and ships nested inside each other, and container log events.
+Output is deterministic for a given seed, so benchmark runs are comparable.
+"""
+
+import random
+from datetime import timedelta
+from typing import Dict, List
+
+from django.utils import timezone
+
+OFFICE_TYPE_ID = 27
+CONTAINER_TYPE_IDS = (3465, 11488, 17366)  # secure containers, station container
+SHIP_TYPE_IDS = (587, 24698, 28659)
+CONTAINER_FLAGS = ("Locked", "Unlocked")
+SHIP_FLAGS = ("Cargo", "HiSlot0", "MedSlot0", "LoSlot0", "DroneBay")
+
+# Goods are synthetic types well above real type IDs
+FIRST_GOODS_TYPE_ID = 900000
+FIRST_STATION_ID = 60000000
+FIRST_ITEM_ID = 1030000000000
+
+
+class AssetGenerator:
+    """
+    Deterministic generator of corporation asset payloads.
+
+    Args:
+        seed: Random seed
+        stations: Stations with a corporation office
+        goods_types: Distinct item types held
+        container_share: Share of items that are containers or ships
+        nested_share: Share of items placed inside a container or ship
+        max_depth: Deepest nesting (0 = items lie in a hangar division)
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        stations: int = 5,
+        goods_types: int = 2000,
+        container_share: float = 0.03,
+        nested_share: float = 0.4,
+        max_depth: int = 3,
+    ):
+        self.random = random.Random(seed)
+        self.station_ids = [FIRST_STATION_ID + number * 7 for number in range(stations)]
+        self.goods_type_ids = [FIRST_GOODS_TYPE_ID + number for number in range(goods_types)]
+        self.container_share = container_share
+        self.nested_share = nested_share
+        self.max_depth = max_depth
+        self._next_item_id = FIRST_ITEM_ID
+
+    @property
+    def type_ids(self) -> List[int]:
+        """Every type ID the payloads can contain."""
+        return [OFFICE_TYPE_ID, *CONTAINER_TYPE_IDS, *SHIP_TYPE_IDS, *self.goods_type_ids]
+
+    def type_names(self) -> Dict[int, str]:
+        names = {OFFICE_TYPE_ID: "Office Folder"}
+        names.update({type_id: f"Benchmark Container {type_id}" for type_id in CONTAINER_TYPE_IDS})
+        names.update({type_id: f"Benchmark Ship {type_id}" for type_id in SHIP_TYPE_IDS})
+        names.update({type_id: f"Benchmark Item {type_id}" for type_id in self.goods_type_ids})
+        return names
+
+    def prices(self) -> Dict[int, float]:
+        """Market prices for every type, as PriceManager.get_market_prices returns."""
+        prices = {type_id: self.random.uniform(1, 50000) for type_id in self.goods_type_ids}
+        prices.update({type_id: 1000000.0 for type_id in CONTAINER_TYPE_IDS})
+        prices.update({type_id: 25000000.0 for type_id in SHIP_TYPE_IDS})
+        return prices
+
+    def _item_id(self) -> int:
+        self._next_item_id += 1
+        return self._next_item_id
+
+    def assets(self, item_count: int) -> List[dict]:
+        """
+        A full asset list with ``item_count`` hangar items (offices not counted).
+        """
+        assets = []
+        offices = []
+        for station_id in self.station_ids:
+            office_id = self._item_id()
+            offices.append(office_id)
+            assets.append({
+                "item_id": office_id, "type_id": OFFICE_TYPE_ID, "quantity": 1,
+                "location_id": station_id, "location_flag": "OfficeFolder",
+                "location_type": "station", "is_singleton": True,
+            })
+
+        # (item_id, depth, is_ship) of every container and ship so far
+        holders = []
+        for _ in range(item_count):
+            assets.append(self._new_item(offices, holders))
+        return assets
+
+    def _new_item(self, offices: List[int], holders: List[tuple]) -> dict:
+        rnd = self.random
+        parent = None
+        if holders and rnd.random() < self.nested_share:
+            parent = rnd.choice(holders)
+        depth = parent[1] + 1 if parent else 0
+
+        if rnd.random() < self.container_share and depth < self.max_depth:
+            is_ship = rnd.random() < 0.3
+            type_id = rnd.choice(SHIP_TYPE_IDS if is_ship else CONTAINER_TYPE_IDS)
+            quantity = 1
+            singleton = True
+        else:
+            is_ship = None
+            type_id = rnd.choice(self.goods_type_ids)
+            quantity = int(rnd.paretovariate(1.2) * 10)
+            singleton = False
+
+        if parent:
+            location_id = parent[0]
+            location_flag = rnd.choice(SHIP_FLAGS if parent[2] else CONTAINER_FLAGS)
+        else:
+            location_id = rnd.choice(offices)
+            location_flag = f"CorpSAG{rnd.randint(1, 7)}"
+
+        item_id = self._item_id()
+        if is_ship is not None:
+            holders.append((item_id, depth, is_ship))
+        return {
+            "item_id": item_id, "type_id": type_id, "quantity": quantity,
+            "location_id": location_id, "location_flag": location_flag,
+            "location_type": "item", "is_singleton": singleton,
+        }
+
+    def churn(self, assets: List[dict], rate: float) -> List[dict]:
+        """
+        The asset list of a later sync, with about ``rate`` of the items changed.
+
+        Changes are split between quantity changes, removals of loose items,
+        new items and moves between hangar divisions. ``assets`` is not
+        modified.
+        """
+        rnd = self.random
+        assets = list(assets)
+        offices = [a["item_id"] for a in assets if a["location_flag"] == "OfficeFolder"]
+        holder_ids = {a["item_id"] for a in assets if a["is_singleton"]}
+        holders = [
+            (a["item_id"], 1, a["type_id"] in SHIP_TYPE_IDS)
+            for a in assets
+            if a["is_singleton"] and a["type_id"] != OFFICE_TYPE_ID
+        ]
+        changes = int((len(assets) - len(offices)) * rate)
+
+        removed = set()
+        for _ in range(changes):
+            roll = rnd.random()
+            if roll < 0.25:
+                assets.append(self._new_item(offices, holders))
+                continue
+            position = rnd.randrange(len(offices), len(assets))
+            asset = assets[position]
+            if asset["item_id"] in holder_ids or asset["item_id"] in removed:
+                continue
+            if roll < 0.65:
+                assets[position] = dict(
+                    asset, quantity=max(asset["quantity"] + rnd.randint(-10, 10) * 10, 1)
+                )
+            elif roll < 0.9:
+                removed.add(asset["item_id"])
+            elif asset["location_flag"].startswith("CorpSAG"):
+                assets[position] = dict(asset, location_flag=f"CorpSAG{rnd.randint(1, 7)}")
+        return [a for a in assets if a["item_id"] not in removed]
+
+    def container_logs(self, assets: List[dict], count: int, characters: int = 50) -> List[dict]:
+        """
+        ``count`` container log events of the last hour, ESI-shaped, for
+        items of ``assets``.
+        """
+        rnd = self.random
+        now = timezone.now()
+        loose = [a for a in assets if not a["is_singleton"]]
+        containers = [a for a in assets if a["type_id"] in CONTAINER_TYPE_IDS]
+        logs = []
+        for _ in range(count):
+            item = rnd.choice(loose)
+            container = rnd.choice(containers) if containers else item
+            logs.append({
+                "character_id": 2100000000 + rnd.randrange(characters),
+                "action": rnd.choice(("add", "take")),
+                "type_id": item["type_id"],
+                "quantity": item["quantity"],
+                "container_id": container["item_id"],
+                "container_type_id": container["type_id"],
+                "location_id": rnd.choice(self.station_ids),
+                "location_flag": f"CorpSAG{rnd.randint(1, 7)}",
+                "logged_at": now - timedelta(seconds=rnd.randrange(3600)),
+            })
+        return logs
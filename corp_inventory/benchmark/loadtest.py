@@ -0,0 +1,128 @@
+"""
+View load test
+
+Requests each page, and the data endpoints its JavaScript calls, with the
+Django test client as a logged-in user. For each target it reports the
+first (cold) request separately, then latency percentiles and query counts
+over the repeated requests that follow. Meant to run against a database
+seeded with ``seed_large_db``.
+"""
+
+import math
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import app_settings
+from ..models import Corporation, HangarItem
+
+# (name, URL name, argument kinds, query string)
+TARGETS = (
+    ("index", "corp_inventory:index", (), ""),
+    ("corporation_hangar", "corp_inventory:corporation_hangar", ("corporation",), ""),
+    ("hangar_datatable", "corp_inventory:api_hangar_datatable", ("corporation",),
+     "draw=1&start=0&length=50"),
+    ("transaction_log", "corp_inventory:corporation_transactions", ("corporation",), ""),
+    ("transaction_log.all_90d", "corp_inventory:transactions", (), "days=90"),
+    ("statistics", "corp_inventory:statistics", ("corporation",), ""),
+    ("statistics.transactions", "corp_inventory:api_statistics_transactions", ("corporation",), ""),
+    ("statistics.value", "corp_inventory:api_statistics_value", ("corporation",), ""),
+    ("location_view", "corp_inventory:location", ("location",), ""),
+    ("location_items", "corp_inventory:location_items", ("location", "corporation"), ""),
+    ("container_logs", "corp_inventory:container_logs", ("corporation",), ""),
+)
+
+
+def build_targets(corporation: Corporation, names: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    (name, URL) of each target, for one corporation and its busiest location.
+    """
+    location_id = (
+        HangarItem.objects.filter(corporation=corporation, is_active=True)
+        .values("location__location_id")
+        .annotate(items=Count("id"))
+        .order_by("-items", "location__location_id")
+        .values_list("location__location_id", flat=True)
+        .first()
+    )
+    args = {"corporation": corporation.corporation_id, "location": location_id}
+    targets = []
+    for name, url_name, kinds, query in TARGETS:
+        if names and name not in names:
+            continue
+        if "location" in kinds and location_id is None:
+            continue
+        url = reverse(url_name, args=[args[kind] for kind in kinds])
+        targets.append((name, f"{url}?{query}" if query else url))
+    return targets
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+@contextmanager
+def view_cache_disabled():
+    """Compute every page instead of serving it from the view cache."""
+    timeout = app_settings.CORPINVENTORY_VIEW_CACHE_TIMEOUT
+    app_settings.CORPINVENTORY_VIEW_CACHE_TIMEOUT = 0
+    try:
+        yield
+    finally:
+        app_settings.CORPINVENTORY_VIEW_CACHE_TIMEOUT = timeout
+
+
+def run_load_test(
+    user,
+    targets: List[Tuple[str, str]],
+    requests: int = 20,
+    host: str = "testserver",
+    secure: bool = False,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, dict]:
+    """
+    Request every target ``requests`` + 1 times.
+
+    Returns:
+        name -> dict with url, status, cold_ms, p50_ms, p95_ms, p99_ms,
+        queries (median) and max_queries
+    """
+    client = Client(SERVER_NAME=host)
+    client.force_login(user)
+    results = {}
+    for name, url in targets:
+        if progress:
+            progress(f"{name}: {url}")
+        timings = []
+        query_counts = []
+        status = None
+        for _ in range(requests + 1):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url, secure=secure)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(captured))
+            status = response.status_code
+        cold_ms, warm = timings[0], timings[1:] or timings
+        results[name] = {
+            "url": url,
+            "status": status,
+            "cold_ms": round(cold_ms, 1),
+            "cold_queries": query_counts[0],
+            "p50_ms": round(percentile(warm, 50), 1),
+            "p95_ms": round(percentile(warm, 95), 1),
+            "p99_ms": round(percentile(warm, 99), 1),
+            "queries": int(statistics.median(query_counts[1:] or query_counts)),
+            "max_queries": max(query_counts),
+        }
+    return results
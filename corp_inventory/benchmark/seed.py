@@ -0,0 +1,331 @@
+"""
+Large database seeding for load tests
+
+Fills the database with tracked corporations holding ``items`` hangar items,
+``transactions`` transactions spread over the last 90 days, container logs and
+daily snapshots, shaped like the rows a sync writes. Rows are generated as a
+stream and written without the ORM: with COPY on PostgreSQL and with
+``executemany`` on other databases, in batches, so tens of millions of rows
+fit in constant memory.
+
+Seeded corporations use IDs from LOADTEST_CORPORATION_ID upwards and are
+removed again by ``flush_seeded``.
+"""
+
+import io
+import json
+import logging
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Dict, Iterable, Optional
+
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from ..caching import bump_generation
+from ..models import (
+    ContainerLog,
+    Corporation,
+    HangarDivision,
+    HangarItem,
+    HangarSnapshot,
+    HangarTransaction,
+    HangarTypeTotal,
+    ItemType,
+    Location,
+)
+from ..tasks import delete_corporation_data
+from ..type_index import rebuild_type_index
+from .generator import CONTAINER_TYPE_IDS, AssetGenerator
+
+logger = logging.getLogger(__name__)
+
+LOADTEST_CORPORATION_ID = 1900000000
+LOADTEST_CORPORATION_COUNT_MAX = 1000
+FIRST_SEEDED_ITEM_ID = 1040000000000
+
+HISTORY_DAYS = 90
+CENT = Decimal("0.01")
+
+
+def seeded_corporations():
+    return Corporation.objects.filter(
+        corporation_id__gte=LOADTEST_CORPORATION_ID,
+        corporation_id__lt=LOADTEST_CORPORATION_ID + LOADTEST_CORPORATION_COUNT_MAX,
+    )
+
+
+def flush_seeded() -> int:
+    """Delete every seeded corporation with all its data."""
+    pks = list(seeded_corporations().values_list("pk", flat=True))
+    seeded_corporations().update(pending_delete=True, tracking_enabled=False)
+    for pk in pks:
+        delete_corporation_data(pk)
+    return len(pks)
+
+
+def insert_rows(model, rows: Iterable[dict], batch_size: int = 50000) -> int:
+    """
+    Insert rows of ``model`` given as dicts of attname -> value.
+
+    Fields missing from a row get their default; auto_now fields get the
+    current time. The primary key is left to the database unless it is a
+    model field the rows provide (like ItemType.type_id).
+
+    Returns:
+        Number of rows inserted
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field, models.AutoField)
+    ]
+    now = timezone.now()
+    defaults = {}
+    for field in fields:
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            defaults[field.attname] = now
+        else:
+            # The declared default, or "" / None like an unsaved model instance
+            defaults[field.attname] = field.get_default()
+
+    rows = iter(rows)
+    inserted = 0
+    while True:
+        batch = [
+            [row.get(field.attname, defaults[field.attname]) for field in fields]
+            for row in islice(rows, batch_size)
+        ]
+        if not batch:
+            return inserted
+        if connection.vendor == "postgresql":
+            _copy(model, fields, batch)
+        else:
+            _executemany(model, fields, batch)
+        inserted += len(batch)
+
+
+def _copy(model, fields, batch):
+    buffer = io.StringIO()
+    for row in batch:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _copy_value(value) -> str:
+    """One value in PostgreSQL COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _executemany(model, fields, batch):
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} "
+        f"({columns}) VALUES ({placeholders})"
+    )
+    params = [
+        [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+        for row in batch
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def seed_database(
+    corporations: int = 5,
+    items: int = 500000,
+    transactions: int = 10000000,
+    container_logs: int = 1000000,
+    seed: int = 0,
+    batch_size: int = 50000,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, int]:
+    """
+    Seed load-test corporations. Totals are split evenly between them.
+
+    Returns:
+        Rows inserted per model
+    """
+    rnd = random.Random(seed)
+    generator = AssetGenerator(seed=seed, stations=20)
+    prices = generator.prices()
+    now = timezone.now()
+    say = progress or (lambda message: None)
+    counts = {}
+
+    with transaction.atomic():
+        ItemType.objects.bulk_create(
+            [ItemType(type_id=type_id, name=name) for type_id, name in generator.type_names().items()],
+            ignore_conflicts=True,
+        )
+        Location.objects.bulk_create(
+            [
+                Location(location_id=station_id, location_name=f"Load Test Station {station_id}",
+                         location_type="station", solar_system_name="Load Test")
+                for station_id in generator.station_ids
+            ],
+            ignore_conflicts=True,
+        )
+        location_pks = list(
+            Location.objects.filter(location_id__in=generator.station_ids).values_list("pk", flat=True)
+        )
+
+        last = seeded_corporations().aggregate(last=Max("corporation_id"))["last"]
+        start = last - LOADTEST_CORPORATION_ID + 1 if last else 0
+        corps = Corporation.objects.bulk_create([
+            Corporation(
+                corporation_id=LOADTEST_CORPORATION_ID + start + number,
+                corporation_name=f"Load Test Corp {start + number + 1}",
+                last_sync=now,
+            )
+            for number in range(corporations)
+        ])
+        # bulk_create only returns primary keys on some databases
+        corps = list(seeded_corporations().filter(
+            corporation_id__in=[corp.corporation_id for corp in corps]
+        ))
+        HangarDivision.objects.bulk_create([
+            HangarDivision(corporation=corp, division_id=number, division_name=f"Division {number}")
+            for corp in corps
+            for number in range(1, 8)
+        ])
+        divisions = defaultdict(list)
+        for division in HangarDivision.objects.filter(corporation__in=corps):
+            divisions[division.corporation_id].append(division.pk)
+
+    # (corporation pk) -> [(item_id, type_id, location pk, division pk, quantity)]
+    held = defaultdict(list)
+    next_item_id = max(
+        HangarItem.objects.aggregate(last=Max("item_id"))["last"] or 0, FIRST_SEEDED_ITEM_ID
+    )
+
+    def item_rows():
+        nonlocal next_item_id
+        for number in range(items):
+            corp = corps[number % len(corps)]
+            type_id = rnd.choice(generator.goods_type_ids)
+            quantity = int(rnd.paretovariate(1.2) * 10)
+            location_pk = rnd.choice(location_pks)
+            division_pk = rnd.choice(divisions[corp.pk])
+            next_item_id += 1
+            value = (Decimal(str(prices[type_id])) * quantity).quantize(CENT)
+            is_active = rnd.random() < 0.95
+            if is_active:
+                held[corp.pk].append((next_item_id, type_id, location_pk, division_pk, quantity))
+            yield {
+                "corporation_id": corp.pk, "item_id": next_item_id, "type_id": type_id,
+                "location_id": location_pk, "division_id": division_pk,
+                "quantity": quantity, "estimated_value": value, "is_active": is_active,
+                "location_flag": f"CorpSAG{rnd.randint(1, 7)}",
+                "tree_id": next_item_id, "lft": 1, "rgt": 2,
+                "subtree_quantity": quantity, "subtree_value": value,
+            }
+
+    say(f"Inserting {items:,} hangar items")
+    counts["items"] = insert_rows(HangarItem, item_rows(), batch_size)
+
+    totals = defaultdict(lambda: [0, Decimal(0)])
+    for corp_pk, stacks in held.items():
+        for _, type_id, location_pk, division_pk, quantity in stacks:
+            total = totals[(corp_pk, type_id, location_pk, division_pk)]
+            total[0] += quantity
+            total[1] += (Decimal(str(prices[type_id])) * quantity).quantize(CENT)
+    say(f"Inserting {len(totals):,} type totals")
+    counts["type_totals"] = insert_rows(HangarTypeTotal, (
+        {"corporation_id": corp_pk, "type_id": type_id, "location_id": location_pk,
+         "division_id": division_pk, "quantity": quantity, "value": value}
+        for (corp_pk, type_id, location_pk, division_pk), (quantity, value) in totals.items()
+    ), batch_size)
+
+    def transaction_rows():
+        span = HISTORY_DAYS * 86400
+        for number in range(transactions):
+            corp = corps[number % len(corps)]
+            if not held[corp.pk]:
+                continue
+            item_id, type_id, location_pk, division_pk, quantity = rnd.choice(held[corp.pk])
+            kind = rnd.choices(("ADD", "REMOVE", "CHANGE", "MOVE"), (4, 3, 2, 1))[0]
+            change = {
+                "ADD": quantity, "REMOVE": -quantity, "MOVE": 0,
+            }.get(kind, rnd.randint(-quantity, quantity) or 1)
+            character_id = rnd.randrange(500)
+            yield {
+                "corporation_id": corp.pk, "transaction_type": kind, "type_id": type_id,
+                "quantity_change": change, "old_quantity": quantity, "new_quantity": quantity + change,
+                "location_id": location_pk, "division_id": division_pk,
+                "from_location_id": rnd.choice(location_pks) if kind == "MOVE" else None,
+                "estimated_value": (Decimal(str(prices[type_id])) * abs(change)).quantize(CENT),
+                "character_id": 2100000000 + character_id if character_id < 400 else None,
+                "character_name": f"Load Test Pilot {character_id}" if character_id < 400 else "",
+                "item_id": item_id, "item_ids": [],
+                "detected_at": now - timedelta(seconds=rnd.randrange(span)),
+                "notification_sent": False,
+            }
+
+    say(f"Inserting {transactions:,} transactions")
+    counts["transactions"] = insert_rows(HangarTransaction, transaction_rows(), batch_size)
+
+    def container_log_rows():
+        span = HISTORY_DAYS * 86400
+        for number in range(container_logs):
+            corp = corps[number % len(corps)]
+            if not held[corp.pk]:
+                continue
+            item_id, type_id, _, _, quantity = rnd.choice(held[corp.pk])
+            character_id = 2100000000 + rnd.randrange(400)
+            yield {
+                "corporation_id": corp.pk, "character_id": character_id,
+                "character_name": f"Load Test Pilot {character_id - 2100000000}",
+                "action": rnd.choice(("add", "take", "lock", "unlock")),
+                "type_id": type_id, "quantity": quantity,
+                "container_id": item_id, "container_type_id": rnd.choice(CONTAINER_TYPE_IDS),
+                "location_id": rnd.choice(generator.station_ids),
+                "location_flag": f"CorpSAG{rnd.randint(1, 7)}",
+                # Microseconds keep the unique_together key unique
+                "logged_at": now - timedelta(microseconds=rnd.randrange(span * 10 ** 6)),
+            }
+
+    say(f"Inserting {container_logs:,} container logs")
+    counts["container_logs"] = insert_rows(ContainerLog, container_log_rows(), batch_size)
+
+    say("Inserting snapshots")
+    counts["snapshots"] = insert_rows(HangarSnapshot, (
+        {"corporation_id": corp.pk, "snapshot_time": now - timedelta(days=day),
+         "total_items": len(held[corp.pk]),
+         "total_value": Decimal(rnd.randrange(10 ** 9, 10 ** 12)), "snapshot_data": {}}
+        for corp in corps
+        for day in range(HISTORY_DAYS)
+    ), batch_size)
+
+    for corp in corps:
+        bump_generation(corp.pk)
+    rebuild_type_index()
+    return counts
@@ -0,0 +1,181 @@
+"""
+Sync pipeline benchmarks
+
+Each case runs a stage of the sync against generated data and records its
+wall time (median of the runs), database query count and peak Python memory
+(tracemalloc, measured in one extra run since tracing slows the code down).
+Every run happens in a savepoint that is rolled back, so all runs of a case
+start from the same database state, and each payload size is rolled back as
+a whole: the benchmarks leave the database untouched.
+"""
+
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Corporation, HangarDivision, ItemType, Location
+from ..tasks import process_assets, resolve_station_id, store_container_logs
+from .generator import AssetGenerator
+
+BENCHMARK_CORPORATION_ID = 1
+
+# Default allowed slowdown / memory growth over the baseline before a case
+# counts as a regression; query counts must not grow at all
+DEFAULT_TOLERANCE = 0.25
+
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def prepare_database(generator: AssetGenerator) -> Corporation:
+    """Create the benchmark corporation, its divisions, stations and types."""
+    corporation = Corporation.objects.create(
+        corporation_id=BENCHMARK_CORPORATION_ID,
+        corporation_name="Benchmark Corporation",
+        tracking_enabled=False,
+    )
+    HangarDivision.objects.bulk_create([
+        HangarDivision(corporation=corporation, division_id=number, division_name=f"Division {number}")
+        for number in range(1, 8)
+    ])
+    Location.objects.bulk_create(
+        [
+            Location(location_id=station_id, location_name=f"Benchmark Station {station_id}",
+                     location_type="station")
+            for station_id in generator.station_ids
+        ],
+        ignore_conflicts=True,
+    )
+    ItemType.objects.bulk_create(
+        [ItemType(type_id=type_id, name=name) for type_id, name in generator.type_names().items()],
+        ignore_conflicts=True,
+    )
+    return corporation
+
+
+def measure(run: Callable[[], object], repeat: int = 3) -> dict:
+    """
+    Time, query count and peak memory of ``run``, each run rolled back.
+
+    Returns:
+        Dict with time_ms, queries and peak_kb
+    """
+    timings = []
+    queries = 0
+    for _ in range(max(repeat, 1)):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            _rolled_back(run)
+            timings.append((time.perf_counter() - start) * 1000)
+        # Not counting the savepoint statements of the rollback itself
+        queries = sum(
+            1 for query in captured.captured_queries
+            if not query["sql"].startswith(SAVEPOINT_STATEMENTS)
+        )
+
+    tracemalloc.start()
+    try:
+        _rolled_back(run)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time_ms": round(statistics.median(timings), 2),
+        "queries": queries,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def _rolled_back(run: Callable[[], object]):
+    try:
+        with transaction.atomic():
+            run()
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def run_suite(
+    item_counts: List[int],
+    churn: float = 0.05,
+    log_count: int = 5000,
+    repeat: int = 3,
+    seed: int = 0,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, dict]:
+    """
+    Run every case for each payload size.
+
+    Returns:
+        ``"<case>@<items>"`` -> measure() result
+    """
+    results = {}
+    for item_count in item_counts:
+        # Each size starts from an empty database state
+        _rolled_back(lambda: results.update(
+            _run_size(item_count, churn, log_count, repeat, seed, progress)
+        ))
+    return results
+
+
+def _run_size(item_count, churn, log_count, repeat, seed, progress) -> Dict[str, dict]:
+    generator = AssetGenerator(seed=seed)
+    corporation = prepare_database(generator)
+    prices = generator.prices()
+    assets = generator.assets(item_count)
+    changed = generator.churn(assets, churn)
+    logs = generator.container_logs(assets, log_count)
+    asset_map = {asset["item_id"]: asset for asset in assets}
+
+    cases = {
+        "resolve_station_id": lambda: [
+            resolve_station_id(item_id, asset_map) for item_id in asset_map
+        ],
+        "process_assets.initial": lambda: process_assets(corporation, assets, prices, None),
+        "store_container_logs": lambda: store_container_logs(corporation, logs),
+    }
+    results = {}
+    for name, run in cases.items():
+        if progress:
+            progress(f"{name} @ {item_count} items")
+        results[f"{name}@{item_count}"] = measure(run, repeat)
+
+    # The churn sync starts from a synced hangar
+    process_assets(corporation, assets, prices, None)
+    if progress:
+        progress(f"process_assets.churn @ {item_count} items")
+    results[f"process_assets.churn@{item_count}"] = measure(
+        lambda: process_assets(corporation, changed, prices, None), repeat
+    )
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Regressions of ``results`` against ``baseline``.
+
+    Returns:
+        One message per metric that got worse than allowed
+    """
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get(case)
+        if not base:
+            continue
+        if result["queries"] > base["queries"]:
+            regressions.append(f"{case}: {base['queries']} -> {result['queries']} queries")
+        for metric in ("time_ms", "peak_kb"):
+            if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{case}: {metric} {base[metric]} -> {result[metric]} "
+                    f"(+{(result[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
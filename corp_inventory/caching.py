@@ -0,0 +1,165 @@
+"""
+Sync-versioned cache for read-only view data
+
+The hangar, location, statistics and dashboard pages only change when a
+corporation syncs. Their computed context is cached under a key made of:
+
+  * the view name and its arguments,
+  * each involved corporation's sync generation and ``last_sync``,
+  * the request's GET parameters,
+  * a hash of the user's permissions (pages differ by permission).
+
+``bump_generation`` is called when a sync (or another change to a
+corporation's data) completes, which moves every key for that corporation to
+a fresh namespace; stale entries are never read again and simply expire.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, time as dt_time
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import app_settings
+from .models import Corporation
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "corp_inventory:generation:{}"
+VIEW_KEY = "corp_inventory:view:{}:{}"
+
+
+def bump_generation(corporation_pk: int) -> None:
+    """Invalidate all cached view data involving a corporation (by primary key)."""
+    cache.set(GENERATION_KEY.format(corporation_pk), time.time_ns(), None)
+
+
+def get_generations(corporation_pks: Iterable[int]) -> dict:
+    """
+    Return the current sync generation for each corporation primary key.
+
+    A generation missing from the cache (never bumped, or evicted) is
+    started afresh rather than assumed to be zero, so an eviction can never
+    bring back data cached under an older generation.
+    """
+    keys = {GENERATION_KEY.format(pk): pk for pk in corporation_pks}
+    found = cache.get_many(list(keys))
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        found.update(cache.get_many(list(missing)))
+    return {keys[key]: value for key, value in found.items()}
+
+
+def _permission_hash(user) -> str:
+    perms = ",".join(sorted(user.get_all_permissions()))
+    return hashlib.sha1(perms.encode()).hexdigest()[:12]
+
+
+def cached_view_context(
+    view_name: str,
+    request,
+    corporations: Iterable,
+    build: Callable[[], dict],
+    *args,
+) -> dict:
+    """
+    Return a view's computed context from the cache, building it on a miss.
+
+    Args:
+        view_name: Name of the view, used as key prefix
+        request: Current request (GET parameters and user permissions)
+        corporations: Corporation objects whose data the context depends on
+        build: Zero-argument function computing the context; any querysets in
+            it must already be evaluated
+        *args: View arguments that select the data (e.g. a location ID)
+
+    Returns:
+        Context dict
+    """
+    timeout = app_settings.CORPINVENTORY_VIEW_CACHE_TIMEOUT
+    if not timeout:
+        return build()
+
+    corporations = list(corporations)
+    generations = get_generations(corp.pk for corp in corporations)
+    parts = [
+        repr(args),
+        repr(sorted(
+            (corp.pk, generations.get(corp.pk), str(corp.last_sync))
+            for corp in corporations
+        )),
+        repr(sorted(request.GET.lists())),
+        _permission_hash(request.user),
+    ]
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+    key = VIEW_KEY.format(view_name, digest)
+
+    context = cache.get(key)
+    if context is None:
+        context = build()
+        cache.set(key, context, timeout)
+    else:
+        logger.debug(f"Served {view_name} context from cache")
+    return context
+
+
+def _sync_state(request, corporation_id: int) -> Optional[Tuple[int, Optional[datetime]]]:
+    """(pk, last_sync) for a corporation, looked up once per request."""
+    states = request.__dict__.setdefault("_corp_inventory_sync_state", {})
+    if corporation_id not in states:
+        states[corporation_id] = (
+            Corporation.objects.filter(corporation_id=corporation_id, pending_delete=False)
+            .values_list("pk", "last_sync")
+            .first()
+        )
+    return states[corporation_id]
+
+
+def sync_validators(per_day: bool = False):
+    """
+    Build ``etag_func`` / ``last_modified_func`` for Django's ``@condition``
+    decorator on a view taking ``corporation_id``.
+
+    The ETag covers the corporation's last_sync and sync generation plus the
+    request path and query string, so a poll between syncs is answered with
+    304 Not Modified before the view touches any hangar table. ``per_day``
+    adds the current date for views whose output also depends on "today"
+    (rolling day windows).
+
+    Returns:
+        (etag_func, last_modified_func)
+    """
+
+    def etag_func(request, corporation_id, *args, **kwargs):
+        state = _sync_state(request, corporation_id)
+        if state is None:
+            return None
+        pk, last_sync = state
+        parts = [
+            request.path,
+            repr(sorted(request.GET.lists())),
+            str(last_sync),
+            str(get_generations([pk]).get(pk)),
+        ]
+        if per_day:
+            parts.append(timezone.localdate().isoformat())
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def last_modified_func(request, corporation_id, *args, **kwargs):
+        state = _sync_state(request, corporation_id)
+        if state is None or state[1] is None:
+            return None
+        last_modified = state[1]
+        if per_day:
+            start_of_day = timezone.make_aware(
+                datetime.combine(timezone.localdate(), dt_time.min)
+            )
+            last_modified = max(last_modified, start_of_day)
+        return last_modified
+
+    return etag_func, last_modified_func
@@ -0,0 +1,83 @@
+"""
+Cheap helpers for the diagnostics page
+
+Exact ``COUNT(*)`` on a large transaction table and ``readlines()`` on a big
+rotating log file both scale with the data. The helpers here read database
+statistics and only the end of the log file instead.
+"""
+
+import logging
+import os
+from typing import List, Optional
+
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+TAIL_BLOCK_SIZE = 8192
+
+
+def estimated_row_count(model) -> Optional[int]:
+    """
+    Approximate number of rows in a model's table from database statistics.
+
+    Uses ``pg_class.reltuples`` on PostgreSQL and ``information_schema``
+    ``TABLE_ROWS`` on MySQL / MariaDB; both are kept up to date by
+    (auto)analyze and cost nothing to read. Other databases fall back to an
+    exact count.
+
+    Returns:
+        Row estimate, or None if the statistics are unavailable
+    """
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                    [table],
+                )
+            elif connection.vendor == "mysql":
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    [table],
+                )
+            else:
+                return model.objects.count()
+            row = cursor.fetchone()
+    except DatabaseError as e:
+        logger.warning(f"Could not read row estimate for {table}: {e}")
+        return None
+    # reltuples is -1 for a table that has never been analyzed
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def tail_lines(path: str, count: int = 100) -> List[str]:
+    """
+    Return the last ``count`` lines of a text file, newest first.
+
+    Reads fixed-size blocks backwards from the end of the file until enough
+    newlines have been seen, so the cost depends on ``count`` rather than the
+    file size.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # One extra newline: the last line normally ends with one
+        while position > 0 and data.count(b"\n") <= count:
+            read_size = min(TAIL_BLOCK_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+
+    lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+    if position > 0:
+        # The first line is probably cut off mid-way
+        lines = lines[1:]
+    lines = lines[-count:]
+    lines.reverse()
+    return lines
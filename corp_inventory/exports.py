@@ -0,0 +1,123 @@
+"""
+Streaming CSV / NDJSON exports
+
+Rows are read from the database with ``QuerySet.iterator()`` and written to
+the response one at a time through a ``StreamingHttpResponse``, so neither
+the full result set nor the full response body is ever held in memory.
+"""
+
+import csv
+import json
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# (column header, field lookup) for each export
+HANGAR_EXPORT_COLUMNS = (
+    ("item_id", "item_id"),
+    ("type_id", "type_id"),
+    ("type_name", "type__name"),
+    ("quantity", "quantity"),
+    ("location_id", "location__location_id"),
+    ("location_name", "location__location_name"),
+    ("solar_system", "location__solar_system_name"),
+    ("division", "division__division_name"),
+    ("is_singleton", "is_singleton"),
+    ("is_blueprint_copy", "is_blueprint_copy"),
+    ("estimated_value", "estimated_value"),
+    ("last_seen", "last_seen"),
+)
+
+TRANSACTION_EXPORT_COLUMNS = (
+    ("detected_at", "detected_at"),
+    ("corporation", "corporation__corporation_name"),
+    ("transaction_type", "transaction_type"),
+    ("type_id", "type_id"),
+    ("type_name", "type__name"),
+    ("quantity_change", "quantity_change"),
+    ("old_quantity", "old_quantity"),
+    ("new_quantity", "new_quantity"),
+    ("location_name", "location__location_name"),
+    ("division", "division__division_name"),
+    ("estimated_value", "estimated_value"),
+    ("character_name", "character_name"),
+)
+
+CONTAINER_LOG_EXPORT_COLUMNS = (
+    ("logged_at", "logged_at"),
+    ("character_id", "character_id"),
+    ("character_name", "character_name"),
+    ("action", "action"),
+    ("type_id", "type_id"),
+    ("type_name", "type__name"),
+    ("quantity", "quantity"),
+    ("container_id", "container_id"),
+    ("container_type", "container_type__name"),
+    ("location_id", "location_id"),
+    ("location_flag", "location_flag"),
+)
+
+
+class _Echo:
+    """File-like object whose write() hands the line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(headers: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(headers: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def streaming_export(
+    queryset: QuerySet,
+    columns: Sequence[Tuple[str, str]],
+    export_format: str,
+    filename: str,
+) -> StreamingHttpResponse:
+    """
+    Stream ``queryset`` as a CSV or NDJSON attachment.
+
+    Args:
+        queryset: Filtered and ordered QuerySet
+        columns: (header, field lookup) pairs
+        export_format: "csv" or "ndjson" (anything else falls back to CSV)
+        filename: Download name without extension
+
+    Returns:
+        StreamingHttpResponse
+    """
+    if export_format not in EXPORT_FORMATS:
+        export_format = "csv"
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*(lookup for _, lookup in columns)).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    lines = _csv_lines if export_format == "csv" else _ndjson_lines
+
+    response = StreamingHttpResponse(
+        lines(headers, rows), content_type=EXPORT_FORMATS[export_format]
+    )
+    stamp = timezone.now().strftime("%Y%m%d-%H%M")
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}-{stamp}.{export_format}"'
+    )
+    return response
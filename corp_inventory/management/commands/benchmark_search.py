@@ -0,0 +1,97 @@
+"""
+Compare the configured search backend against the plain LIKE path
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from corp_inventory.models import ContainerLog, HangarItem, HangarTransaction
+from corp_inventory.search import LikeSearchBackend, get_search_backend
+
+# (label, queryset factory, searched fields) — mirrors the view filters
+SEARCH_TARGETS = (
+    (
+        "hangar",
+        lambda: HangarItem.objects.filter(is_active=True),
+        ["type__name", "location__location_name"],
+    ),
+    (
+        "transactions",
+        lambda: HangarTransaction.objects.all(),
+        ["type__name"],
+    ),
+    (
+        "container_logs",
+        lambda: ContainerLog.objects.all(),
+        ["type__name"],
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time item-name searches with the configured search backend "
+        "against the LIKE fallback on the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "terms",
+            nargs="*",
+            default=["Tritanium", "Nestor", "Caldari Navy"],
+            help="Search terms to benchmark",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per term and backend (median is reported)",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Print the query plan for each backend",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        like = LikeSearchBackend()
+        self.stdout.write(
+            f"Database: {connection.vendor} — backend '{backend.name}' vs 'like'"
+        )
+        self.stdout.write("-" * 72)
+        self.stdout.write(
+            f"{'target':<16}{'term':<18}{'rows':>8}{'like ms':>12}"
+            f"{backend.name + ' ms':>14}{'speedup':>10}"
+        )
+
+        for label, make_queryset, fields in SEARCH_TARGETS:
+            for term in options["terms"]:
+                like_qs = like.filter(make_queryset(), term, fields)
+                backend_qs = backend.filter(make_queryset(), term, fields)
+
+                like_ms, rows = self._time(like_qs, options["repeat"])
+                backend_ms, _ = self._time(backend_qs, options["repeat"])
+                speedup = like_ms / backend_ms if backend_ms else 0
+
+                self.stdout.write(
+                    f"{label:<16}{term[:17]:<18}{rows:>8}{like_ms:>12.2f}"
+                    f"{backend_ms:>14.2f}{speedup:>9.1f}x"
+                )
+                if options["explain"]:
+                    self.stdout.write(f"  like plan:\n{like_qs.explain()}")
+                    self.stdout.write(f"  {backend.name} plan:\n{backend_qs.explain()}")
+
+    @staticmethod
+    def _time(queryset, repeat):
+        """Return (median milliseconds, row count) for COUNT(*) on ``queryset``."""
+        timings = []
+        rows = 0
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            rows = queryset.count()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), rows
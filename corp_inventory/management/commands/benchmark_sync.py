@@ -0,0 +1,107 @@
+"""
+Benchmark the sync pipeline on generated corporation assets
+"""
+
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from corp_inventory.benchmark.suite import DEFAULT_TOLERANCE, compare, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure time, query count and peak memory of process_assets, "
+        "resolve_station_id and container log storage on synthetic payloads, "
+        "and compare them with a saved baseline. Nothing is written to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            nargs="+",
+            default=[10000],
+            help="Hangar item counts to generate (e.g. --items 10000 100000 1000000)",
+        )
+        parser.add_argument(
+            "--churn",
+            type=float,
+            default=0.05,
+            help="Share of items changed between the two benchmarked syncs",
+        )
+        parser.add_argument(
+            "--logs",
+            type=int,
+            default=5000,
+            help="Container log events stored",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Timed runs per case (median is reported)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+        parser.add_argument(
+            "--baseline",
+            default="corp_inventory_benchmark.json",
+            help="Baseline file to compare with (and to write with --save-baseline)",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store these results as the new baseline",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=DEFAULT_TOLERANCE,
+            help="Allowed time / memory growth over the baseline (0.25 = 25%%)",
+        )
+
+    def handle(self, *args, **options):
+        results = run_suite(
+            options["items"],
+            churn=options["churn"],
+            log_count=options["logs"],
+            repeat=options["repeat"],
+            seed=options["seed"],
+            progress=lambda message: self.stderr.write(f"  running {message}"),
+        )
+
+        baseline = {}
+        if os.path.exists(options["baseline"]):
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+        self.stdout.write(
+            f"{'case':<36}{'time ms':>12}{'queries':>9}{'peak KiB':>12}{'vs baseline':>14}"
+        )
+        self.stdout.write("-" * 83)
+        for case, result in results.items():
+            base = baseline.get(case)
+            change = (
+                f"{(result['time_ms'] / base['time_ms'] - 1) * 100:+.0f}%"
+                if base and base["time_ms"] else ""
+            )
+            self.stdout.write(
+                f"{case:<36}{result['time_ms']:>12.1f}{result['queries']:>9}"
+                f"{result['peak_kb']:>12.1f}{change:>14}"
+            )
+
+        if options["save_baseline"]:
+            baseline.update(results)
+            with open(options["baseline"], "w") as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+
+        regressions = compare(results, baseline, options["tolerance"])
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+        if baseline:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,102 @@
+"""
+Load test the Corp Inventory views with the Django test client
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from corp_inventory.benchmark.loadtest import (
+    TARGETS,
+    build_targets,
+    run_load_test,
+    view_cache_disabled,
+)
+from corp_inventory.benchmark.seed import seeded_corporations
+from corp_inventory.models import Corporation
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the dashboard, hangar, transaction log, statistics, location "
+        "and container log views repeatedly and report latency percentiles and "
+        "query counts per view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corporation",
+            type=int,
+            help="Corporation ID to load (default: the first seeded corporation)",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username to request as (default: the first superuser)",
+        )
+        parser.add_argument("--requests", type=int, default=20, help="Requests per view after the first")
+        parser.add_argument(
+            "--views",
+            nargs="+",
+            choices=[name for name, *_ in TARGETS],
+            help="Only these views",
+        )
+        parser.add_argument(
+            "--no-view-cache",
+            action="store_true",
+            help="Compute every page instead of serving it from the view cache",
+        )
+        parser.add_argument("--host", default="testserver", help="Host header (must be in ALLOWED_HOSTS)")
+        parser.add_argument("--secure", action="store_true", help="Send requests as HTTPS")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    def handle(self, *args, **options):
+        if options["corporation"]:
+            corporation = Corporation.objects.filter(corporation_id=options["corporation"]).first()
+        else:
+            corporation = seeded_corporations().order_by("corporation_id").first()
+        if not corporation:
+            raise CommandError("No corporation to load; run seed_large_db or pass --corporation")
+
+        User = get_user_model()
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+        else:
+            user = User.objects.filter(is_superuser=True, is_active=True).first()
+        if not user:
+            raise CommandError("No user to request as; pass --user or create a superuser")
+
+        targets = build_targets(corporation, options["views"])
+        progress = None if options["json"] else (lambda message: self.stderr.write(f"  {message}"))
+        if options["no_view_cache"]:
+            with view_cache_disabled():
+                results = run_load_test(
+                    user, targets, options["requests"], options["host"], options["secure"], progress
+                )
+        else:
+            results = run_load_test(
+                user, targets, options["requests"], options["host"], options["secure"], progress
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{corporation.corporation_name} as {user.username}, "
+            f"{options['requests']} request(s) per view after the first"
+        )
+        self.stdout.write(
+            f"{'view':<26}{'status':>7}{'cold ms':>10}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'queries':>9}{'max q':>7}"
+        )
+        self.stdout.write("-" * 86)
+        for name, result in results.items():
+            line = (
+                f"{name:<26}{result['status']:>7}{result['cold_ms']:>10.1f}{result['p50_ms']:>9.1f}"
+                f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['queries']:>9}"
+                f"{result['max_queries']:>7}"
+            )
+            if result["status"] != 200:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
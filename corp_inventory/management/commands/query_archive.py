@@ -0,0 +1,78 @@
+"""
+Scan the cold archive of expired transactions and container logs
+"""
+
+import csv
+import json
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from corp_inventory import app_settings
+from corp_inventory.archive import ARCHIVE_KINDS, iter_archive
+
+
+def _parse_date(value):
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+    return timezone.make_aware(datetime.combine(day, time.min), dt_timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        "Search archived transactions or container logs, e.g. for audits. "
+        "Writes matching rows to stdout as JSON lines or CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "kind",
+            choices=sorted(ARCHIVE_KINDS),
+            help="Which archive to scan",
+        )
+        parser.add_argument("--corporation", type=int, help="EVE corporation ID")
+        parser.add_argument("--since", help="Start date (YYYY-MM-DD, inclusive)")
+        parser.add_argument("--until", help="End date (YYYY-MM-DD, exclusive)")
+        parser.add_argument("--type-id", type=int, help="Only this item type")
+        parser.add_argument("--character-id", type=int, help="Only this character")
+        parser.add_argument(
+            "--format",
+            choices=("jsonl", "csv"),
+            default="jsonl",
+            help="Output format (default: jsonl)",
+        )
+
+    def handle(self, *args, **options):
+        if not app_settings.CORPINVENTORY_ARCHIVE_PATH:
+            raise CommandError("CORPINVENTORY_ARCHIVE_PATH is not configured")
+
+        filters = {}
+        if options["type_id"] is not None:
+            filters["type_id"] = options["type_id"]
+        if options["character_id"] is not None:
+            filters["character_id"] = options["character_id"]
+
+        records = iter_archive(
+            options["kind"],
+            corporation_id=options["corporation"],
+            since=_parse_date(options["since"]) if options["since"] else None,
+            until=_parse_date(options["until"]) if options["until"] else None,
+            filters=filters,
+        )
+
+        count = 0
+        writer = None
+        for record in records:
+            if options["format"] == "csv":
+                if writer is None:
+                    writer = csv.DictWriter(self.stdout, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow(record)
+            else:
+                self.stdout.write(json.dumps(record))
+            count += 1
+
+        self.stderr.write(f"{count} archived row(s) matched")
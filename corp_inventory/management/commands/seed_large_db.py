@@ -0,0 +1,61 @@
+"""
+Seed the database with large load-test corporations
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from corp_inventory.benchmark.seed import flush_seeded, seed_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert tracked load-test corporations with generated hangar items, "
+        "transactions, container logs and snapshots (COPY on PostgreSQL, batched "
+        "INSERTs elsewhere). Do not run this on a production database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corporations", type=int, default=5)
+        parser.add_argument("--items", type=int, default=500000)
+        parser.add_argument("--transactions", type=int, default=10000000)
+        parser.add_argument("--container-logs", type=int, default=1000000)
+        parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50000,
+            help="Rows per COPY / INSERT batch",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Delete previously seeded corporations first",
+        )
+        parser.add_argument(
+            "--flush-only",
+            action="store_true",
+            help="Only delete previously seeded corporations",
+        )
+
+    def handle(self, *args, **options):
+        if options["flush"] or options["flush_only"]:
+            removed = flush_seeded()
+            self.stdout.write(f"Deleted {removed} seeded corporation(s)")
+            if options["flush_only"]:
+                return
+
+        start = time.perf_counter()
+        counts = seed_database(
+            corporations=options["corporations"],
+            items=options["items"],
+            transactions=options["transactions"],
+            container_logs=options["container_logs"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=lambda message: self.stdout.write(f"  {message}"),
+        )
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{count:,} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded {summary} in {elapsed:.0f}s"))
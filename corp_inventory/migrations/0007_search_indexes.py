@@ -0,0 +1,80 @@
+"""
+Add text search indexes for the item / location / character name searches.
+
+PostgreSQL gets pg_trgm GIN indexes on UPPER(column), which serve Django's
+``icontains`` lookups. MySQL / MariaDB gets FULLTEXT indexes, used by the
+FULLTEXT search backend (corp_inventory.search). Other databases are left
+alone and use the portable LIKE search.
+
+Note: on InnoDB the first FULLTEXT index on a table rebuilds that table, so
+this migration can take a while on large HangarTransaction tables.
+"""
+import logging
+
+from django.db import migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+# (table, column) pairs searched by the views
+SEARCH_COLUMNS = (
+    ("corp_inventory_hangaritem", "type_name"),
+    ("corp_inventory_hangartransaction", "type_name"),
+    ("corp_inventory_hangartransaction", "character_name"),
+    ("corp_inventory_containerlog", "type_name"),
+    ("corp_inventory_containerlog", "character_name"),
+    ("corp_inventory_location", "location_name"),
+)
+
+
+def _index_name(table, column, suffix):
+    return f"{table.replace('corp_inventory_', 'corp_inv_')}_{column}_{suffix}"
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception as e:
+            logger.warning(
+                f"Could not enable pg_trgm ({e}); searches will use unindexed LIKE. "
+                f"Run 'CREATE EXTENSION pg_trgm' as a superuser and re-run this migration."
+            )
+            return
+        for table, column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{_index_name(table, column, "trgm")}" '
+                f'ON "{table}" USING gin (UPPER("{column}") gin_trgm_ops)'
+            )
+    elif connection.vendor == "mysql":
+        for table, column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f"ALTER TABLE `{table}` "
+                f"ADD FULLTEXT INDEX `{_index_name(table, column, 'ft')}` (`{column}`)"
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for table, column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f'DROP INDEX IF EXISTS "{_index_name(table, column, "trgm")}"'
+            )
+    elif connection.vendor == "mysql":
+        for table, column in SEARCH_COLUMNS:
+            schema_editor.execute(
+                f"ALTER TABLE `{table}` DROP INDEX `{_index_name(table, column, 'ft')}`"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0006_clear_snapshot_data"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
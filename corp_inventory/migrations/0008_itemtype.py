@@ -0,0 +1,229 @@
+"""
+Normalize item type names into an ItemType table.
+
+HangarItem, HangarTransaction and ContainerLog each stored a copy of the
+type name (up to 254 chars) on every row. The existing type_id columns are
+turned into foreign keys to ItemType (same column, same values), the names
+are backfilled into ItemType, and the per-row name columns are dropped.
+
+Steps:
+  1. create ItemType and backfill it from every distinct (type_id, name)
+  2. re-declare the integer type_id columns as foreign keys in the migration
+     state only — the column and its index already exist
+  3. add the foreign key constraints
+  4. drop the name columns (and with them the 0007 search indexes on those
+     columns), then index ItemType.name for searches instead
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _is_placeholder(name):
+    return not name or name.startswith("Unknown Type ")
+
+
+def backfill_item_types(apps, schema_editor):
+    ItemType = apps.get_model("corp_inventory", "ItemType")
+    HangarItem = apps.get_model("corp_inventory", "HangarItem")
+    HangarTransaction = apps.get_model("corp_inventory", "HangarTransaction")
+    ContainerLog = apps.get_model("corp_inventory", "ContainerLog")
+
+    names = {}
+
+    def collect(pairs):
+        for type_id, name in pairs:
+            if type_id is None:
+                continue
+            # Prefer a resolved name over an empty / "Unknown Type" placeholder
+            if type_id not in names or (_is_placeholder(names[type_id]) and not _is_placeholder(name)):
+                names[type_id] = name
+
+    collect(HangarItem.objects.values_list("type_id", "type_name").distinct().iterator())
+    collect(HangarTransaction.objects.values_list("type_id", "type_name").distinct().iterator())
+    collect(ContainerLog.objects.values_list("type_id", "type_name").distinct().iterator())
+    collect(
+        ContainerLog.objects.values_list("container_type_id", "container_type_name")
+        .distinct()
+        .iterator()
+    )
+
+    ItemType.objects.bulk_create(
+        [
+            ItemType(type_id=type_id, name=name or f"Unknown Type {type_id}")
+            for type_id, name in names.items()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    if names:
+        print(f"\n  Backfilled {len(names)} item type(s).")
+
+
+def restore_type_names(apps, schema_editor):
+    """Reverse only: copy names back into the re-added name columns."""
+    ItemType = apps.get_model("corp_inventory", "ItemType")
+    HangarItem = apps.get_model("corp_inventory", "HangarItem")
+    HangarTransaction = apps.get_model("corp_inventory", "HangarTransaction")
+    ContainerLog = apps.get_model("corp_inventory", "ContainerLog")
+
+    def name_of(field):
+        return models.Subquery(
+            ItemType.objects.filter(type_id=models.OuterRef(field)).values("name")[:1]
+        )
+
+    HangarItem.objects.update(type_name=name_of("type_id"))
+    HangarTransaction.objects.update(type_name=name_of("type_id"))
+    ContainerLog.objects.filter(type__isnull=False).update(type_name=name_of("type_id"))
+    ContainerLog.objects.filter(container_type__isnull=False).update(
+        container_type_name=name_of("container_type_id")
+    )
+
+
+def create_name_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute(
+            "DO $$ BEGIN "
+            "IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN "
+            'CREATE INDEX IF NOT EXISTS "corp_inv_itemtype_name_trgm" '
+            'ON "corp_inventory_itemtype" USING gin (UPPER("name") gin_trgm_ops); '
+            "END IF; END $$"
+        )
+    elif connection.vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE `corp_inventory_itemtype` "
+            "ADD FULLTEXT INDEX `corp_inv_itemtype_name_ft` (`name`)"
+        )
+
+
+def drop_name_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute('DROP INDEX IF EXISTS "corp_inv_itemtype_name_trgm"')
+    elif connection.vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE `corp_inventory_itemtype` DROP INDEX `corp_inv_itemtype_name_ft`"
+        )
+
+
+def _type_fk(related_name, null=False, db_column="type_id", db_constraint=True, db_index=True):
+    return models.ForeignKey(
+        blank=null,
+        null=null,
+        db_column=db_column,
+        db_constraint=db_constraint,
+        db_index=db_index,
+        on_delete=django.db.models.deletion.PROTECT,
+        related_name=related_name,
+        to="corp_inventory.itemtype",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0007_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemType",
+            fields=[
+                ("type_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=254)),
+                ("last_update", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Item Type",
+                "verbose_name_plural": "Item Types",
+                "ordering": ["name"],
+                "default_permissions": (),
+            },
+        ),
+        migrations.RunPython(backfill_item_types, migrations.RunPython.noop),
+
+        # The integer columns become FK columns without touching the database
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveField(model_name="hangaritem", name="type_id"),
+                migrations.AddField(
+                    model_name="hangaritem",
+                    name="type",
+                    field=_type_fk("hangar_items", db_constraint=False),
+                    preserve_default=False,
+                ),
+                migrations.RemoveField(model_name="hangartransaction", name="type_id"),
+                migrations.AddField(
+                    model_name="hangartransaction",
+                    name="type",
+                    field=_type_fk("transactions", db_constraint=False),
+                    preserve_default=False,
+                ),
+                migrations.AlterUniqueTogether(name="containerlog", unique_together=set()),
+                migrations.RemoveField(model_name="containerlog", name="type_id"),
+                migrations.AddField(
+                    model_name="containerlog",
+                    name="type",
+                    field=_type_fk("container_logs", null=True, db_constraint=False),
+                ),
+                migrations.AlterUniqueTogether(
+                    name="containerlog",
+                    unique_together={
+                        ("corporation", "character_id", "container_id", "action", "type_id", "quantity", "logged_at")
+                    },
+                ),
+                migrations.RemoveField(model_name="containerlog", name="container_type_id"),
+                migrations.AddField(
+                    model_name="containerlog",
+                    name="container_type",
+                    field=_type_fk(
+                        "+",
+                        null=True,
+                        db_column="container_type_id",
+                        db_constraint=False,
+                        db_index=False,
+                    ),
+                ),
+            ],
+        ),
+
+        # Now add the real foreign key constraints (and the container type index)
+        migrations.AlterField(
+            model_name="hangaritem",
+            name="type",
+            field=_type_fk("hangar_items"),
+        ),
+        migrations.AlterField(
+            model_name="hangartransaction",
+            name="type",
+            field=_type_fk("transactions"),
+        ),
+        migrations.AlterField(
+            model_name="containerlog",
+            name="type",
+            field=_type_fk("container_logs", null=True),
+        ),
+        migrations.AlterField(
+            model_name="containerlog",
+            name="container_type",
+            field=_type_fk("+", null=True, db_column="container_type_id"),
+        ),
+
+        # State-only default so that unapplying can re-add the NOT NULL columns
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name=model_name,
+                    name="type_name",
+                    field=models.CharField(default="", max_length=254),
+                )
+                for model_name in ("hangaritem", "hangartransaction")
+            ],
+        ),
+        migrations.RunPython(migrations.RunPython.noop, restore_type_names),
+        migrations.RemoveField(model_name="hangaritem", name="type_name"),
+        migrations.RemoveField(model_name="hangartransaction", name="type_name"),
+        migrations.RemoveField(model_name="containerlog", name="type_name"),
+        migrations.RemoveField(model_name="containerlog", name="container_type_name"),
+        migrations.RunPython(create_name_search_index, drop_name_search_index),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0008_itemtype"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hangartransaction",
+            name="item_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
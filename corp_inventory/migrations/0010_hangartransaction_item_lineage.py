@@ -0,0 +1,57 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_item_id(apps, schema_editor):
+    """
+    Rows coalesced from a single stack already know their item; everything
+    recorded before item_ids existed stays null.
+    """
+    HangarTransaction = apps.get_model("corp_inventory", "HangarTransaction")
+    batch = []
+    for trans in (
+        HangarTransaction.objects.exclude(item_ids=[])
+        .only("id", "item_ids")
+        .iterator(chunk_size=2000)
+    ):
+        if len(trans.item_ids) == 1:
+            trans.item_id = trans.item_ids[0]
+            batch.append(trans)
+        if len(batch) >= 2000:
+            HangarTransaction.objects.bulk_update(batch, ["item_id"])
+            batch = []
+    if batch:
+        HangarTransaction.objects.bulk_update(batch, ["item_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0009_hangartransaction_item_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hangartransaction",
+            name="item_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="hangartransaction",
+            name="from_location",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="moved_out_transactions",
+                to="corp_inventory.location",
+            ),
+        ),
+        migrations.RunPython(backfill_item_id, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="hangartransaction",
+            index=models.Index(
+                fields=["item_id", "-detected_at"], name="corp_inv_item_detect_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0010_hangartransaction_item_lineage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="corporation",
+            name="pending_delete",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
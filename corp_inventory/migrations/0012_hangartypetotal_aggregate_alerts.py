@@ -0,0 +1,74 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def build_type_totals(apps, schema_editor):
+    """Seed the running totals from the current active items, once."""
+    HangarItem = apps.get_model("corp_inventory", "HangarItem")
+    HangarTypeTotal = apps.get_model("corp_inventory", "HangarTypeTotal")
+    rows = (
+        HangarItem.objects.filter(is_active=True)
+        .values("corporation_id", "type_id", "location_id", "division_id")
+        .annotate(quantity=Sum("quantity"), value=Sum("estimated_value"))
+        .order_by()
+    )
+    HangarTypeTotal.objects.bulk_create(
+        (HangarTypeTotal(**row) for row in rows.iterator()),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0011_corporation_pending_delete"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HangarTypeTotal",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("quantity", models.BigIntegerField(default=0)),
+                ("value", models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("corporation", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="type_totals", to="corp_inventory.corporation")),
+                ("type", models.ForeignKey(db_column="type_id", on_delete=django.db.models.deletion.PROTECT, related_name="+", to="corp_inventory.itemtype")),
+                ("location", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="corp_inventory.location")),
+                ("division", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="corp_inventory.hangardivision")),
+            ],
+            options={
+                "verbose_name": "Hangar Type Total",
+                "verbose_name_plural": "Hangar Type Totals",
+                "default_permissions": (),
+                "indexes": [models.Index(fields=["corporation", "type"], name="corp_inv_total_type_idx")],
+            },
+        ),
+        migrations.AddField(
+            model_name="alertrule",
+            name="location",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="corp_inventory.location"),
+        ),
+        migrations.AddField(
+            model_name="alertrule",
+            name="percent_threshold",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AlterField(
+            model_name="alertrule",
+            name="alert_type",
+            field=models.CharField(
+                choices=[
+                    ("ITEM_ADDED", "Item Added"),
+                    ("ITEM_REMOVED", "Item Removed"),
+                    ("VALUE_THRESHOLD", "Value Threshold Exceeded"),
+                    ("QUANTITY_CHANGE", "Quantity Changed"),
+                    ("QUANTITY_BELOW", "Total Quantity Below Threshold"),
+                    ("VALUE_DROP", "Total Value Dropped By Percent"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(build_type_totals, migrations.RunPython.noop),
+    ]
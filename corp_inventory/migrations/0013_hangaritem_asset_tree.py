@@ -0,0 +1,68 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_subtree_totals(apps, schema_editor):
+    """
+    Until the next sync numbers the tree, every item counts as a leaf.
+    """
+    HangarItem = apps.get_model("corp_inventory", "HangarItem")
+    HangarItem.objects.update(
+        subtree_quantity=F("quantity"),
+        subtree_value=F("estimated_value"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("corp_inventory", "0012_hangartypetotal_aggregate_alerts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hangaritem",
+            name="location_flag",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="parent_item_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="tree_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="lft",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="rgt",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="subtree_quantity",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="hangaritem",
+            name="subtree_value",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20),
+        ),
+        migrations.AddIndex(
+            model_name="hangaritem",
+            index=models.Index(fields=["tree_id", "lft"], name="corp_inv_item_subtree_idx"),
+        ),
+        migrations.RunPython(seed_subtree_totals, migrations.RunPython.noop),
+    ]
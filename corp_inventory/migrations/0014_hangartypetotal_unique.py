@@ -0,0 +1,58 @@
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_totals(apps, schema_editor):
+    """Fold duplicate rows for one key into the oldest row before the constraint."""
+    HangarTypeTotal = apps.get_model("corp_inventory", "HangarTypeTotal")
+    duplicates = (
+        HangarTypeTotal.objects.values("corporation_id", "type_id", "location_id", "division_id")
+        .annotate(rows=Count("id"), keep=Min("id"), quantity=Sum("quantity"), value=Sum("value"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        HangarTypeTotal.objects.filter(pk=row["keep"]).update(
+            quantity=row["quantity"], value=row["value"]
+        )
+        HangarTypeTotal.objects.filter(
+            corporation_id=row["corporation_id"],
+            type_id=row["type_id"],
+            location_id=row["location_id"],
+            division_id=row["division_id"],
+        ).exclude(pk=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+    """
+    At most one running total per (corporation, type, location, division).
+    The unique index also serves the (corporation, type) lookups, so the old
+    index is dropped.
+    """
+
+    dependencies = [
+        ("corp_inventory", "0013_hangaritem_asset_tree"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_totals, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="hangartypetotal",
+            name="corp_inv_total_type_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="hangartypetotal",
+            constraint=models.UniqueConstraint(
+                fields=("corporation", "type", "location", "division"),
+                name="corp_inv_total_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="hangartypetotal",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(division__isnull=True),
+                fields=("corporation", "type", "location"),
+                name="corp_inv_total_unique_nodiv",
+            ),
+        ),
+    ]
@@ -17,6 +17,9 @@ class Corporation(models.Model):
     # Tracking enabled
     tracking_enabled = models.BooleanField(default=True)
     
+    # Set when removal is requested; the data is deleted in the background
+    pending_delete = models.BooleanField(default=False, db_index=True)
+    
     # Wallet / ISK balance (master wallet, division 1)
     wallet_balance = models.DecimalField(
         max_digits=20,
@@ -99,6 +102,27 @@ class Location(models.Model):
         return self.location_name
 
 
+class ItemType(models.Model):
+    """
+    Represents an EVE item type. Shared name lookup for items, transactions
+    and container logs so the name isn't stored on every row.
+    """
+    type_id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=254)
+    
+    # Metadata
+    last_update = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Item Type"
+        verbose_name_plural = "Item Types"
+        default_permissions = ()
+        ordering = ["name"]
+    
+    def __str__(self):
+        return self.name
+
+
 class HangarItem(models.Model):
     """
     Represents an item in a corporation hangar
@@ -111,8 +135,12 @@ class HangarItem(models.Model):
     
     # Item identification
     item_id = models.BigIntegerField(unique=True, db_index=True)
-    type_id = models.IntegerField(db_index=True)
-    type_name = models.CharField(max_length=254)
+    type = models.ForeignKey(
+        ItemType,
+        on_delete=models.PROTECT,
+        db_column="type_id",
+        related_name="hangar_items"
+    )
     
     # Location
     location = models.ForeignKey(
@@ -142,6 +170,21 @@ class HangarItem(models.Model):
     # Stack/Container info
     is_singleton = models.BooleanField(default=False)
     is_blueprint_copy = models.BooleanField(default=False)
+    location_flag = models.CharField(max_length=100, blank=True, default="")
+    
+    # Position in the hangar asset tree (see asset_tree). parent_item_id is
+    # the container / ship holding the item, null for items lying directly in
+    # a division. lft / rgt are nested-set bounds within the tree of the
+    # top-level item tree_id.
+    parent_item_id = models.BigIntegerField(null=True, blank=True)
+    depth = models.PositiveSmallIntegerField(default=0)
+    tree_id = models.BigIntegerField(null=True, blank=True)
+    lft = models.PositiveIntegerField(null=True, blank=True)
+    rgt = models.PositiveIntegerField(null=True, blank=True)
+    
+    # The item plus everything inside it
+    subtree_quantity = models.BigIntegerField(default=0)
+    subtree_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
     
     # Metadata
     first_seen = models.DateTimeField(auto_now_add=True)
@@ -162,8 +205,42 @@ class HangarItem(models.Model):
                 fields=["type_id", "is_active"],
                 name="corp_inv_type_active_idx",
             ),
+            models.Index(
+                fields=["tree_id", "lft"],
+                name="corp_inv_item_subtree_idx",
+            ),
         ]
     
+    @property
+    def type_name(self):
+        return self.type.name
+    
+    @property
+    def is_container(self):
+        return self.lft is not None and self.rgt is not None and self.rgt - self.lft > 1
+    
+    def contents(self):
+        """Active items inside this one, at any depth, in tree order."""
+        if not self.is_container:
+            return HangarItem.objects.none()
+        return HangarItem.objects.filter(
+            tree_id=self.tree_id,
+            is_active=True,
+            lft__gt=self.lft,
+            rgt__lt=self.rgt,
+        ).order_by("lft")
+    
+    def containers(self):
+        """Active items holding this one, outermost first."""
+        if self.lft is None or not self.depth:
+            return HangarItem.objects.none()
+        return HangarItem.objects.filter(
+            tree_id=self.tree_id,
+            is_active=True,
+            lft__lt=self.lft,
+            rgt__gt=self.rgt,
+        ).order_by("lft")
+    
     def __str__(self):
         return f"{self.type_name} x{self.quantity} @ {self.location.location_name}"
 
@@ -193,8 +270,12 @@ class HangarTransaction(models.Model):
     )
     
     # Item info
-    type_id = models.IntegerField(db_index=True)
-    type_name = models.CharField(max_length=254)
+    type = models.ForeignKey(
+        ItemType,
+        on_delete=models.PROTECT,
+        db_column="type_id",
+        related_name="transactions"
+    )
     
     # Quantity change
     quantity_change = models.BigIntegerField()
@@ -213,6 +294,14 @@ class HangarTransaction(models.Model):
         null=True,
         blank=True
     )
+    # Previous location of a MOVE
+    from_location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="moved_out_transactions"
+    )
     
     # Value estimate
     estimated_value = models.DecimalField(
@@ -225,6 +314,13 @@ class HangarTransaction(models.Model):
     character_id = models.IntegerField(null=True, blank=True, db_index=True)
     character_name = models.CharField(max_length=254, blank=True)
     
+    # EVE item_id of the stack this transaction is about (null for coalesced
+    # rows spanning several stacks, and for rows recorded before 0010)
+    item_id = models.BigIntegerField(null=True, blank=True)
+    
+    # Source item_ids when several item events were coalesced into this row
+    item_ids = models.JSONField(default=list, blank=True)
+    
     # Timestamp
     detected_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
@@ -249,8 +345,16 @@ class HangarTransaction(models.Model):
                 fields=["character_id", "-detected_at"],
                 name="corp_inv_char_detect_idx",
             ),
+            models.Index(
+                fields=["item_id", "-detected_at"],
+                name="corp_inv_item_detect_idx",
+            ),
         ]
     
+    @property
+    def type_name(self):
+        return self.type.name
+    
     def __str__(self):
         return (
             f"{self.transaction_type}: {self.type_name} "
@@ -296,6 +400,66 @@ class HangarSnapshot(models.Model):
         return f"{self.corporation.corporation_name} - {self.snapshot_time}"
 
 
+class HangarTypeTotal(models.Model):
+    """
+    Running total of one item type per corporation, location and division
+
+    Maintained from each sync's item diff (see process_assets) so aggregate
+    alert rules never have to scan HangarItem.
+    """
+    corporation = models.ForeignKey(
+        Corporation,
+        on_delete=models.CASCADE,
+        related_name="type_totals"
+    )
+    type = models.ForeignKey(
+        ItemType,
+        on_delete=models.PROTECT,
+        db_column="type_id",
+        related_name="+"
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    division = models.ForeignKey(
+        HangarDivision,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    quantity = models.BigIntegerField(default=0)
+    value = models.DecimalField(
+        max_digits=20,
+        decimal_places=2,
+        default=0
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Hangar Type Total"
+        verbose_name_plural = "Hangar Type Totals"
+        default_permissions = ()
+        # One row per key. NULLs are distinct in a unique index, so totals
+        # outside any division need a constraint of their own.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["corporation", "type", "location", "division"],
+                name="corp_inv_total_unique",
+            ),
+            models.UniqueConstraint(
+                fields=["corporation", "type", "location"],
+                condition=models.Q(division__isnull=True),
+                name="corp_inv_total_unique_nodiv",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.corporation_id} - {self.type_id} @ {self.location_id}: {self.quantity}"
+
+
 class AlertRule(models.Model):
     """
     Configure alerts for specific items or conditions
@@ -305,6 +469,8 @@ class AlertRule(models.Model):
         ("ITEM_REMOVED", "Item Removed"),
         ("VALUE_THRESHOLD", "Value Threshold Exceeded"),
         ("QUANTITY_CHANGE", "Quantity Changed"),
+        ("QUANTITY_BELOW", "Total Quantity Below Threshold"),
+        ("VALUE_DROP", "Total Value Dropped By Percent"),
     )
     
     corporation = models.ForeignKey(
@@ -328,6 +494,14 @@ class AlertRule(models.Model):
         blank=True
     )
     
+    # Optional: specific location
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    
     # Thresholds
     value_threshold = models.DecimalField(
         max_digits=20,
@@ -336,6 +510,13 @@ class AlertRule(models.Model):
         blank=True
     )
     quantity_threshold = models.BigIntegerField(null=True, blank=True)
+    # VALUE_DROP: minimum drop since the previous sync, in percent
+    percent_threshold = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
     
     # Who to notify
     notify_users = models.ManyToManyField(User, blank=True)
@@ -388,14 +569,26 @@ class ContainerLog(models.Model):
     action = models.CharField(max_length=30, choices=ACTION_CHOICES, db_index=True)
 
     # Item involved (what was added/taken)
-    type_id = models.IntegerField(null=True, blank=True, db_index=True)
-    type_name = models.CharField(max_length=254, blank=True, default="")
+    type = models.ForeignKey(
+        ItemType,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        db_column="type_id",
+        related_name="container_logs",
+    )
     quantity = models.IntegerField(null=True, blank=True)
 
     # The container it happened in
     container_id = models.BigIntegerField(db_index=True)
-    container_type_id = models.IntegerField(null=True, blank=True)
-    container_type_name = models.CharField(max_length=254, blank=True, default="")
+    container_type = models.ForeignKey(
+        ItemType,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        db_column="container_type_id",
+        related_name="+",
+    )
 
     # Location
     location_id = models.BigIntegerField(null=True, blank=True)
@@ -425,6 +618,14 @@ class ContainerLog(models.Model):
             ),
         ]
 
+    @property
+    def type_name(self):
+        return self.type.name if self.type_id else ""
+
+    @property
+    def container_type_name(self):
+        return self.container_type.name if self.container_type_id else ""
+
     def __str__(self):
         return (
             f"{self.character_name} {self.action} "
@@ -0,0 +1,182 @@
+"""
+Alert delivery
+
+Alerts matched during a sync are delivered as digests: each user gets one
+Alliance Auth notification listing every alert of that sync for the rules
+they follow, and the optional webhook gets one message per sync. The
+notifications are written with a single bulk insert.
+
+Each rule may raise at most CORPINVENTORY_ALERT_RATE_LIMIT alerts per hour
+(cache counters); the rest are counted in the digest but not listed, so a
+5,000 item haul produces one short notification per user.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import requests
+from django.core.cache import cache
+
+from allianceauth.notifications.models import Notification
+
+from . import app_settings
+from .models import AlertRule, Corporation
+
+logger = logging.getLogger(__name__)
+
+RATE_WINDOW_SECONDS = 3600
+RATE_KEY = "corp_inventory:alert_rate:{}:{}"
+
+# Alerts listed per digest; the rest are summarized in one line
+DIGEST_MAX_LINES = 25
+
+WEBHOOK_TIMEOUT = 10
+
+
+def apply_rate_limits(alerts: List[dict]):
+    """
+    Drop alerts over each rule's hourly limit.
+
+    Returns:
+        (alerts to deliver, number suppressed per rule ID)
+    """
+    limit = app_settings.CORPINVENTORY_ALERT_RATE_LIMIT
+    if not limit:
+        return alerts, {}
+    by_rule = defaultdict(list)
+    for alert in alerts:
+        by_rule[alert["rule_id"]].append(alert)
+
+    window = int(time.time()) // RATE_WINDOW_SECONDS
+    allowed = []
+    suppressed = {}
+    for rule_id, rule_alerts in by_rule.items():
+        key = RATE_KEY.format(rule_id, window)
+        cache.add(key, 0, RATE_WINDOW_SECONDS)
+        try:
+            count = cache.incr(key, len(rule_alerts))
+        except ValueError:
+            # Counter evicted between add and incr; start the window again
+            count = len(rule_alerts)
+            cache.set(key, count, RATE_WINDOW_SECONDS)
+        remaining = max(limit - (count - len(rule_alerts)), 0)
+        allowed.extend(rule_alerts[:remaining])
+        if len(rule_alerts) > remaining:
+            suppressed[rule_id] = len(rule_alerts) - remaining
+    return allowed, suppressed
+
+
+def format_alert(rule: AlertRule, alert: dict) -> str:
+    """One digest line."""
+    if "summary" in alert:
+        return f"[{rule.name}] {alert['summary']}"
+    where = alert["location_name"]
+    if alert["division_name"]:
+        where = f"{where} / {alert['division_name']}"
+    return (
+        f"[{rule.name}] {alert['transaction_type']} {alert['quantity_change']:+,} "
+        f"{alert['type_name']} at {where} (~{alert['estimated_value']:,.0f} ISK)"
+    )
+
+
+def build_digest(
+    corporation: Corporation,
+    lines: List[str],
+    suppressed: int = 0,
+) -> str:
+    shown = lines[:DIGEST_MAX_LINES]
+    hidden = len(lines) - len(shown) + suppressed
+    message = "\n".join(shown)
+    if hidden:
+        message += f"\n... and {hidden} more alert(s) for {corporation.corporation_name}"
+    return message
+
+
+def deliver_alerts(corporation: Corporation, rules: Dict[int, AlertRule], alerts: List[dict]) -> int:
+    """
+    Send one digest per user (and one to the webhook) for a sync's alerts.
+
+    Args:
+        corporation: Corporation the alerts belong to
+        rules: Active AlertRules by ID, with notify_users prefetched
+        alerts: alert_payload dicts with type_name, for rules in ``rules``
+
+    Returns:
+        Number of notifications created
+    """
+    alerts, suppressed = apply_rate_limits(alerts)
+    if not alerts and not suppressed:
+        return 0
+
+    lines_by_rule = defaultdict(list)
+    for alert in alerts:
+        rule = rules[alert["rule_id"]]
+        lines_by_rule[rule.pk].append(format_alert(rule, alert))
+
+    created = 0
+    if app_settings.CORPINVENTORY_ENABLE_NOTIFICATIONS:
+        user_lines = defaultdict(list)
+        user_suppressed = defaultdict(int)
+        users = {}
+        for rule in rules.values():
+            for user in rule.notify_users.all():
+                users[user.pk] = user
+                user_lines[user.pk].extend(lines_by_rule.get(rule.pk, ()))
+                user_suppressed[user.pk] += suppressed.get(rule.pk, 0)
+
+        notifications = []
+        for user_pk, user in users.items():
+            count = len(user_lines[user_pk]) + user_suppressed[user_pk]
+            if not count:
+                continue
+            notifications.append(Notification(
+                user=user,
+                level=Notification.Level.WARNING,
+                title=f"Corp Inventory: {count} alert(s) for {corporation.corporation_name}",
+                message=build_digest(
+                    corporation, user_lines[user_pk], user_suppressed[user_pk]
+                ),
+            ))
+        Notification.objects.bulk_create(notifications)
+        # bulk_create skips Notification.save(), which resets the unread badge
+        for notification in notifications:
+            Notification.objects.invalidate_user_notification_cache(notification.user.pk)
+        created = len(notifications)
+
+    if app_settings.CORPINVENTORY_ALERT_WEBHOOK_URL:
+        lines = [line for rule_lines in lines_by_rule.values() for line in rule_lines]
+        send_webhook(corporation, lines, alerts, sum(suppressed.values()))
+
+    logger.info(
+        f"Delivered {len(alerts)} alert(s) for {corporation.corporation_name} "
+        f"as {created} notification(s)"
+        + (f", {sum(suppressed.values())} over the rate limit" if suppressed else "")
+    )
+    return created
+
+
+def send_webhook(corporation: Corporation, lines: List[str], alerts: List[dict], suppressed: int):
+    """
+    POST the sync's digest to CORPINVENTORY_ALERT_WEBHOOK_URL.
+
+    ``content`` is Discord-compatible text; ``alerts`` carries the raw
+    alert payloads for other consumers. Failures are logged, not raised.
+    """
+    body = {
+        "content": (
+            f"**Corp Inventory: {len(alerts) + suppressed} alert(s) for "
+            f"{corporation.corporation_name}**\n"
+            + build_digest(corporation, lines, suppressed)
+        )[:2000],
+        "corporation_id": corporation.corporation_id,
+        "alerts": alerts,
+    }
+    try:
+        response = requests.post(
+            app_settings.CORPINVENTORY_ALERT_WEBHOOK_URL, json=body, timeout=WEBHOOK_TIMEOUT
+        )
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning(f"Alert webhook failed for {corporation.corporation_name}: {e}")
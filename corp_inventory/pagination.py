@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination for the transaction and container-log views
+
+OFFSET pagination makes the database walk and discard every skipped row, so
+deep pages get slower the further back you go. Here each page is fetched with
+a range condition on ``(timestamp, id)`` that continues from the last row of
+the previous page, which the ``(corporation, -timestamp)`` indexes answer by
+seeking straight to the cursor. Page 1000 costs the same as page one.
+
+Cursors are opaque URL-safe strings encoding the timestamp and id of the row
+at the page boundary.
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.http import QueryDict
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def encode_cursor(timestamp: datetime, pk: int) -> str:
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Return (timestamp, id) for a cursor, or None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """One page of rows plus the query strings for its neighbours."""
+
+    object_list: List
+    next_query: Optional[str] = None
+    previous_query: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_query is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_query is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_paginate(
+    queryset: QuerySet,
+    time_field: str,
+    params: QueryDict,
+    per_page: int = DEFAULT_PAGE_SIZE,
+) -> KeysetPage:
+    """
+    Return one newest-first page of ``queryset``.
+
+    ``params`` are the request's GET parameters. ``after`` continues with
+    older rows than its cursor, ``before`` goes back to newer rows; all other
+    parameters (the view's filters) are carried over into the next / previous
+    links.
+
+    Args:
+        queryset: Filtered, unordered QuerySet
+        time_field: Timestamp field the page is ordered on (newest first)
+        params: request.GET
+        per_page: Rows per page
+
+    Returns:
+        KeysetPage
+    """
+    after = decode_cursor(params.get("after", ""))
+    before = None if after else decode_cursor(params.get("before", ""))
+
+    if before:
+        timestamp, pk = before
+        # Walk forward in time from the cursor, then flip back to newest first
+        rows = list(
+            seek(queryset, time_field, timestamp, pk, older=False)
+            .order_by(time_field, "id")[: per_page + 1]
+        )
+        more_newer = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        more_older = True
+    else:
+        if after:
+            timestamp, pk = after
+            queryset = seek(queryset, time_field, timestamp, pk, older=True)
+        rows = list(queryset.order_by(f"-{time_field}", "-id")[: per_page + 1])
+        more_older = len(rows) > per_page
+        rows = rows[:per_page]
+        more_newer = after is not None
+
+    page = KeysetPage(object_list=rows)
+    if rows and more_older:
+        last = rows[-1]
+        page.next_query = _with_cursor(params, "after", getattr(last, time_field), last.pk)
+    if rows and more_newer:
+        first = rows[0]
+        page.previous_query = _with_cursor(
+            params, "before", getattr(first, time_field), first.pk
+        )
+    return page
+
+
+def seek(queryset: QuerySet, time_field: str, timestamp: datetime, pk: int, older: bool) -> QuerySet:
+    """
+    Rows strictly older (or newer) than the ``(timestamp, pk)`` cursor.
+
+    The plain ``time < ts OR (time = ts AND id < pk)`` condition cannot be
+    used as an index range, so the database would scan from the newest row
+    and filter. The redundant ``time <= ts`` bound ANDed in front gives it a
+    range to seek to; the OR then only discards the rows sharing ``ts``.
+    """
+    if older:
+        return queryset.filter(
+            Q(**{f"{time_field}__lte": timestamp}),
+            Q(**{f"{time_field}__lt": timestamp}) | Q(**{time_field: timestamp, "id__lt": pk}),
+        )
+    return queryset.filter(
+        Q(**{f"{time_field}__gte": timestamp}),
+        Q(**{f"{time_field}__gt": timestamp}) | Q(**{time_field: timestamp, "id__gt": pk}),
+    )
+
+
+def _with_cursor(params: QueryDict, key: str, timestamp: datetime, pk: int) -> str:
+    query = params.copy()
+    query.pop("after", None)
+    query.pop("before", None)
+    query[key] = encode_cursor(timestamp, pk)
+    return query.urlencode()
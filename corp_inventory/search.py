@@ -0,0 +1,150 @@
+"""
+Text search backends for Corp Inventory
+
+The hangar, transaction and container-log views filter on item, location and
+character names. A plain ``icontains`` compiles to a leading-wildcard LIKE
+that cannot use a B-tree index, so every search walks the whole table.
+
+Migrations 0007 and 0008 add database-specific search indexes (item names
+live on ItemType, so type searches go through ``type__name``):
+
+  * PostgreSQL — ``pg_trgm`` GIN indexes on ``UPPER(column)``, which the
+    planner uses directly for Django's ``icontains`` (``UPPER(col) LIKE ...``).
+  * MySQL / MariaDB — FULLTEXT indexes, queried with ``MATCH ... AGAINST``
+    in boolean mode using word-prefix terms. This matches the start of words
+    rather than any substring: "trit" finds "Tritanium", "itanium" does not.
+
+Any other database (SQLite in tests, etc.) uses the portable LIKE backend.
+"""
+
+import logging
+import re
+from functools import reduce
+from operator import or_
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import BooleanField, F, Func, Q, QuerySet, Value
+
+from . import app_settings
+
+logger = logging.getLogger(__name__)
+
+
+class MatchAgainst(Func):
+    """
+    MySQL ``MATCH (col) AGAINST (%s IN BOOLEAN MODE)`` as a filterable
+    boolean expression.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, field: str, query: str):
+        super().__init__(F(field), Value(query))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column_sql, column_params = compiler.compile(self.source_expressions[0])
+        query_sql, query_params = compiler.compile(self.source_expressions[1])
+        sql = f"MATCH ({column_sql}) AGAINST ({query_sql} IN BOOLEAN MODE)"
+        return sql, (*column_params, *query_params)
+
+
+class LikeSearchBackend:
+    """
+    Portable fallback: OR of ``icontains`` lookups over the given fields.
+    """
+
+    name = "like"
+
+    def filter(self, queryset: QuerySet, query: str, fields: Iterable[str]) -> QuerySet:
+        """
+        Restrict ``queryset`` to rows where any of ``fields`` matches ``query``.
+
+        Args:
+            queryset: QuerySet to filter
+            query: Raw user search string
+            fields: Field lookups (may span relations, e.g. ``location__location_name``)
+
+        Returns:
+            Filtered QuerySet (unchanged if the query is blank)
+        """
+        query = (query or "").strip()
+        if not query:
+            return queryset
+        return queryset.filter(self.condition(query, fields))
+
+    def condition(self, query: str, fields: Iterable[str]) -> Q:
+        return reduce(or_, (Q(**{f"{field}__icontains": query}) for field in fields))
+
+
+class TrigramSearchBackend(LikeSearchBackend):
+    """
+    PostgreSQL backend. The SQL is the same ``UPPER(col) LIKE UPPER(%s)`` that
+    ``icontains`` produces; the ``gin_trgm_ops`` expression indexes let the
+    planner answer it without a sequential scan.
+    """
+
+    name = "trigram"
+
+
+class FullTextSearchBackend(LikeSearchBackend):
+    """
+    MySQL / MariaDB backend using the FULLTEXT search indexes.
+
+    Each word of the query becomes a required prefix term (``+word*``), so
+    "cap nav" matches "Caldari Navy Capacitor Booster". Queries made only of
+    words shorter than the server's minimum token size fall back to LIKE,
+    since InnoDB would silently ignore those terms.
+
+    Only the first field is matched with FULLTEXT. MySQL cannot use a
+    FULLTEXT index for a column ORed with it, so the other fields keep the
+    substring LIKE match.
+    """
+
+    name = "fulltext"
+
+    # innodb_ft_min_token_size defaults to 3
+    min_token_size = 3
+
+    # Characters with a meaning in boolean-mode syntax
+    _operator_chars = re.compile(r'[+\-<>()~*"@]+')
+
+    def condition(self, query: str, fields: Iterable[str]) -> Q:
+        words = self._operator_chars.sub(" ", query).split()
+        terms = [w for w in words if len(w) >= self.min_token_size]
+        if not terms or len(terms) != len(words):
+            return super().condition(query, fields)
+        boolean_query = " ".join(f"+{term}*" for term in terms)
+        first, *others = fields
+        condition = Q(MatchAgainst(first, boolean_query))
+        if others:
+            condition |= super().condition(query, others)
+        return condition
+
+
+_BACKENDS = {
+    backend.name: backend
+    for backend in (LikeSearchBackend, TrigramSearchBackend, FullTextSearchBackend)
+}
+
+_VENDOR_DEFAULTS = {
+    "postgresql": TrigramSearchBackend,
+    "mysql": FullTextSearchBackend,
+}
+
+
+def get_search_backend() -> LikeSearchBackend:
+    """
+    Return the search backend for the default database connection.
+
+    ``CORPINVENTORY_SEARCH_BACKEND`` selects a backend by name ("like",
+    "trigram", "fulltext"); "auto" picks one from the database vendor.
+    """
+    name = app_settings.CORPINVENTORY_SEARCH_BACKEND
+    if name == "auto":
+        return _VENDOR_DEFAULTS.get(connection.vendor, LikeSearchBackend)()
+    try:
+        return _BACKENDS[name]()
+    except KeyError:
+        logger.warning(f"Unknown CORPINVENTORY_SEARCH_BACKEND '{name}', using LIKE search")
+        return LikeSearchBackend()
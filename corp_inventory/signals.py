@@ -6,10 +6,11 @@ Automatically adds corporations when characters authenticate via ESI
 import logging
 
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from allianceauth.eveonline.models import EveCharacter
 
-from .models import Corporation
+from .caching import bump_generation
+from .models import AlertRule, Corporation
 
 logger = logging.getLogger(__name__)
 
@@ -64,3 +65,13 @@ def auto_add_corporation(sender, instance, created, **kwargs):
             f"Error auto-adding corporation for character {instance.character_name}: {e}",
             exc_info=True
         )
+
+
+@receiver(post_save, sender=AlertRule)
+@receiver(post_delete, sender=AlertRule)
+def invalidate_alert_rule_cache(sender, instance, **kwargs):
+    """
+    Alert rules are listed on the cached statistics page, so changing one
+    invalidates its corporation's cached page data.
+    """
+    bump_generation(instance.corporation_id)
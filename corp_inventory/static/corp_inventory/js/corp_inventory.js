@@ -15,6 +15,9 @@
             this.initDataTables();
             this.initModals();
             this.initCorpSearch();
+            this.initStatsCharts();
+            this.initLocationSections();
+            this.initGlobalSearch();
         },
 
         /**
@@ -110,10 +113,104 @@
          */
         initDataTables: function() {
             if ($.fn.DataTable && $('.hangar-table').length) {
-                $('.hangar-table').DataTable({
+                // Rows are paged, sorted and searched server-side; the ajax URL
+                // already carries the page's division / location / search / group
+                // filters. Grouped rows are per-type totals that link to their stacks.
+                var $hangar = $('.hangar-table');
+                var esc = CorpInventory.escapeHtml;
+                var detailsUrl = $hangar.data('details-url');
+                var locationUrl = $hangar.data('location-url');
+                var group = $hangar.data('group') || '';
+                var byLocation = group === 'location' || group === 'division';
+                var byDivision = group === 'division';
+                $hangar.DataTable({
+                    serverSide: true,
+                    processing: true,
+                    ajax: $hangar.data('ajax-url'),
+                    searchDelay: 350,
                     order: [[0, 'asc']],
                     pageLength: 50,
-                    lengthMenu: [[25, 50, 100, -1], [25, 50, 100, "All"]],
+                    lengthMenu: [25, 50, 100, 250, 500],
+                    columns: [
+                        {
+                            data: 'type_name',
+                            render: function(data, type, row) {
+                                var html = '<img src="https://images.evetech.net/types/' + row.type_id +
+                                    '/icon?size=32" alt="' + esc(data) + '" class="item-icon"' +
+                                    ' onerror="this.style.display=\'none\'"> <strong>' + esc(data) + '</strong>';
+                                if (row.is_blueprint_copy) {
+                                    html += ' <span class="badge bg-info text-dark">BPC</span>';
+                                }
+                                return html;
+                            }
+                        },
+                        {
+                            data: 'quantity',
+                            render: $.fn.dataTable.render.number(',', '.', 0)
+                        },
+                        {
+                            data: 'location',
+                            defaultContent: '',
+                            orderable: !group || byLocation,
+                            render: function(data, type, row) {
+                                if (group && !byLocation) {
+                                    return '<em class="text-muted">All locations</em>';
+                                }
+                                var html = '<a href="' + locationUrl.replace('/0/', '/' + row.location_id + '/') +
+                                    '">' + esc(data) + '</a>';
+                                if (row.solar_system) {
+                                    html += '<br><small class="text-muted">' + esc(row.solar_system) + '</small>';
+                                }
+                                return html;
+                            }
+                        },
+                        {
+                            data: 'division',
+                            defaultContent: '',
+                            orderable: !group || byDivision,
+                            render: function(data) {
+                                if (group && !byDivision) {
+                                    return '<em class="text-muted">All divisions</em>';
+                                }
+                                return data ? esc(data) : '<em class="text-muted">N/A</em>';
+                            }
+                        },
+                        {
+                            data: 'value',
+                            className: 'text-end',
+                            render: function(data) {
+                                return '<span class="isk-value">' +
+                                    $.fn.dataTable.render.number(',', '.', 2).display(data) + '</span>';
+                            }
+                        },
+                        group ? {
+                            data: 'stacks',
+                            render: $.fn.dataTable.render.number(',', '.', 0)
+                        } : {
+                            data: 'last_seen',
+                            render: function(data) {
+                                return '<small>' + esc(data) + '</small>';
+                            }
+                        },
+                        group ? {
+                            data: 'stacks_url',
+                            orderable: false,
+                            searchable: false,
+                            render: function(data) {
+                                return '<a href="' + esc(data) + '" class="btn btn-sm btn-secondary">' +
+                                    '<i class="fas fa-layer-group"></i> Stacks</a>';
+                            }
+                        } : {
+                            data: 'item_id',
+                            orderable: false,
+                            searchable: false,
+                            render: function(data) {
+                                return '<a href="' + detailsUrl.replace('/0/', '/' + data + '/') +
+                                    '" class="btn btn-sm btn-secondary">' +
+                                    '<i class="fas fa-info-circle"></i> Details</a>';
+                            }
+                        }
+                    ],
                     layout: {
                         topStart: 'pageLength',
                         topEnd: 'search',
@@ -124,15 +221,15 @@
             }
 
             if ($.fn.DataTable && $('.transaction-table').length) {
+                // Rows arrive one server-side (keyset) page at a time
                 $('.transaction-table').DataTable({
                     order: [[0, 'desc']],
-                    pageLength: 50,
-                    lengthMenu: [[25, 50, 100, -1], [25, 50, 100, "All"]],
+                    paging: false,
                     layout: {
-                        topStart: 'pageLength',
+                        topStart: null,
                         topEnd: 'search',
                         bottomStart: 'info',
-                        bottomEnd: 'paging'
+                        bottomEnd: null
                     }
                 });
             }
@@ -143,13 +240,11 @@
          */
         initModals: function() {
             // Delete confirmation
-            $('.btn-delete-corp').on('click', function(e) {
-                e.preventDefault();
+            $('.corp-delete-form').on('submit', function(e) {
                 var corpName = $(this).data('corp-name');
-                var href = $(this).attr('href');
                 
-                if (confirm('Are you sure you want to remove tracking for ' + corpName + '? This will delete all stored data.')) {
-                    window.location.href = href;
+                if (!confirm('Are you sure you want to remove tracking for ' + corpName + '? This will delete all stored data.')) {
+                    e.preventDefault();
                 }
             });
 
@@ -178,6 +273,177 @@
                     }
                 });
             });
+
+            // Refresh removal progress while a corporation is being deleted
+            if ($('.corp-pending-delete').length) {
+                setTimeout(function() {
+                    location.reload();
+                }, 10000);
+            }
+        },
+
+        /**
+         * Statistics page history charts.
+         *
+         * Daily series are fetched from the statistics API only once the page
+         * has loaded, and again whenever the range selector changes.
+         */
+        initStatsCharts: function() {
+            var $card = $('#stats-history');
+            if (!$card.length) return;   // not on statistics page
+
+            var load = function() {
+                var days = $('#stats-range').val();
+                $('.stats-chart').html('<i class="fas fa-circle-notch fa-spin text-muted"></i>');
+
+                $.getJSON($card.data('value-url'), {days: days}, function(data) {
+                    CorpInventory.drawChart($('#chart-value'), data.series, [
+                        {key: 'total_value', label: 'Value (ISK)', color: '#0d6efd'}
+                    ], 'line');
+                });
+                $.getJSON($card.data('transactions-url'), {days: days}, function(data) {
+                    CorpInventory.drawChart($('#chart-transactions'), data.series, [
+                        {key: 'ADD', label: 'Additions', color: '#198754'},
+                        {key: 'REMOVE', label: 'Removals', color: '#dc3545'},
+                        {key: 'CHANGE', label: 'Changes', color: '#ffc107'},
+                        {key: 'MOVE', label: 'Moves', color: '#0dcaf0'}
+                    ], 'stacked');
+                    CorpInventory.drawChart($('#chart-flows'), data.series, [
+                        {key: 'value_added', label: 'Added (ISK)', color: '#198754'},
+                        {key: 'value_removed', label: 'Removed (ISK)', color: '#dc3545'}
+                    ], 'line');
+                });
+            };
+
+            $('#stats-range').on('change', load);
+            load();
+        },
+
+        /**
+         * Location page: each corporation section loads its item list on
+         * demand, one page (optionally one division) at a time.
+         */
+        initLocationSections: function() {
+            var load = function($section, division, page) {
+                var $target = $section.find('.location-items');
+                $target.html('<i class="fas fa-circle-notch fa-spin text-muted"></i>');
+                $.get($section.data('items-url'), {division: division, page: page || 1}, function(html) {
+                    $target.html(html);
+                }).fail(function() {
+                    $target.html('<div class="alert alert-danger">Could not load items.</div>');
+                });
+            };
+
+            $('.location-section').on('click', '.location-items-load, .location-items-page', function(e) {
+                e.preventDefault();
+                var $link = $(this);
+                load($link.closest('.location-section'), $link.data('division'), $link.data('page'));
+            });
+        },
+
+        /**
+         * Draw a minimal SVG chart of daily series.
+         *
+         * kind is 'line' (one polyline per dataset) or 'stacked' (stacked bars).
+         */
+        drawChart: function($el, series, datasets, kind) {
+            if (!series.length) {
+                $el.html('<p class="text-muted">No data for this period.</p>');
+                return;
+            }
+            var width = 800, height = 200, pad = 4;
+            var step = width / series.length;
+            var max = 0;
+            series.forEach(function(row) {
+                var total = 0;
+                datasets.forEach(function(ds) {
+                    total = kind === 'stacked' ? total + row[ds.key] : Math.max(total, row[ds.key]);
+                });
+                max = Math.max(max, total);
+            });
+            max = max || 1;
+            var y = function(v) { return height - pad - (v / max) * (height - 2 * pad); };
+            var esc = CorpInventory.escapeHtml;
+            var svg = '';
+
+            if (kind === 'stacked') {
+                series.forEach(function(row, i) {
+                    var base = 0;
+                    datasets.forEach(function(ds) {
+                        var v = row[ds.key];
+                        if (!v) return;
+                        svg += '<rect x="' + (i * step + 1) + '" y="' + y(base + v) +
+                            '" width="' + Math.max(step - 2, 1) + '" height="' + (y(base) - y(base + v)) +
+                            '" fill="' + ds.color + '"><title>' + esc(row.day + ' ' + ds.label + ': ' +
+                            formatNumber(v)) + '</title></rect>';
+                        base += v;
+                    });
+                });
+            } else {
+                datasets.forEach(function(ds) {
+                    var points = series.map(function(row, i) {
+                        return (i * step + step / 2) + ',' + y(row[ds.key]);
+                    });
+                    svg += '<polyline fill="none" stroke-width="2" stroke="' + ds.color +
+                        '" points="' + points.join(' ') + '"></polyline>';
+                    series.forEach(function(row, i) {
+                        svg += '<circle r="3" cx="' + (i * step + step / 2) + '" cy="' + y(row[ds.key]) +
+                            '" fill="' + ds.color + '"><title>' + esc(row.day + ' ' + ds.label + ': ' +
+                            formatNumber(row[ds.key])) + '</title></circle>';
+                    });
+                });
+            }
+
+            var legend = datasets.map(function(ds) {
+                return '<span class="me-3"><i class="fas fa-square" style="color:' + ds.color + '"></i> ' +
+                    esc(ds.label) + '</span>';
+            }).join('');
+            $el.html(
+                '<svg viewBox="0 0 ' + width + ' ' + height + '" preserveAspectRatio="none" ' +
+                'width="100%" height="' + height + '">' + svg + '</svg>' +
+                '<div class="d-flex justify-content-between text-muted small">' +
+                '<span>' + esc(series[0].day) + '</span><span>' + legend + '</span>' +
+                '<span>' + esc(series[series.length - 1].day) + '</span></div>'
+            );
+        },
+
+        /**
+         * Global item search: type-ahead suggestions from the type index.
+         * Requests are debounced and a stale request is aborted when the
+         * user keeps typing.
+         */
+        initGlobalSearch: function() {
+            var $input = $('#global-search');
+            if (!$input.length) return;   // not on search page
+
+            var $list = $('#global-search-types');
+            var timer = null;
+            var pending = null;
+
+            $input.on('input', function() {
+                var query = $.trim($input.val());
+                clearTimeout(timer);
+                if (pending) {
+                    pending.abort();
+                    pending = null;
+                }
+                if (query.length < 2) {
+                    $list.empty();
+                    return;
+                }
+                timer = setTimeout(function() {
+                    pending = $.getJSON($input.data('autocomplete-url'), {q: query})
+                        .done(function(response) {
+                            var esc = CorpInventory.escapeHtml;
+                            $list.html($.map(response.results, function(result) {
+                                return '<option value="' + esc(result.name) + '">';
+                            }).join(''));
+                        })
+                        .always(function() {
+                            pending = null;
+                        });
+                }, 150);
+            });
         },
 
         /**
@@ -214,6 +480,14 @@
             }, 5000);
         },
 
+        /**
+         * Escape text for insertion into HTML
+         */
+        escapeHtml: function(text) {
+            return $('<div>').text(text == null ? '' : String(text)).html()
+                .replace(/"/g, '&quot;');
+        },
+
         /**
          * Get CSRF cookie
          */
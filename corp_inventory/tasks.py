@@ -3,12 +3,15 @@ Celery tasks for Corp Inventory
 """
 
 import logging
+from collections import defaultdict
 from datetime import timedelta
 from decimal import Decimal
 
 from celery import shared_task
 from django.apps import apps
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db import transaction
 from esi.models import Token
 
@@ -20,13 +23,44 @@ from .models import (
     HangarItem,
     HangarTransaction,
     HangarSnapshot,
+    HangarTypeTotal,
     AlertRule,
+    ItemType,
 )
 from .managers import CorpInventoryManager, PriceManager
+from .alerts import (
+    alert_payload,
+    compile_rules,
+    evaluate_aggregate_rules,
+    rule_matches,
+)
+from .asset_tree import build_asset_tree, subtree_totals
+from .attribution import attribute_transactions
+from .caching import bump_generation
+from .notifications import deliver_alerts
+from .type_index import rebuild_type_index
 from . import app_settings
 
 logger = logging.getLogger(__name__)
 
+# Rows removed per DELETE when a corporation is deleted in the background
+DELETE_BATCH_SIZE = 5000
+DELETION_PROGRESS_KEY = "corp_inventory:deletion:{}"
+
+# Transaction IDs per UPDATE when flagging alerted transactions
+ALERT_UPDATE_BATCH_SIZE = 1000
+
+# Child tables of a corporation, in the order they are emptied
+CORPORATION_CHILD_MODELS = (
+    ContainerLog,
+    HangarTransaction,
+    HangarSnapshot,
+    HangarItem,
+    HangarTypeTotal,
+    AlertRule,
+    HangarDivision,
+)
+
 
 @shared_task
 def cleanup_old_data():
@@ -34,14 +68,17 @@ def cleanup_old_data():
     Prune old HangarSnapshot and HangarTransaction rows to keep DB lean.
 
     Keeps only the last 48 snapshots per corporation (48 × 30 min = 24 h of history).
-    Deletes HangarTransaction records older than 90 days.
+    Deletes HangarTransaction records older than 90 days. When
+    CORPINVENTORY_ARCHIVE_PATH is set, expired transactions and container logs
+    are written to the compressed archive first (see archive.py).
     Run daily via Celery Beat.
     """
-    from django.db.models import OuterRef, Subquery
+    from .archive import archive_and_delete, archive_enabled
 
     corps = Corporation.objects.filter(tracking_enabled=True)
     total_snaps_deleted = 0
     total_trans_deleted = 0
+    total_logs_archived = 0
 
     for corp in corps:
         # Keep the 48 most recent snapshots, delete the rest
@@ -57,23 +94,97 @@ def cleanup_old_data():
         )
         total_snaps_deleted += deleted
 
-        # Delete transactions older than 90 days
+        # Archive (if configured) and delete transactions older than 90 days
         cutoff = timezone.now() - timedelta(days=90)
-        deleted, _ = HangarTransaction.objects.filter(
-            corporation=corp, detected_at__lt=cutoff
-        ).delete()
-        total_trans_deleted += deleted
+        if archive_enabled():
+            total_trans_deleted += archive_and_delete("transactions", corp, cutoff)
+            total_logs_archived += archive_and_delete("container_logs", corp, cutoff)
+        else:
+            deleted, _ = HangarTransaction.objects.filter(
+                corporation=corp, detected_at__lt=cutoff
+            ).delete()
+            total_trans_deleted += deleted
 
     logger.info(
         f"cleanup_old_data: removed {total_snaps_deleted} old snapshots, "
-        f"{total_trans_deleted} old transactions"
+        f"{total_trans_deleted} old transactions, "
+        f"{total_logs_archived} archived container logs"
     )
+    # Resume background deletions whose worker died part-way
+    for corporation_pk in Corporation.objects.filter(
+        pending_delete=True
+    ).values_list("pk", flat=True):
+        delete_corporation_data.delay(corporation_pk)
+
     return {
         "snapshots_deleted": total_snaps_deleted,
         "transactions_deleted": total_trans_deleted,
+        "container_logs_archived": total_logs_archived,
     }
 
 
+@shared_task
+def delete_corporation_data(corporation_pk: int):
+    """
+    Delete a corporation marked ``pending_delete`` and all its data.
+
+    Child rows are removed table by table in batches of DELETE_BATCH_SIZE
+    primary keys, each in its own short transaction, so no single statement
+    locks or loads a whole table. Progress is kept in the cache for the
+    manage page. Safe to run again after an interruption.
+
+    Args:
+        corporation_pk: Corporation primary key (not the EVE ID)
+
+    Returns:
+        Dict with the number of rows deleted per model
+    """
+    corporation = Corporation.objects.filter(pk=corporation_pk, pending_delete=True).first()
+    if corporation is None:
+        return {"status": "skipped", "deleted": {}}
+
+    progress_key = DELETION_PROGRESS_KEY.format(corporation_pk)
+    deleted = {}
+    total = 0
+    for model in CORPORATION_CHILD_MODELS:
+        name = model._meta.verbose_name_plural
+        deleted[name] = 0
+        while True:
+            ids = list(
+                model.objects.filter(corporation_id=corporation_pk)
+                # Not Meta.ordering, which would sort the remaining rows per batch
+                .order_by("pk")
+                .values_list("pk", flat=True)[:DELETE_BATCH_SIZE]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                model.objects.filter(pk__in=ids).delete()
+            deleted[name] += len(ids)
+            total += len(ids)
+            cache.set(progress_key, {"step": str(name), "deleted": total}, 86400)
+
+    corporation.delete()
+    cache.delete(progress_key)
+    logger.info(
+        f"Deleted corporation {corporation.corporation_name} "
+        f"({corporation.corporation_id}) and {total} row(s) of data"
+    )
+    return {"status": "success", "deleted": deleted}
+
+
+@shared_task
+def refresh_type_index():
+    """Rebuild the type-ahead index outside the request that changed it."""
+    rebuild_type_index()
+
+
+def get_deletion_progress(corporation_pks) -> dict:
+    """Progress of running background deletions, by corporation primary key."""
+    keys = {DELETION_PROGRESS_KEY.format(pk): pk for pk in corporation_pks}
+    return {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+
 @shared_task(bind=True)
 def sync_all_corporations(self):
     """
@@ -137,15 +248,20 @@ def sync_corporation_hangar(corporation_id: int):
         if not assets:
             msg = f"No assets returned for {corporation.corporation_name}"
             logger.warning(msg)
-            corporation.last_sync = timezone.now()
-            corporation.save()
+            if not _sync_cancelled(corporation):
+                corporation.last_sync = timezone.now()
+                corporation.save(update_fields=["last_sync"])
+                bump_generation(corporation.pk)
             return {"status": "warning", "message": msg, "assets_count": 0}
         
         # Get market prices for valuation
         market_prices = PriceManager.get_market_prices()
         
-        # Process assets and detect changes
+        # Process assets and detect changes; the row lock holds off a
+        # deletion until the assets are written
         with transaction.atomic():
+            if _sync_cancelled(corporation, lock=True):
+                return _cancelled_result(corporation)
             items_count = process_assets(corporation, assets, market_prices, token)
 
         # Sync corp wallet balance (master wallet = division 1)
@@ -164,12 +280,23 @@ def sync_corporation_hangar(corporation_id: int):
                 f"Could not sync wallet for {corporation.corporation_name}: {wallet_err}"
             )
 
-        # Update last sync time
+        # Update last sync time; only the fields the sync owns, so a deletion
+        # or disable made meanwhile is not written back
+        if _sync_cancelled(corporation):
+            return _cancelled_result(corporation)
         corporation.last_sync = timezone.now()
-        corporation.save()
+        corporation.save(update_fields=["last_sync", "wallet_balance"])
 
         # Sync container access logs (best-effort — requires container logs scope)
+        if _sync_cancelled(corporation):
+            return _cancelled_result(corporation)
         sync_container_logs(corporation, token)
+
+        # Fill in who made the changes, from the container logs just stored
+        attribute_transactions(corporation)
+
+        # Cached page data for this corporation is now stale
+        bump_generation(corporation.pk)
         
         msg = f"Completed sync for {corporation.corporation_name} - {items_count} items processed"
         logger.info(msg)
@@ -185,6 +312,29 @@ def sync_corporation_hangar(corporation_id: int):
         return {"status": "error", "message": msg}
 
 
+def _sync_cancelled(corporation: Corporation, lock: bool = False) -> bool:
+    """
+    Whether the corporation was disabled or marked for deletion mid-sync.
+
+    Args:
+        corporation: Corporation being synced
+        lock: Lock the corporation row until the current transaction ends
+
+    Returns:
+        True if the sync must stop without writing
+    """
+    corporations = Corporation.objects.filter(pk=corporation.pk)
+    if lock:
+        corporations = corporations.select_for_update()
+    return not corporations.filter(tracking_enabled=True, pending_delete=False).exists()
+
+
+def _cancelled_result(corporation: Corporation) -> dict:
+    msg = f"Sync of {corporation.corporation_name} stopped: disabled or being removed"
+    logger.info(msg)
+    return {"status": "skipped", "message": msg}
+
+
 def get_corporation_token(corporation_id: int) -> Token:
     """
     Get a valid ESI token for a corporation
@@ -233,8 +383,8 @@ def sync_container_logs(corporation: Corporation, token: Token):
     """
     Sync container access logs for a corporation.
 
-    Fetches up to 1 000 log entries per page from ESI and upserts them into
-    ContainerLog. The model's unique_together constraint prevents duplicates.
+    Fetches up to 1 000 log entries per page from ESI and stores the new ones
+    with store_container_logs.
 
     Requires scope: esi-corporations.read_container_logs.v1
     """
@@ -246,54 +396,7 @@ def sync_container_logs(corporation: Corporation, token: Token):
             logger.info(f"No container log entries for {corporation.corporation_name}")
             return
 
-        # Resolve type names for container types and item types we haven't seen yet
-        type_cache: dict = {}
-
-        def resolve_type(type_id):
-            if type_id is None:
-                return ""
-            if type_id not in type_cache:
-                info = CorpInventoryManager.get_type_info(type_id)
-                type_cache[type_id] = info.get("name", "") if info else ""
-            return type_cache[type_id]
-
-        created_count = 0
-        for entry in log_entries:
-            character_id = entry.get("character_id")  # ESI field name
-            if not character_id:
-                continue
-
-            # Resolve character name from AA's EveCharacter if possible
-            character_name = ""
-            try:
-                from allianceauth.eveonline.models import EveCharacter
-                char_obj = EveCharacter.objects.filter(character_id=character_id).first()
-                character_name = char_obj.character_name if char_obj else ""
-            except Exception:
-                pass
-
-            type_id = entry.get("type_id")
-            container_type_id = entry.get("container_type_id")
-
-            _, was_created = ContainerLog.objects.get_or_create(
-                corporation=corporation,
-                character_id=character_id,
-                container_id=entry.get("container_id", 0),
-                action=entry.get("action", ""),
-                type_id=type_id,
-                quantity=entry.get("quantity"),
-                logged_at=entry.get("logged_at"),
-                defaults={
-                    "character_name": character_name,
-                    "type_name": resolve_type(type_id),
-                    "container_type_id": container_type_id,
-                    "container_type_name": resolve_type(container_type_id),
-                    "location_id": entry.get("location_id"),
-                    "location_flag": entry.get("location_flag", ""),
-                },
-            )
-            if was_created:
-                created_count += 1
+        created_count = store_container_logs(corporation, log_entries)
 
         logger.info(
             f"Container logs for {corporation.corporation_name}: "
@@ -307,6 +410,83 @@ def sync_container_logs(corporation: Corporation, token: Token):
         )
 
 
+CONTAINER_LOG_FIELDS = (
+    "character_id", "container_id", "action", "type_id", "quantity", "logged_at",
+)
+
+
+def store_container_logs(corporation: Corporation, log_entries: list) -> int:
+    """
+    Store ESI container log entries that are not stored yet.
+
+    ESI returns the same events on every fetch, so entries are deduplicated
+    on the model's unique_together fields against the stored events of the
+    same time range (one query), then inserted in bulk.
+
+    Args:
+        corporation: Corporation the entries belong to
+        log_entries: Container log dicts as returned by ESI
+
+    Returns:
+        Number of entries created
+    """
+    # Make sure item and container types exist before referencing them
+    sync_item_types({
+        type_id
+        for entry in log_entries
+        for type_id in (entry.get("type_id"), entry.get("container_type_id"))
+        if type_id is not None
+    })
+
+    # Resolve character names from AA's EveCharacter in one query
+    from allianceauth.eveonline.models import EveCharacter
+    character_names = dict(
+        EveCharacter.objects.filter(
+            character_id__in={
+                entry.get("character_id") for entry in log_entries
+                if entry.get("character_id")
+            }
+        ).values_list("character_id", "character_name")
+    )
+
+    logs = {}
+    for entry in log_entries:
+        character_id = entry.get("character_id")  # ESI field name
+        if not character_id:
+            continue
+        logged_at = entry.get("logged_at")
+        if isinstance(logged_at, str):
+            logged_at = parse_datetime(logged_at)
+        log = ContainerLog(
+            corporation=corporation,
+            character_id=character_id,
+            character_name=character_names.get(character_id, ""),
+            container_id=entry.get("container_id", 0),
+            action=entry.get("action", ""),
+            type_id=entry.get("type_id"),
+            quantity=entry.get("quantity"),
+            logged_at=logged_at,
+            container_type_id=entry.get("container_type_id"),
+            location_id=entry.get("location_id"),
+            location_flag=entry.get("location_flag", ""),
+        )
+        logs.setdefault(tuple(getattr(log, field) for field in CONTAINER_LOG_FIELDS), log)
+    if not logs:
+        return 0
+
+    times = [key[-1] for key in logs]
+    stored = set(
+        ContainerLog.objects.filter(
+            corporation=corporation,
+            logged_at__gte=min(times),
+            logged_at__lte=max(times),
+        ).values_list(*CONTAINER_LOG_FIELDS)
+    )
+    new_logs = [log for key, log in logs.items() if key not in stored]
+    ContainerLog.objects.bulk_create(new_logs, batch_size=1000, ignore_conflicts=True)
+    return len(new_logs)
+
+
 def sync_divisions(corporation: Corporation, token: Token):
     """
     Sync hangar divisions for a corporation
@@ -333,6 +513,24 @@ def sync_divisions(corporation: Corporation, token: Token):
         logger.error(f"Error syncing divisions for {corporation.corporation_name}: {e}")
 
 
+CENT = Decimal("0.01")
+
+# HangarItem fields written by the sync for items it has seen before
+ITEM_SYNC_FIELDS = (
+    "quantity", "estimated_value", "location", "division", "is_active",
+    "location_flag", "parent_item_id", "depth", "tree_id", "lft", "rgt",
+    "subtree_quantity", "subtree_value",
+)
+
+
+def _item_state(item: HangarItem) -> tuple:
+    return (
+        item.quantity, item.estimated_value, item.location_id, item.division_id,
+        item.is_active, item.location_flag, item.parent_item_id, item.depth,
+        item.tree_id, item.lft, item.rgt, item.subtree_quantity, item.subtree_value,
+    )
+
+
 def resolve_station_id(asset_id: int, asset_map: dict) -> int:
     """
     Walk up the asset parent chain to find the real station/structure ID.
@@ -378,13 +576,11 @@ def process_assets(
     # Build a lookup map for the full asset list so we can walk the parent chain.
     asset_map = {int(a["item_id"]): a for a in assets}
 
-    # Filter for hangar items only (location_flag starts with 'CorpSAG')
-    hangar_assets = [
-        asset for asset in assets
-        if asset.get("location_flag", "").startswith("CorpSAG")
-    ]
+    # Hangar items (location_flag starts with 'CorpSAG') and everything
+    # nested in them, in tree order
+    tree = build_asset_tree(assets)
 
-    logger.info(f"Processing {len(hangar_assets)} hangar assets")
+    logger.info(f"Processing {len(tree)} hangar assets")
 
     # ------------------------------------------------------------------ #
     # 1. Resolve station/structure IDs and collect unique location/type IDs
@@ -393,15 +589,15 @@ def process_assets(
     locations_to_fetch = set()
     types_to_fetch = set()
 
-    for asset in hangar_assets:
-        item_id = int(asset["item_id"])
+    for node in tree:
+        item_id = node["item_id"]
         station_id = resolve_station_id(item_id, asset_map)
         asset_resolved_location[item_id] = station_id
         locations_to_fetch.add(station_id)
-        types_to_fetch.add(asset["type_id"])
+        types_to_fetch.add(node["asset"]["type_id"])
 
     logger.info(
-        f"Resolved {len(hangar_assets)} hangar assets to "
+        f"Resolved {len(tree)} hangar assets to "
         f"{len(locations_to_fetch)} unique location(s)"
     )
 
@@ -415,38 +611,9 @@ def process_assets(
             location_cache[loc_id] = location
 
     # ------------------------------------------------------------------ #
-    # 3. Build type-name cache — DB first, ESI only for unknowns
-    #    This avoids an ESI HTTP call for every type already seen before.
+    # 3. Make sure every type has an ItemType row (names resolved once)
     # ------------------------------------------------------------------ #
-    known_type_names = dict(
-        HangarItem.objects.filter(type_id__in=types_to_fetch)
-        .values_list('type_id', 'type_name')
-        .distinct()
-    )
-    type_cache = known_type_names.copy()
-    unknown_types = types_to_fetch - set(type_cache.keys())
-    if unknown_types:
-        # Bulk SDE lookup first — one DB query instead of N ESI HTTP calls.
-        # Falls back to ESI for any types not yet in the SDE (e.g. very new items).
-        if apps.is_installed("eve_sde"):
-            try:
-                from eve_sde.models import ItemType as _SDEItemType
-                sde_names = dict(
-                    _SDEItemType.objects.filter(id__in=unknown_types).values_list("id", "name")
-                )
-                type_cache.update(sde_names)
-                unknown_types -= set(sde_names.keys())
-                if sde_names:
-                    logger.debug(f"SDE resolved {len(sde_names)} type name(s)")
-            except Exception as sde_err:
-                logger.warning(f"SDE bulk type lookup failed, falling back to ESI: {sde_err}")
-
-        if unknown_types:
-            logger.info(f"Fetching {len(unknown_types)} new type name(s) from ESI")
-            for type_id in unknown_types:
-                type_info = CorpInventoryManager.get_type_info(type_id)
-                if type_info:
-                    type_cache[type_id] = type_info.get("name", f"Unknown Type {type_id}")
+    sync_item_types(types_to_fetch)
 
     # ------------------------------------------------------------------ #
     # 4. Prefetch all existing HangarItems and divisions into memory
@@ -454,6 +621,7 @@ def process_assets(
     existing_items = {
         item.item_id: item
         for item in HangarItem.objects.filter(corporation=corporation)
+        .select_related('location', 'division')
     }
     divisions_map = {
         div.division_id: div
@@ -461,23 +629,27 @@ def process_assets(
     }
 
     # ------------------------------------------------------------------ #
-    # 5. Mark all existing items inactive (single bulk UPDATE)
-    # ------------------------------------------------------------------ #
-    HangarItem.objects.filter(
-        corporation=corporation,
-        is_active=True
-    ).update(is_active=False)
-
-    # ------------------------------------------------------------------ #
-    # 6. Build lists for bulk writes
+    # 5. Build lists for bulk writes
     # ------------------------------------------------------------------ #
     items_to_update = []
     items_to_create = []
+    # item_id -> stored field values of existing items, to skip unchanged rows
+    stored_state = {}
+    # item_id -> HangarItem written by this sync
+    tracked_items = {}
+    # Items synced before the asset tree existed: their contents were never
+    # tracked, so finding them now is not an addition
+    untreed_items = {
+        item_id for item_id, item in existing_items.items() if item.lft is None
+    }
     transactions_to_create = []
     current_snapshot = {}
+    # (type_id, location pk, division pk) -> [quantity change, value change]
+    total_deltas = defaultdict(lambda: [0, Decimal(0)])
 
-    for asset in hangar_assets:
-        item_id = int(asset["item_id"])
+    for node in tree:
+        asset = node["asset"]
+        item_id = node["item_id"]
         type_id = asset["type_id"]
         quantity = asset.get("quantity", 1)
 
@@ -489,23 +661,29 @@ def process_assets(
             )
             continue
 
-        type_name = type_cache.get(type_id, f"Unknown Type {type_id}")
-
+        # Nested items belong to the division of their top-level container
         division = None
-        location_flag = asset.get("location_flag", "")
-        if location_flag.startswith("CorpSAG"):
-            try:
-                div_num = int(location_flag.replace("CorpSAG", ""))
-                division = divisions_map.get(div_num)
-            except ValueError:
-                pass
+        try:
+            div_num = int(node["hangar_flag"].replace("CorpSAG", ""))
+            division = divisions_map.get(div_num)
+        except ValueError:
+            pass
 
         unit_price = market_prices.get(type_id, 0)
-        estimated_value = Decimal(str(unit_price)) * quantity
+        estimated_value = (Decimal(str(unit_price)) * quantity).quantize(CENT)
 
         existing = existing_items.get(item_id)
         if existing:
             old_quantity = existing.quantity
+            stored_state[item_id] = _item_state(existing)
+
+            # Take the stack's previous state out of the running totals
+            if existing.is_active:
+                delta = total_deltas[
+                    (existing.type_id, existing.location_id, existing.division_id)
+                ]
+                delta[0] -= existing.quantity
+                delta[1] -= existing.estimated_value
 
             # Detect location change → MOVE transaction
             if existing.location_id != location.pk:
@@ -513,13 +691,14 @@ def process_assets(
                     corporation=corporation,
                     transaction_type="MOVE",
                     type_id=type_id,
-                    type_name=type_name,
                     old_quantity=old_quantity,
                     new_quantity=quantity,
                     quantity_change=0,
                     location=location,
+                    from_location_id=existing.location_id,
                     division=division,
                     estimated_value=estimated_value,
+                    item_id=item_id,
                 ))
 
             # Detect quantity change → CHANGE transaction
@@ -528,13 +707,13 @@ def process_assets(
                     corporation=corporation,
                     transaction_type="CHANGE",
                     type_id=type_id,
-                    type_name=type_name,
                     old_quantity=old_quantity,
                     new_quantity=quantity,
                     quantity_change=quantity - old_quantity,
                     location=location,
                     division=division,
                     estimated_value=estimated_value,
+                    item_id=item_id,
                 ))
             existing.quantity = quantity
             existing.estimated_value = estimated_value
@@ -542,12 +721,12 @@ def process_assets(
             existing.division = division
             existing.is_active = True
             items_to_update.append(existing)
+            item = existing
         else:
-            items_to_create.append(HangarItem(
+            item = HangarItem(
                 corporation=corporation,
                 item_id=item_id,
                 type_id=type_id,
-                type_name=type_name,
                 location=location,
                 division=division,
                 quantity=quantity,
@@ -555,65 +734,118 @@ def process_assets(
                 is_singleton=bool(asset.get("is_singleton")),
                 is_blueprint_copy=bool(asset.get("is_blueprint_copy")),
                 is_active=True,
-            ))
+            )
+            items_to_create.append(item)
+
+        if not existing and node["parent_item_id"] in untreed_items:
+            # Preorder: whatever is inside this item comes next
+            untreed_items.add(item_id)
+        elif not existing:
             transactions_to_create.append(HangarTransaction(
                 corporation=corporation,
                 transaction_type="ADD",
                 type_id=type_id,
-                type_name=type_name,
                 old_quantity=0,
                 new_quantity=quantity,
                 quantity_change=quantity,
                 location=location,
                 division=division,
                 estimated_value=estimated_value,
+                item_id=item_id,
             ))
 
+        item.location_flag = asset.get("location_flag", "")
+        item.parent_item_id = node["parent_item_id"]
+        item.depth = node["depth"]
+        item.tree_id = node["tree_id"]
+        item.lft = node["lft"]
+        item.rgt = node["rgt"]
+        tracked_items[item_id] = item
+
         current_snapshot[item_id] = {
             "type_id": type_id,
             "quantity": quantity,
             "value": float(estimated_value),
         }
+        delta = total_deltas[(type_id, location.pk, division.pk if division else None)]
+        delta[0] += quantity
+        delta[1] += estimated_value
+
+    # Stacks that were held before this sync and are gone now
+    vanished = []
+    for item_id, item in existing_items.items():
+        if item.is_active and item_id not in current_snapshot:
+            vanished.append(item)
+            delta = total_deltas[(item.type_id, item.location_id, item.division_id)]
+            delta[0] -= item.quantity
+            delta[1] -= item.estimated_value
+
+    # Container rollups: each item plus everything inside it
+    subtree = subtree_totals(tree, {
+        item_id: (item.quantity, item.estimated_value)
+        for item_id, item in tracked_items.items()
+    })
+    for item_id, item in tracked_items.items():
+        item.subtree_quantity, item.subtree_value = subtree[item_id]
+
+    # Only rows whose stored values change are written
+    items_to_update = [
+        item for item in items_to_update
+        if _item_state(item) != stored_state[item.item_id]
+    ]
 
     # ------------------------------------------------------------------ #
-    # 7. Bulk write items
+    # 6. Bulk write changed and new items
     # ------------------------------------------------------------------ #
     if items_to_update:
         HangarItem.objects.bulk_update(
-            items_to_update,
-            ['quantity', 'estimated_value', 'location', 'division', 'is_active'],
-            batch_size=500,
+            items_to_update, ITEM_SYNC_FIELDS, batch_size=500,
         )
     if items_to_create:
         HangarItem.objects.bulk_create(items_to_create, batch_size=500, ignore_conflicts=True)
 
     # ------------------------------------------------------------------ #
-    # 8. REMOVE transactions for items no longer in ESI (still is_active=False)
+    # 7. Deactivate items no longer in ESI, with a REMOVE transaction each
     # ------------------------------------------------------------------ #
-    for item in HangarItem.objects.filter(
-        corporation=corporation, is_active=False
-    ).select_related('location', 'division').iterator(chunk_size=200):
+    for start in range(0, len(vanished), 500):
+        HangarItem.objects.filter(
+            pk__in=[item.pk for item in vanished[start:start + 500]]
+        ).update(is_active=False)
+    for item in vanished:
         transactions_to_create.append(HangarTransaction(
             corporation=corporation,
             transaction_type="REMOVE",
             type_id=item.type_id,
-            type_name=item.type_name,
             old_quantity=item.quantity,
             new_quantity=0,
             quantity_change=-item.quantity,
             location=item.location,
             division=item.division,
             estimated_value=item.estimated_value,
+            item_id=item.item_id,
         ))
 
     # ------------------------------------------------------------------ #
-    # 9. Bulk create all transactions
+    # 8. Bulk create all transactions (optionally netted per type/location)
     # ------------------------------------------------------------------ #
+    if app_settings.CORPINVENTORY_COALESCE_TRANSACTIONS:
+        event_count = len(transactions_to_create)
+        transactions_to_create = coalesce_transactions(transactions_to_create)
+        logger.info(
+            f"Coalesced {event_count} item event(s) into "
+            f"{len(transactions_to_create)} transaction(s)"
+        )
+    # Alert rules are matched here, against the rows about to be written;
+    # matched rows are stored already flagged as notified
+    rule_index = compile_rules(corporation.pk)
+    alert_matches = rule_index.match(transactions_to_create) if rule_index.count else []
+    for _, trans in alert_matches:
+        trans.notification_sent = True
     if transactions_to_create:
         HangarTransaction.objects.bulk_create(transactions_to_create, batch_size=500)
 
     # ------------------------------------------------------------------ #
-    # 10. Snapshot — store totals only; skip the full JSON blob which
+    # 9. Snapshot — store totals only; skip the full JSON blob which
     #     duplicates all HangarItem data and grows indefinitely
     # ------------------------------------------------------------------ #
     total_value = sum(v["value"] for v in current_snapshot.values())
@@ -625,14 +857,205 @@ def process_assets(
     )
 
     # ------------------------------------------------------------------ #
-    # 11. Only dispatch alert task if there are active rules to evaluate
+    # 10. Running per-type totals, updated from this sync's diff, and the
+    #     aggregate alert rules that watch them
     # ------------------------------------------------------------------ #
-    if AlertRule.objects.filter(corporation=corporation, is_active=True).exists():
-        process_alert_rules.delay(corporation.corporation_id)
+    totals = apply_type_total_deltas(corporation, total_deltas)
+    alerts = [alert_payload(rule, trans) for rule, trans in alert_matches]
+    if rule_index.aggregate_rules:
+        alerts += evaluate_aggregate_rules(rule_index.aggregate_rules, totals, total_deltas)
+
+    # ------------------------------------------------------------------ #
+    # 11. Hand the alerts to the notification task once committed, and
+    #     rebuild the type-ahead index if the types held have changed
+    # ------------------------------------------------------------------ #
+    held_before = {item.type_id for item in existing_items.values() if item.is_active}
+    held_after = {entry["type_id"] for entry in current_snapshot.values()}
+    if held_before != held_after:
+        transaction.on_commit(rebuild_type_index)
+
+    if alerts:
+        logger.info(f"{len(alerts)} alert(s) triggered for {corporation.corporation_name}")
+        transaction.on_commit(
+            lambda: send_alert_notifications.delay(corporation.pk, alerts)
+        )
 
     return len(current_snapshot)
 
 
+def sync_item_types(type_ids: set):
+    """
+    Ensure an ItemType row exists for every type ID.
+
+    Types already stored with a resolved name cost nothing; unknown types are
+    resolved in bulk from the SDE when installed and from ESI otherwise.
+    "Unknown Type" placeholders are retried on every sync, like locations.
+
+    Args:
+        type_ids: Set of EVE type IDs about to be referenced
+    """
+    if not type_ids:
+        return
+
+    existing = {
+        item_type.type_id: item_type
+        for item_type in ItemType.objects.filter(type_id__in=type_ids)
+    }
+    unresolved = {
+        type_id for type_id in type_ids
+        if type_id not in existing
+        or existing[type_id].name.startswith("Unknown Type ")
+    }
+    if not unresolved:
+        return
+
+    resolved = {}
+    # Bulk SDE lookup first — one DB query instead of N ESI HTTP calls.
+    # Falls back to ESI for any types not yet in the SDE (e.g. very new items).
+    if apps.is_installed("eve_sde"):
+        try:
+            from eve_sde.models import ItemType as _SDEItemType
+            resolved.update(
+                _SDEItemType.objects.filter(id__in=unresolved).values_list("id", "name")
+            )
+            if resolved:
+                logger.debug(f"SDE resolved {len(resolved)} type name(s)")
+        except Exception as sde_err:
+            logger.warning(f"SDE bulk type lookup failed, falling back to ESI: {sde_err}")
+
+    esi_lookups = unresolved - set(resolved)
+    if esi_lookups:
+        logger.info(f"Fetching {len(esi_lookups)} new type name(s) from ESI")
+        for type_id in esi_lookups:
+            type_info = CorpInventoryManager.get_type_info(type_id)
+            if type_info and type_info.get("name"):
+                resolved[type_id] = type_info["name"]
+
+    to_create = []
+    to_update = []
+    for type_id in unresolved:
+        name = resolved.get(type_id)
+        if type_id in existing:
+            if name:
+                existing[type_id].name = name
+                to_update.append(existing[type_id])
+        else:
+            to_create.append(ItemType(type_id=type_id, name=name or f"Unknown Type {type_id}"))
+
+    if to_update:
+        ItemType.objects.bulk_update(to_update, ["name"], batch_size=500)
+    if to_create:
+        ItemType.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+
+
+def apply_type_total_deltas(corporation: Corporation, deltas: dict) -> dict:
+    """
+    Apply one sync's changes to the corporation's HangarTypeTotal rows.
+
+    Only changed totals are written; totals that drop to zero are deleted.
+    The corporation row is locked first, so overlapping syncs of the same
+    corporation apply their deltas one after the other instead of both
+    creating a row for a new key (the unique constraints reject that).
+
+    Args:
+        corporation: Corporation being synced
+        deltas: (type_id, location pk, division pk) -> [quantity, value] change
+
+    Returns:
+        All of the corporation's totals after the update, in the same shape
+    """
+    with transaction.atomic():
+        list(Corporation.objects.select_for_update().filter(pk=corporation.pk).values_list("pk"))
+        return _apply_type_total_deltas(corporation, deltas)
+
+
+def _apply_type_total_deltas(corporation: Corporation, deltas: dict) -> dict:
+    rows = {
+        (row.type_id, row.location_id, row.division_id): row
+        for row in HangarTypeTotal.objects.filter(corporation=corporation)
+    }
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    to_delete = set()
+    for key, (quantity, value) in deltas.items():
+        if not quantity and not value:
+            continue
+        row = rows.get(key)
+        if row is None:
+            type_id, location_pk, division_pk = key
+            row = rows[key] = HangarTypeTotal(
+                corporation=corporation,
+                type_id=type_id,
+                location_id=location_pk,
+                division_id=division_pk,
+            )
+            to_create.append(row)
+        else:
+            to_update.append(row)
+        row.quantity += quantity
+        row.value += value
+        row.updated_at = now
+        if row.quantity <= 0 and row.pk:
+            to_delete.add(row.pk)
+
+    if to_delete:
+        HangarTypeTotal.objects.filter(pk__in=to_delete).delete()
+    to_update = [row for row in to_update if row.pk not in to_delete]
+    if to_update:
+        HangarTypeTotal.objects.bulk_update(
+            to_update, ['quantity', 'value', 'updated_at'], batch_size=500
+        )
+    to_create = [row for row in to_create if row.quantity > 0]
+    if to_create:
+        HangarTypeTotal.objects.bulk_create(to_create, batch_size=500)
+
+    return {
+        key: [row.quantity, row.value]
+        for key, row in rows.items()
+        if row.quantity > 0
+    }
+
+
+def coalesce_transactions(transactions: list) -> list:
+    """
+    Net per-item transactions into one row per
+    (transaction type, type, location, previous location, division).
+
+    Quantities and values are summed; the source item_ids are kept on the
+    resulting row so individual stacks can still be traced. A row built from
+    a single stack keeps its item_id; a merged row has none.
+
+    Args:
+        transactions: Unsaved HangarTransaction objects from one sync
+
+    Returns:
+        List of unsaved, coalesced HangarTransaction objects
+    """
+    coalesced = {}
+    for trans in transactions:
+        key = (
+            trans.transaction_type,
+            trans.type_id,
+            trans.location_id,
+            trans.from_location_id,
+            trans.division_id,
+        )
+        merged = coalesced.get(key)
+        if merged is None:
+            trans.item_ids = [trans.item_id]
+            coalesced[key] = trans
+            continue
+        merged.quantity_change += trans.quantity_change
+        merged.old_quantity += trans.old_quantity
+        merged.new_quantity += trans.new_quantity
+        merged.estimated_value += trans.estimated_value
+        merged.item_ids.append(trans.item_id)
+        merged.item_id = None
+
+    return list(coalesced.values())
+
+
 def get_or_create_location(location_id: int, token: Token) -> Location:
     """
     Get or create a Location object.
@@ -765,39 +1188,52 @@ def create_transaction(**kwargs):
 
 
 @shared_task
-def process_alert_rules(corporation_id: int):
+def process_alert_rules(corporation_id: int, hours: int = 24):
     """
-    Process alert rules for recent transactions
+    Re-evaluate alert rules against recent transactions not yet alerted on
+
+    Syncs match rules inline (see process_assets); this is for running new
+    or changed rules over transactions that are already stored.
     
     Args:
         corporation_id: Corporation ID
+        hours: How far back to look
     """
     try:
         corporation = Corporation.objects.get(corporation_id=corporation_id)
         
-        # Get recent transactions (last 5 minutes)
-        recent_time = timezone.now() - timedelta(minutes=5)
+        recent_time = timezone.now() - timedelta(hours=hours)
         recent_transactions = HangarTransaction.objects.filter(
             corporation=corporation,
             detected_at__gte=recent_time,
             notification_sent=False
         )
         
-        if not recent_transactions.exists():
+        # Active alert rules, indexed so each transaction only meets the
+        # rules that can apply to it
+        rule_index = compile_rules(corporation.pk)
+        if not rule_index:
             return
         
-        # Get active alert rules
-        alert_rules = AlertRule.objects.filter(
-            corporation=corporation,
-            is_active=True
-        )
+        alerts = []
+        matched_ids = []
+        for trans in recent_transactions.select_related(
+            'location', 'division'
+        ).iterator(chunk_size=500):
+            rules = rule_index.rules_for(trans)
+            for rule in rules:
+                alerts.append(alert_payload(rule, trans))
+            if rules:
+                matched_ids.append(trans.pk)
+        
+        # Flag everything alerted on in a few bulk UPDATEs
+        for start in range(0, len(matched_ids), ALERT_UPDATE_BATCH_SIZE):
+            HangarTransaction.objects.filter(
+                pk__in=matched_ids[start:start + ALERT_UPDATE_BATCH_SIZE]
+            ).update(notification_sent=True)
         
-        for rule in alert_rules:
-            for trans in recent_transactions:
-                if should_trigger_alert(rule, trans):
-                    send_alert(rule, trans)
-                    trans.notification_sent = True
-                    trans.save()
+        if alerts:
+            send_alert_notifications(corporation.pk, alerts)
         
     except Corporation.DoesNotExist:
         logger.error(f"Corporation {corporation_id} not found")
@@ -816,51 +1252,35 @@ def should_trigger_alert(rule: AlertRule, transaction: HangarTransaction) -> boo
     Returns:
         True if alert should be triggered
     """
-    # Check alert type
-    if rule.alert_type == "ITEM_ADDED" and transaction.transaction_type != "ADD":
-        return False
-    
-    if rule.alert_type == "ITEM_REMOVED" and transaction.transaction_type != "REMOVE":
-        return False
-    
-    # Check type_id if specified
-    if rule.type_id and rule.type_id != transaction.type_id:
-        return False
-    
-    # Check division if specified
-    if rule.division and rule.division != transaction.division:
-        return False
-    
-    # Check value threshold
-    if rule.value_threshold and transaction.estimated_value < rule.value_threshold:
-        return False
-    
-    # Check quantity threshold
-    if rule.quantity_threshold:
-        if abs(transaction.quantity_change) < rule.quantity_threshold:
-            return False
-    
-    return True
+    return rule_matches(rule, transaction)
 
 
-def send_alert(rule: AlertRule, transaction: HangarTransaction):
+@shared_task
+def send_alert_notifications(corporation_pk: int, alerts: list):
     """
-    Send alert notification
+    Deliver alerts matched during a sync as one digest per user
     
     Args:
-        rule: AlertRule object
-        transaction: HangarTransaction object
+        corporation_pk: Corporation primary key
+        alerts: alert_payload dicts
     """
-    # TODO: Implement notification system
-    # This would typically use Alliance Auth's notification system
-    logger.info(f"Alert triggered: {rule.name} for transaction {transaction.id}")
-    
-    # Example notification (requires Alliance Auth notifications app)
-    # from allianceauth.notifications import notify
-    # for user in rule.notify_users.all():
-    #     notify(
-    #         user,
-    #         f"Corp Inventory Alert: {rule.name}",
-    #         message=f"{transaction}",
-    #         level="warning"
-    #     )
+    corporation = Corporation.objects.filter(pk=corporation_pk).first()
+    if corporation is None:
+        return 0
+    rules = AlertRule.objects.filter(
+        corporation=corporation, is_active=True
+    ).prefetch_related('notify_users').in_bulk({alert["rule_id"] for alert in alerts})
+    type_names = dict(
+        ItemType.objects.filter(
+            type_id__in={alert["type_id"] for alert in alerts}
+        ).values_list("type_id", "name")
+    )
+    deliverable = []
+    for alert in alerts:
+        if alert["rule_id"] not in rules:
+            continue
+        # Aggregate alerts arrive with their text already built
+        if "summary" not in alert:
+            alert["type_name"] = type_names.get(alert["type_id"], f"Type {alert['type_id']}")
+        deliverable.append(alert)
+    return deliver_alerts(corporation, rules, deliverable)
@@ -0,0 +1,125 @@
+"""
+Tests for alert rule matching
+"""
+
+from decimal import Decimal
+from itertools import product
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from corp_inventory.alerts import compile_rules, rule_matches
+from corp_inventory.models import (
+    AlertRule,
+    Corporation,
+    HangarDivision,
+    HangarTransaction,
+    ItemType,
+    Location,
+)
+from corp_inventory.tasks import process_alert_rules
+
+
+class AlertTestCase(TestCase):
+    """Corporation with two divisions and two item types"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        self.location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        self.divisions = [
+            HangarDivision.objects.create(
+                corporation=self.corporation, division_id=number, division_name=f"Div {number}"
+            )
+            for number in (1, 2)
+        ]
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        ItemType.objects.create(type_id=35, name="Pyerite")
+
+    def _transaction(self, transaction_type, type_id, division, quantity_change, value):
+        return HangarTransaction(
+            corporation=self.corporation,
+            transaction_type=transaction_type,
+            type_id=type_id,
+            quantity_change=quantity_change,
+            location=self.location,
+            division=division,
+            estimated_value=Decimal(value),
+        )
+
+
+class RuleIndexTest(AlertTestCase):
+    """Test the index finds exactly the rules the plain predicate would"""
+
+    def test_matches_brute_force(self):
+        """Test every rule shape against every transaction shape"""
+        divisions = [None] + self.divisions
+        for number, (alert_type, type_id, division, value, quantity) in enumerate(product(
+            ("ITEM_ADDED", "ITEM_REMOVED", "VALUE_THRESHOLD", "QUANTITY_CHANGE"),
+            (None, 34),
+            divisions,
+            (None, Decimal("100")),
+            (None, 10),
+        )):
+            AlertRule.objects.create(
+                corporation=self.corporation,
+                name=f"Rule {number}",
+                alert_type=alert_type,
+                type_id=type_id,
+                division=division,
+                value_threshold=value,
+                quantity_threshold=quantity,
+            )
+        rules = list(AlertRule.objects.all())
+        index = compile_rules(self.corporation.pk)
+        self.assertEqual(index.count, len(rules))
+
+        for transaction in (
+            self._transaction(trans_type, type_id, division, change, value)
+            for trans_type, type_id, division, change, value in product(
+                ("ADD", "REMOVE", "CHANGE", "MOVE"),
+                (34, 35),
+                divisions,
+                (5, -50),
+                ("50", "500"),
+            )
+        ):
+            expected = sorted(rule.pk for rule in rules if rule_matches(rule, transaction))
+            found = sorted(rule.pk for rule in index.rules_for(transaction))
+            self.assertEqual(found, expected)
+
+
+class ProcessAlertRulesTest(AlertTestCase):
+    """Test the alert task"""
+
+    def test_flags_matches_in_bulk(self):
+        """Test matched transactions are flagged without per-row saves"""
+        AlertRule.objects.create(
+            corporation=self.corporation,
+            name="Tritanium added",
+            alert_type="ITEM_ADDED",
+            type_id=34,
+        )
+        HangarTransaction.objects.bulk_create(
+            [self._transaction("ADD", 34, None, 1, "1") for _ in range(50)]
+            + [self._transaction("ADD", 35, None, 1, "1") for _ in range(50)]
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            process_alert_rules(self.corporation.corporation_id)
+        # Evaluation (corporation, rules, transactions, UPDATE) plus delivery
+        # (corporation, rules, users, type names); none of it grows with the
+        # number of transactions
+        self.assertLessEqual(len(queries), 8)
+        self.assertEqual(HangarTransaction.objects.filter(notification_sent=True).count(), 50)
+        self.assertFalse(
+            HangarTransaction.objects.filter(type_id=35, notification_sent=True).exists()
+        )
@@ -0,0 +1,94 @@
+"""
+Tests for the cold archive
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from corp_inventory.archive import archive_and_delete, iter_archive
+from corp_inventory.models import (
+    Corporation,
+    HangarTransaction,
+    ItemType,
+    Location,
+)
+
+
+class ArchiveTest(TestCase):
+    """Test archiving expired transactions"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.archive_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch(
+            "corp_inventory.app_settings.CORPINVENTORY_ARCHIVE_PATH",
+            self.archive_dir.name,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.archive_dir.cleanup)
+
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        for days_ago in (200, 170, 100, 10):
+            trans = HangarTransaction.objects.create(
+                corporation=self.corporation,
+                transaction_type="ADD",
+                type_id=34,
+                quantity_change=days_ago,
+                location=location,
+            )
+            # detected_at is auto_now_add, so backdate it afterwards
+            HangarTransaction.objects.filter(pk=trans.pk).update(
+                detected_at=timezone.now() - timedelta(days=days_ago)
+            )
+
+    def test_archive_then_delete(self):
+        """Test expired rows move to monthly partitions and leave the table"""
+        cutoff = timezone.now() - timedelta(days=90)
+        archived = archive_and_delete("transactions", self.corporation, cutoff)
+
+        self.assertEqual(archived, 3)
+        self.assertEqual(
+            list(HangarTransaction.objects.values_list("quantity_change", flat=True)),
+            [10],
+        )
+        corp_dir = os.path.join(
+            self.archive_dir.name, "transactions", "corporation_123456789"
+        )
+        self.assertGreaterEqual(len(os.listdir(corp_dir)), 2)
+
+        records = list(iter_archive("transactions", corporation_id=123456789))
+        self.assertEqual(
+            sorted(r["quantity_change"] for r in records), [100, 170, 200]
+        )
+        self.assertEqual(records[0]["type_name"], "Tritanium")
+        self.assertEqual(records[0]["location_id"], 60003760)
+
+    def test_scan_filters_by_time(self):
+        """Test the scan skips rows outside the requested range"""
+        archive_and_delete(
+            "transactions", self.corporation, timezone.now() - timedelta(days=90)
+        )
+        since = timezone.now() - timedelta(days=180)
+        records = list(iter_archive("transactions", since=since))
+        self.assertEqual(
+            sorted(r["quantity_change"] for r in records), [100, 170]
+        )
+        self.assertEqual(
+            list(iter_archive("transactions", until=datetime(2000, 1, 1, tzinfo=dt_timezone.utc))),
+            [],
+        )
@@ -0,0 +1,144 @@
+"""
+Tests for the hangar asset tree
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from corp_inventory.asset_tree import build_asset_tree, subtree_totals
+from corp_inventory.models import (
+    Corporation,
+    HangarDivision,
+    HangarItem,
+    HangarTransaction,
+    ItemType,
+    Location,
+)
+from corp_inventory.tasks import process_assets
+
+STATION_ID = 60003760
+OFFICE_ID = 1000
+
+# Office -> container in division 2 -> (minerals, ship -> module); one loose item
+ASSETS = [
+    {"item_id": OFFICE_ID, "type_id": 27, "quantity": 1,
+     "location_id": STATION_ID, "location_flag": "OfficeFolder"},
+    {"item_id": 10, "type_id": 17366, "quantity": 1, "is_singleton": True,
+     "location_id": OFFICE_ID, "location_flag": "CorpSAG2"},
+    {"item_id": 11, "type_id": 34, "quantity": 5000,
+     "location_id": 10, "location_flag": "Unlocked"},
+    {"item_id": 12, "type_id": 587, "quantity": 1, "is_singleton": True,
+     "location_id": 10, "location_flag": "Unlocked"},
+    {"item_id": 13, "type_id": 2881, "quantity": 1,
+     "location_id": 12, "location_flag": "HiSlot0"},
+    {"item_id": 20, "type_id": 34, "quantity": 100,
+     "location_id": OFFICE_ID, "location_flag": "CorpSAG1"},
+]
+
+PRICES = {17366: 1000.0, 34: 5.0, 587: 300000.0, 2881: 20000.0}
+
+
+class BuildAssetTreeTest(TestCase):
+    """Test nested-set numbering and rollups of the ESI asset list"""
+
+    def test_tree_positions(self):
+        """Test hangar items and their nested contents are numbered in preorder"""
+        nodes = {node["item_id"]: node for node in build_asset_tree(ASSETS)}
+
+        # The office itself is not a hangar item
+        self.assertEqual(sorted(nodes), [10, 11, 12, 13, 20])
+        self.assertEqual(
+            [(nodes[i]["parent_item_id"], nodes[i]["depth"]) for i in (10, 11, 12, 13)],
+            [(None, 0), (10, 1), (10, 1), (12, 2)],
+        )
+        self.assertEqual(nodes[13]["hangar_flag"], "CorpSAG2")
+        container = nodes[10]
+        inside = sorted(
+            item_id for item_id, node in nodes.items()
+            if node["tree_id"] == container["tree_id"]
+            and container["lft"] < node["lft"] < container["rgt"]
+        )
+        self.assertEqual(inside, [11, 12, 13])
+
+        # Every top-level item is a tree of its own, numbered from 1
+        self.assertEqual([nodes[i]["tree_id"] for i in (10, 11, 12, 13)], [10] * 4)
+        self.assertEqual((nodes[10]["lft"], nodes[10]["rgt"]), (1, 8))
+        self.assertEqual((nodes[20]["tree_id"], nodes[20]["lft"], nodes[20]["rgt"]), (20, 1, 2))
+
+    def test_subtree_totals(self):
+        """Test rollups include every level of contents"""
+        nodes = build_asset_tree(ASSETS)
+        totals = subtree_totals(nodes, {
+            10: (1, Decimal(1000)),
+            11: (5000, Decimal(25000)),
+            12: (1, Decimal(300000)),
+            13: (1, Decimal(20000)),
+        })
+        self.assertEqual(totals[10], [5003, Decimal(346000)])
+        self.assertEqual(totals[12], [2, Decimal(320000)])
+        self.assertEqual(totals[20], [0, Decimal(0)])
+
+
+class ProcessAssetsTreeTest(TestCase):
+    """Test the sync stores container contents with their tree position"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        Location.objects.create(
+            location_id=STATION_ID,
+            location_name="Test Station",
+            location_type="station",
+        )
+        for number in (1, 2):
+            HangarDivision.objects.create(
+                corporation=self.corporation, division_id=number, division_name=f"Div {number}"
+            )
+        for type_id, name in (
+            (17366, "Station Container"), (34, "Tritanium"), (587, "Rifter"), (2881, "Light Missile Launcher"),
+        ):
+            ItemType.objects.create(type_id=type_id, name=name)
+
+    def _sync(self, assets):
+        with mock.patch("corp_inventory.tasks.send_alert_notifications"):
+            with self.captureOnCommitCallbacks(execute=True):
+                process_assets(self.corporation, assets, PRICES, None)
+
+    def test_contents_and_rollups(self):
+        """Test nested items inherit the division and containers roll up"""
+        self._sync(ASSETS)
+
+        container = HangarItem.objects.get(item_id=10)
+        self.assertTrue(container.is_container)
+        self.assertEqual(container.subtree_value, Decimal("346000.00"))
+        self.assertEqual(
+            [item.item_id for item in container.contents()], [11, 12, 13]
+        )
+        launcher = HangarItem.objects.get(item_id=13)
+        self.assertEqual(launcher.division.division_id, 2)
+        self.assertEqual(launcher.location_flag, "HiSlot0")
+        self.assertEqual(
+            [item.item_id for item in launcher.containers()], [10, 12]
+        )
+        self.assertEqual(
+            HangarTransaction.objects.filter(transaction_type="ADD").count(), 5
+        )
+
+    def test_untracked_contents_are_not_additions(self):
+        """Test contents of a container synced before the tree are not ADDs"""
+        self._sync([ASSETS[0], ASSETS[1]])
+        # As left by an older version, which did not record tree positions
+        HangarItem.objects.filter(item_id=10).update(lft=None, rgt=None)
+        HangarTransaction.objects.all().delete()
+
+        self._sync(ASSETS)
+
+        self.assertEqual(
+            sorted(HangarTransaction.objects.values_list("item_id", flat=True)), [20]
+        )
+        self.assertEqual(HangarItem.objects.get(item_id=11).depth, 1)
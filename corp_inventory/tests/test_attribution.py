@@ -0,0 +1,121 @@
+"""
+Tests for container log attribution
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from corp_inventory.attribution import attribute_transactions
+from corp_inventory.models import (
+    ContainerLog,
+    Corporation,
+    HangarTransaction,
+    ItemType,
+    Location,
+)
+
+
+class AttributeTransactionsTest(TestCase):
+    """Test transactions are matched to the container log events behind them"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        self.location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        ItemType.objects.create(type_id=35, name="Pyerite")
+        self.now = timezone.now()
+
+    def _transaction(self, transaction_type, type_id, quantity_change, minutes_ago=0):
+        transaction = HangarTransaction.objects.create(
+            corporation=self.corporation,
+            transaction_type=transaction_type,
+            type_id=type_id,
+            quantity_change=quantity_change,
+            location=self.location,
+        )
+        # detected_at is auto_now_add
+        HangarTransaction.objects.filter(pk=transaction.pk).update(
+            detected_at=self.now - timedelta(minutes=minutes_ago)
+        )
+        return transaction.pk
+
+    def _log(self, character_id, action, type_id, quantity, minutes_ago):
+        ContainerLog.objects.create(
+            corporation=self.corporation,
+            character_id=character_id,
+            character_name=f"Pilot {character_id}",
+            action=action,
+            type_id=type_id,
+            quantity=quantity,
+            container_id=1,
+            logged_at=self.now - timedelta(minutes=minutes_ago),
+        )
+
+    def _character(self, pk):
+        return HangarTransaction.objects.get(pk=pk).character_id
+
+    def test_matches_direction_type_and_quantity(self):
+        """Test add events explain additions and take events removals"""
+        added = self._transaction("ADD", 34, 1000)
+        taken = self._transaction("REMOVE", 34, -1000)
+        changed = self._transaction("CHANGE", 35, -50)
+        self._log(1, "add", 34, 1000, 10)
+        self._log(2, "take", 34, 1000, 20)
+        self._log(3, "take", 35, 50, 30)
+        # Wrong quantity: explains nothing
+        self._log(4, "add", 35, 51, 5)
+
+        self.assertEqual(attribute_transactions(self.corporation), 3)
+        self.assertEqual(self._character(added), 1)
+        self.assertEqual(self._character(taken), 2)
+        self.assertEqual(self._character(changed), 3)
+        self.assertEqual(
+            HangarTransaction.objects.get(pk=added).character_name, "Pilot 1"
+        )
+
+    def test_time_window(self):
+        """Test events must precede the sync and fall inside the window"""
+        too_old = self._transaction("ADD", 34, 10)
+        too_new = self._transaction("ADD", 35, 10, minutes_ago=60)
+        self._log(1, "add", 34, 10, 200)
+        self._log(2, "add", 35, 10, 30)
+
+        self.assertEqual(attribute_transactions(self.corporation), 0)
+        self.assertIsNone(self._character(too_old))
+        self.assertIsNone(self._character(too_new))
+
+    def test_each_event_used_once(self):
+        """Test identical transactions consume identical events in time order"""
+        earlier = self._transaction("ADD", 34, 10, minutes_ago=120)
+        later = self._transaction("ADD", 34, 10)
+        unexplained = self._transaction("ADD", 34, 10)
+        self._log(1, "add", 34, 10, 150)
+        self._log(2, "add", 34, 10, 40)
+
+        self.assertEqual(attribute_transactions(self.corporation), 2)
+        self.assertEqual(self._character(earlier), 1)
+        self.assertEqual(self._character(later), 2)
+        self.assertIsNone(self._character(unexplained))
+
+    def test_keeps_existing_attribution(self):
+        """Test attributed transactions keep their character and their event"""
+        attributed = self._transaction("ADD", 34, 10)
+        HangarTransaction.objects.filter(pk=attributed).update(
+            character_id=9, character_name="Known"
+        )
+        pending = self._transaction("ADD", 34, 10)
+        self._log(1, "add", 34, 10, 5)
+
+        self.assertEqual(attribute_transactions(self.corporation), 0)
+        self.assertEqual(self._character(attributed), 9)
+        self.assertIsNone(self._character(pending))
@@ -0,0 +1,210 @@
+"""
+Tests for the synthetic asset generator, the sync benchmarks and the
+load-test seeding
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from corp_inventory.asset_tree import build_asset_tree
+from corp_inventory.benchmark.generator import AssetGenerator
+from corp_inventory.benchmark.loadtest import build_targets, percentile
+from corp_inventory.benchmark.seed import (
+    _copy_value,
+    flush_seeded,
+    insert_rows,
+    seed_database,
+    seeded_corporations,
+)
+from corp_inventory.benchmark.suite import compare, run_suite
+from corp_inventory.models import (
+    ContainerLog,
+    Corporation,
+    HangarItem,
+    HangarSnapshot,
+    HangarTransaction,
+    HangarTypeTotal,
+    ItemType,
+    Location,
+)
+
+
+class AssetGeneratorTest(TestCase):
+    """Test generated payloads look like a corporation's assets"""
+
+    def test_structure(self):
+        """Test every item sits in a hangar division or inside another item"""
+        generator = AssetGenerator(seed=1)
+        assets = generator.assets(2000)
+        by_id = {asset["item_id"]: asset for asset in assets}
+
+        offices = [a for a in assets if a["location_flag"] == "OfficeFolder"]
+        self.assertEqual(len(offices), len(generator.station_ids))
+        self.assertEqual(len(assets), 2000 + len(offices))
+        for asset in assets:
+            if asset["location_flag"] == "OfficeFolder":
+                continue
+            parent = by_id[asset["location_id"]]
+            if asset["location_flag"].startswith("CorpSAG"):
+                self.assertEqual(parent["location_flag"], "OfficeFolder")
+                self.assertIn(int(asset["location_flag"][7:]), range(1, 8))
+            else:
+                self.assertTrue(parent["is_singleton"])
+
+        nodes = build_asset_tree(assets)
+        self.assertEqual(len(nodes), 2000)
+        self.assertTrue(any(node["depth"] >= 2 for node in nodes))
+
+    def test_deterministic_churn(self):
+        """Test a seed gives the same payloads and churn changes some items"""
+        first = AssetGenerator(seed=3)
+        second = AssetGenerator(seed=3)
+        assets = first.assets(1000)
+        self.assertEqual(assets, second.assets(1000))
+
+        changed = first.churn(assets, 0.1)
+        self.assertEqual(changed, second.churn(assets, 0.1))
+        before = {a["item_id"]: a for a in assets}
+        after = {a["item_id"]: a for a in changed}
+        self.assertTrue(set(before) - set(after))
+        self.assertTrue(set(after) - set(before))
+        self.assertTrue(any(
+            before[item_id]["quantity"] != after[item_id]["quantity"]
+            for item_id in set(before) & set(after)
+        ))
+
+
+class BenchmarkSuiteTest(TestCase):
+    """Test the suite measures every case and leaves no data behind"""
+
+    def test_run_suite(self):
+        """Test a small run reports each case and is rolled back"""
+        results = run_suite([200], log_count=50, repeat=1)
+
+        self.assertEqual(
+            sorted(results),
+            [
+                "process_assets.churn@200",
+                "process_assets.initial@200",
+                "resolve_station_id@200",
+                "store_container_logs@200",
+            ],
+        )
+        self.assertEqual(results["resolve_station_id@200"]["queries"], 0)
+        self.assertGreater(results["process_assets.initial@200"]["queries"], 0)
+        self.assertGreater(results["process_assets.initial@200"]["peak_kb"], 0)
+        self.assertFalse(Corporation.objects.exists())
+        self.assertFalse(HangarItem.objects.exists())
+
+    def test_compare(self):
+        """Test slower, bigger or chattier cases are reported"""
+        baseline = {"case@10": {"time_ms": 100.0, "queries": 10, "peak_kb": 1000.0}}
+
+        self.assertEqual(
+            compare({"case@10": {"time_ms": 120.0, "queries": 10, "peak_kb": 1000.0}}, baseline, 0.25),
+            [],
+        )
+        regressions = compare(
+            {"case@10": {"time_ms": 130.0, "queries": 11, "peak_kb": 1000.0}}, baseline, 0.25
+        )
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(compare({"new@10": {"time_ms": 1, "queries": 1, "peak_kb": 1}}, baseline, 0), [])
+
+
+class SeedDatabaseTest(TestCase):
+    """Test seeding and flushing the load-test corporations"""
+
+    def test_seed_and_flush(self):
+        """Test a small seed inserts every table and flush removes it again"""
+        counts = seed_database(
+            corporations=2, items=200, transactions=1000, container_logs=100, batch_size=64
+        )
+
+        corporations = list(seeded_corporations())
+        self.assertEqual(len(corporations), 2)
+        self.assertTrue(all(corp.tracking_enabled for corp in corporations))
+        self.assertEqual(HangarItem.objects.count(), counts["items"])
+        self.assertEqual(counts["items"], 200)
+        self.assertEqual(HangarTransaction.objects.count(), counts["transactions"])
+        self.assertEqual(counts["transactions"], 1000)
+        self.assertEqual(ContainerLog.objects.count(), 100)
+        self.assertEqual(HangarSnapshot.objects.count(), 2 * 90)
+        active = HangarItem.objects.filter(is_active=True)
+        self.assertEqual(
+            sum(HangarTypeTotal.objects.values_list("quantity", flat=True)),
+            sum(active.values_list("quantity", flat=True)),
+        )
+
+        # A second seed adds new corporations next to the first ones
+        seed_database(corporations=1, items=10, transactions=10, container_logs=10)
+        self.assertEqual(seeded_corporations().count(), 3)
+        self.assertEqual(HangarItem.objects.values("item_id").distinct().count(), 210)
+
+        self.assertEqual(flush_seeded(), 3)
+        self.assertFalse(Corporation.objects.exists())
+        self.assertFalse(HangarItem.objects.exists())
+        self.assertFalse(HangarTransaction.objects.exists())
+
+    def test_insert_rows_keeps_given_values(self):
+        """Test given values are kept and missing ones get their defaults"""
+        corporation = Corporation.objects.create(corporation_id=1, corporation_name="Test Corp")
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        location = Location.objects.create(location_id=60003760, location_name="Jita IV - Moon 4")
+        detected_at = timezone.now() - timedelta(days=30)
+
+        inserted = insert_rows(HangarTransaction, [
+            {"corporation_id": corporation.pk, "transaction_type": "ADD", "type_id": 34,
+             "quantity_change": 5, "new_quantity": 5, "location_id": location.pk,
+             "detected_at": detected_at},
+        ])
+
+        self.assertEqual(inserted, 1)
+        transaction = HangarTransaction.objects.get()
+        self.assertEqual(transaction.detected_at, detected_at)
+        self.assertEqual(transaction.old_quantity, 0)
+        self.assertEqual(transaction.item_ids, [])
+
+
+class LoadTestHelpersTest(TestCase):
+    """Test the load-test formatting and statistics helpers"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3, 1, 2], 50), 2)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_copy_value(self):
+        """Test values are written in COPY text format"""
+        self.assertEqual(_copy_value(None), r"\N")
+        self.assertEqual(_copy_value(True), "t")
+        self.assertEqual(_copy_value(Decimal("1.50")), "1.50")
+        self.assertEqual(_copy_value("a\tb\\c"), "a\\tb\\\\c")
+        self.assertEqual(_copy_value(["x"]), '["x"]')
+        self.assertEqual(
+            _copy_value(datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)),
+            "2026-01-02T03:04:05+00:00",
+        )
+
+    def test_build_targets_uses_busiest_location(self):
+        """Test location pages target the location holding the most stacks"""
+        corporation = Corporation.objects.create(corporation_id=1, corporation_name="Test Corp")
+        item_type = ItemType.objects.create(type_id=34, name="Tritanium")
+        quiet = Location.objects.create(location_id=60003760, location_name="Jita IV - Moon 4")
+        busy = Location.objects.create(location_id=60008494, location_name="Amarr VIII")
+        for item_id, location in enumerate((busy, busy, busy, quiet)):
+            HangarItem.objects.create(
+                corporation=corporation, item_id=item_id, type=item_type, location=location
+            )
+
+        targets = dict(build_targets(corporation, ["location_view"]))
+        self.assertEqual(
+            targets["location_view"], reverse("corp_inventory:location", args=[busy.location_id])
+        )
@@ -0,0 +1,69 @@
+"""
+Tests for the sync-versioned view cache
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from corp_inventory.caching import bump_generation, cached_view_context
+from corp_inventory.models import Corporation
+
+
+class CachedViewContextTest(TestCase):
+    """Test view context caching and invalidation"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        self.user = User.objects.create_user("pilot")
+        self.build = mock.Mock(side_effect=lambda: {"total": self.build.call_count})
+
+    def get(self, query=""):
+        request = RequestFactory().get(f"/hangar/?{query}")
+        request.user = self.user
+        return cached_view_context("hangar", request, [self.corporation], self.build)
+
+    def test_repeat_visit_is_cached(self):
+        """Test the second identical request does not rebuild"""
+        self.assertEqual(self.get(), {"total": 1})
+        self.assertEqual(self.get(), {"total": 1})
+        self.assertEqual(self.build.call_count, 1)
+
+    def test_filters_are_part_of_the_key(self):
+        """Test different GET parameters are cached separately"""
+        self.get("division=1")
+        self.get("division=2")
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_sync_invalidates(self):
+        """Test a finished sync or new last_sync moves to a fresh entry"""
+        self.get()
+        bump_generation(self.corporation.pk)
+        self.get()
+        self.assertEqual(self.build.call_count, 2)
+
+        self.corporation.last_sync = timezone.now()
+        self.get()
+        self.assertEqual(self.build.call_count, 3)
+
+    def test_permissions_are_part_of_the_key(self):
+        """Test users with different permissions do not share entries"""
+        self.get()
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.get()
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_disabled(self):
+        """Test a zero timeout turns caching off"""
+        with mock.patch("corp_inventory.app_settings.CORPINVENTORY_VIEW_CACHE_TIMEOUT", 0):
+            self.get()
+            self.get()
+        self.assertEqual(self.build.call_count, 2)
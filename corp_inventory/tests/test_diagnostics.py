@@ -0,0 +1,64 @@
+"""
+Tests for the diagnostics helpers
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+
+from corp_inventory import diagnostics
+from corp_inventory.diagnostics import estimated_row_count, tail_lines
+from corp_inventory.models import Corporation
+
+
+class TailLinesTest(TestCase):
+    """Test reading the end of the log file"""
+
+    def setUp(self):
+        """Write a log file spanning several read blocks"""
+        handle, self.path = tempfile.mkstemp(suffix=".log")
+        with os.fdopen(handle, "w") as f:
+            for i in range(2000):
+                f.write(f"line {i} {'x' * 40}\n")
+        self.addCleanup(os.remove, self.path)
+
+    def test_last_lines_newest_first(self):
+        """Test the last lines come back complete and in reverse order"""
+        lines = tail_lines(self.path, 100)
+        self.assertEqual(len(lines), 100)
+        self.assertTrue(lines[0].startswith("line 1999 "))
+        self.assertTrue(lines[-1].startswith("line 1900 "))
+        self.assertTrue(all(line.endswith("x\n") for line in lines))
+
+    def test_reads_only_the_tail(self):
+        """Test a small tail does not read the whole file"""
+        bytes_read = []
+
+        def counting_open(*args, **kwargs):
+            f = open(*args, **kwargs)
+            read = f.read
+            f.read = lambda size=-1: bytes_read.append(size) or read(size)
+            return f
+
+        with mock.patch.object(diagnostics, "TAIL_BLOCK_SIZE", 512), \
+                mock.patch.object(diagnostics, "open", counting_open, create=True):
+            lines = tail_lines(self.path, 5)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(bytes_read, [512])
+
+    def test_short_file(self):
+        """Test a file with fewer lines than asked for"""
+        with open(self.path, "w") as f:
+            f.write("first\nsecond\n")
+        self.assertEqual(tail_lines(self.path, 100), ["second\n", "first\n"])
+
+
+class EstimatedRowCountTest(TestCase):
+    """Test the table row estimate"""
+
+    def test_falls_back_to_count(self):
+        """Test databases without statistics get an exact count"""
+        Corporation.objects.create(corporation_id=1, corporation_name="A")
+        self.assertEqual(estimated_row_count(Corporation), 1)
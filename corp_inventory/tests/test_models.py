@@ -4,7 +4,7 @@ Basic tests for Corp Inventory
 
 from django.test import TestCase
 from django.contrib.auth.models import User
-from corp_inventory.models import Corporation, HangarItem, Location
+from corp_inventory.models import Corporation, HangarItem, ItemType, Location
 
 
 class CorporationModelTest(TestCase):
@@ -70,11 +70,12 @@ class HangarItemModelTest(TestCase):
             location_type="station"
         )
         
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        
         self.item = HangarItem.objects.create(
             corporation=self.corporation,
             item_id=9876543210,
             type_id=34,  # Tritanium
-            type_name="Tritanium",
             location=self.location,
             quantity=1000000,
             estimated_value=5000000.00,
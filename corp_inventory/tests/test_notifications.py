@@ -0,0 +1,113 @@
+"""
+Tests for alert delivery
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from allianceauth.notifications.models import Notification
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from corp_inventory.models import AlertRule, Corporation, ItemType
+from corp_inventory.tasks import send_alert_notifications
+
+
+class _WebhookStub(BaseHTTPRequestHandler):
+    """Records the JSON bodies POSTed to it"""
+
+    received = []
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        self.received.append(json.loads(self.rfile.read(length)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SendAlertNotificationsTest(TestCase):
+    """Test alerts are delivered as per-user digests"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.added = AlertRule.objects.create(
+            corporation=self.corporation, name="Added", alert_type="ITEM_ADDED"
+        )
+        self.added.notify_users.add(self.alice, self.bob)
+        self.big = AlertRule.objects.create(
+            corporation=self.corporation, name="Big", alert_type="VALUE_THRESHOLD"
+        )
+        self.big.notify_users.add(self.alice)
+
+    def _alerts(self, rule, count):
+        return [
+            {
+                "rule_id": rule.pk,
+                "transaction_type": "ADD",
+                "type_id": 34,
+                "item_id": number,
+                "quantity_change": 10,
+                "old_quantity": 0,
+                "new_quantity": 10,
+                "estimated_value": 1500.0,
+                "location_name": "Jita IV - Moon 4",
+                "division_name": "Main",
+                "detected_at": None,
+            }
+            for number in range(count)
+        ]
+
+    def test_one_digest_per_user(self):
+        """Test each user gets one notification covering all their rules"""
+        created = send_alert_notifications(
+            self.corporation.pk, self._alerts(self.added, 3) + self._alerts(self.big, 2)
+        )
+        self.assertEqual(created, 2)
+        alice = Notification.objects.get(user=self.alice)
+        self.assertIn("5 alert(s)", alice.title)
+        self.assertEqual(alice.message.count("\n"), 4)
+        self.assertIn("[Added] ADD +10 Tritanium at Jita IV - Moon 4 / Main", alice.message)
+        self.assertIn("3 alert(s)", Notification.objects.get(user=self.bob).title)
+
+    def test_rate_limit_per_rule(self):
+        """Test alerts over a rule's hourly limit are counted, not listed"""
+        with mock.patch("corp_inventory.app_settings.CORPINVENTORY_ALERT_RATE_LIMIT", 2):
+            send_alert_notifications(self.corporation.pk, self._alerts(self.added, 3))
+            send_alert_notifications(self.corporation.pk, self._alerts(self.added, 1))
+        first, second = Notification.objects.filter(user=self.bob).order_by("pk")
+        self.assertEqual(first.message.count("[Added]"), 2)
+        self.assertIn("and 1 more alert(s)", first.message)
+        self.assertNotIn("[Added]", second.message)
+
+    def test_webhook_digest(self):
+        """Test the webhook receives one message for the sync"""
+        _WebhookStub.received = []
+        server = HTTPServer(("127.0.0.1", 0), _WebhookStub)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_port}/hook"
+        try:
+            with mock.patch("corp_inventory.app_settings.CORPINVENTORY_ALERT_WEBHOOK_URL", url):
+                send_alert_notifications(self.corporation.pk, self._alerts(self.added, 3))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(_WebhookStub.received), 1)
+        body = _WebhookStub.received[0]
+        self.assertEqual(len(body["alerts"]), 3)
+        self.assertTrue(body["content"].startswith("**Corp Inventory: 3 alert(s)"))
@@ -0,0 +1,96 @@
+"""
+Tests for keyset pagination
+"""
+
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+from django.http import QueryDict
+from django.test import TestCase
+from django.utils import timezone
+
+from corp_inventory.models import Corporation, HangarTransaction, ItemType, Location
+from corp_inventory.pagination import decode_cursor, keyset_paginate, seek
+
+
+class KeysetPaginateTest(TestCase):
+    """Test walking the transaction log by cursor"""
+
+    def setUp(self):
+        """Set up test data"""
+        corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        HangarTransaction.objects.bulk_create(
+            HangarTransaction(
+                corporation=corporation,
+                transaction_type="ADD",
+                type_id=34,
+                quantity_change=i,
+                location=location,
+            )
+            for i in range(25)
+        )
+        # Give pairs of rows the same timestamp so the id tie-break matters
+        now = timezone.now()
+        for trans in HangarTransaction.objects.all():
+            HangarTransaction.objects.filter(pk=trans.pk).update(
+                detected_at=now - timedelta(minutes=trans.quantity_change // 2)
+            )
+        self.expected = list(
+            HangarTransaction.objects.order_by("-detected_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def test_walks_every_row_once(self):
+        """Test following next links visits all rows newest first"""
+        seen = []
+        params = QueryDict("type=ADD")
+        while True:
+            page = keyset_paginate(HangarTransaction.objects.all(), "detected_at", params, per_page=10)
+            seen.extend(t.id for t in page)
+            if not page.has_next:
+                break
+            params = QueryDict(page.next_query)
+            self.assertEqual(params["type"], "ADD")
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_returns_to_same_page(self):
+        """Test the previous link of page two is page one"""
+        qs = HangarTransaction.objects.all()
+        first = keyset_paginate(qs, "detected_at", QueryDict(), per_page=10)
+        self.assertFalse(first.has_previous)
+        second = keyset_paginate(qs, "detected_at", QueryDict(first.next_query), per_page=10)
+        self.assertTrue(second.has_previous)
+        self.assertNotIn("after", parse_qs(second.previous_query))
+        back = keyset_paginate(qs, "detected_at", QueryDict(second.previous_query), per_page=10)
+        self.assertEqual([t.id for t in back], [t.id for t in first])
+        self.assertFalse(back.has_previous)
+
+    def test_bad_cursor_shows_first_page(self):
+        """Test a tampered cursor is ignored"""
+        self.assertIsNone(decode_cursor("not-a-cursor"))
+        page = keyset_paginate(
+            HangarTransaction.objects.all(), "detected_at", QueryDict("after=xyz"), per_page=10
+        )
+        self.assertEqual([t.id for t in page], self.expected[:10])
+
+    def test_cursor_condition_is_an_index_range(self):
+        """Test the OR on (time, id) comes with a plain bound the index can seek to"""
+        now = timezone.now()
+        column = '"corp_inventory_hangartransaction"."detected_at"'
+        for older, bound in ((True, "<="), (False, ">=")):
+            where = str(
+                seek(HangarTransaction.objects.all(), "detected_at", now, 5, older).query
+            ).split(" WHERE ", 1)[1]
+            # ANDed at the top level, before the OR group
+            self.assertTrue(where.startswith(f"({column} {bound} "), where)
+            self.assertIn(" OR ", where)
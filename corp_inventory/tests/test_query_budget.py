@@ -0,0 +1,188 @@
+"""
+Query budgets for the views and the sync phases
+
+Every view and sync phase runs against seeded data of two sizes. The number
+of queries must not grow with the data (writes may only grow by bulk batch)
+and must stay within the budget below, so an N+1 pattern fails here instead
+of showing up in production.
+"""
+
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from corp_inventory.attribution import attribute_transactions
+from corp_inventory.benchmark.generator import AssetGenerator
+from corp_inventory.benchmark.seed import seed_database, seeded_corporations
+from corp_inventory.benchmark.suite import prepare_database
+from corp_inventory.models import HangarItem
+from corp_inventory.tasks import process_assets, store_container_logs
+
+# Queries per request, including the session and user lookups of the
+# logged-in request
+VIEW_BUDGETS = {
+    "index": 5,
+    "corporation_hangar": 6,
+    "api_hangar_datatable": 5,
+    "api_hangar_data": 5,
+    "corporation_transactions": 4,
+    "transactions": 4,
+    "item_details": 4,
+    "statistics": 6,
+    "api_statistics_transactions": 5,
+    "api_statistics_value": 5,
+    "location": 5,
+    "location_items": 6,
+    "container_logs": 4,
+    "search": 4,
+    "manage_corporations": 3,
+    "logs": 7,
+}
+
+# SELECTs per sync phase; writes may add one statement per bulk batch
+SYNC_BUDGETS = {
+    "process_assets.initial": 11,
+    "process_assets.churn": 11,
+    "store_container_logs": 3,
+    "attribute_transactions": 2,
+}
+SYNC_WRITE_BASE = 10
+SYNC_ROWS_PER_WRITE = 20
+
+# Minimal stand-ins for the Alliance Auth base template and bundles, so the
+# real page templates render, and any query they trigger counts
+STUB_TEMPLATES = [
+    {**engine, "DIRS": [Path(__file__).parent / "templates", *engine.get("DIRS", [])]}
+    for engine in settings.TEMPLATES
+]
+
+
+@override_settings(TEMPLATES=STUB_TEMPLATES)
+class ViewQueryBudgetTest(TestCase):
+    """Test each view's queries do not grow with the data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seed a small and a large corporation"""
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        seed_database(corporations=1, items=100, transactions=300, container_logs=50, seed=1)
+        seed_database(corporations=1, items=400, transactions=1200, container_logs=200, seed=2)
+        cls.small, cls.large = seeded_corporations().order_by("corporation_id")
+
+    def setUp(self):
+        """Log in and compute every page instead of caching it"""
+        self.client.force_login(self.user)
+        patcher = mock.patch("corp_inventory.app_settings.CORPINVENTORY_VIEW_CACHE_TIMEOUT", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _queries(self, url_name, args=(), params=None) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse(f"corp_inventory:{url_name}", args=args), params or {}
+            )
+        self.assertEqual(response.status_code, 200, url_name)
+        return len(queries)
+
+    def assertWithinBudget(self, url_name, counts):
+        """Same query count at every size, and within the view's budget"""
+        self.assertEqual(len(set(counts)), 1, f"{url_name} queries grow with the data: {counts}")
+        self.assertLessEqual(counts[0], VIEW_BUDGETS[url_name], url_name)
+
+    def _per_corporation(self, url_name, params=None):
+        self.assertWithinBudget(url_name, [
+            self._queries(url_name, [corporation.corporation_id], params)
+            for corporation in (self.small, self.large)
+        ])
+
+    def test_corporation_views(self):
+        """Test the per-corporation pages and endpoints"""
+        self._per_corporation("corporation_hangar")
+        self._per_corporation("api_hangar_datatable", {"draw": 1, "start": 0, "length": 50})
+        self._per_corporation("api_hangar_data")
+        self._per_corporation("corporation_transactions", {"days": 90})
+        self._per_corporation("statistics")
+        self._per_corporation("api_statistics_transactions", {"days": 90})
+        self._per_corporation("api_statistics_value", {"days": 90})
+        self._per_corporation("container_logs")
+
+    def test_item_and_location_views(self):
+        """Test the item page and the location page and its item pages"""
+        items = [
+            HangarItem.objects.filter(corporation=corporation, is_active=True).first()
+            for corporation in (self.small, self.large)
+        ]
+        self.assertWithinBudget("item_details", [
+            self._queries("item_details", [item.item_id]) for item in items
+        ])
+        self.assertWithinBudget("location_items", [
+            self._queries(
+                "location_items", [item.location.location_id, item.corporation.corporation_id]
+            )
+            for item in items
+        ])
+        self.assertWithinBudget("location", [
+            self._queries("location", [item.location.location_id]) for item in items
+        ])
+
+    def test_all_corporation_views(self):
+        """Test pages over every corporation cost the same with more corporations"""
+        pages = [
+            ("index", None),
+            ("transactions", {"days": 90}),
+            ("search", {"q": "Benchmark Item"}),
+            ("manage_corporations", None),
+            ("logs", None),
+        ]
+        before = {name: self._queries(name, params=params) for name, params in pages}
+        seed_database(corporations=3, items=300, transactions=600, container_logs=30, seed=3)
+        for name, params in pages:
+            self.assertWithinBudget(name, [before[name], self._queries(name, params=params)])
+
+
+class SyncQueryBudgetTest(TestCase):
+    """Test the sync phases read a fixed number of times and write in bulk"""
+
+    def _measure(self, item_count) -> dict:
+        generator = AssetGenerator(seed=0)
+        corporation = prepare_database(generator)
+        prices = generator.prices()
+        assets = generator.assets(item_count)
+        phases = (
+            ("process_assets.initial", lambda: process_assets(corporation, assets, prices, None)),
+            ("process_assets.churn", lambda: process_assets(
+                corporation, generator.churn(assets, 0.1), prices, None
+            )),
+            ("store_container_logs", lambda: store_container_logs(
+                corporation, generator.container_logs(assets, item_count)
+            )),
+            ("attribute_transactions", lambda: attribute_transactions(corporation)),
+        )
+        counts = {}
+        for name, run in phases:
+            with CaptureQueriesContext(connection) as queries:
+                run()
+            statements = [query["sql"].split(None, 1)[0] for query in queries.captured_queries]
+            counts[name] = (
+                statements.count("SELECT"),
+                sum(1 for statement in statements if statement != "SELECT"),
+            )
+        corporation.delete()
+        return counts
+
+    def test_sync_phases(self):
+        """Test reads are constant and writes stay within bulk batches"""
+        sizes = (200, 800)
+        small, large = (self._measure(size) for size in sizes)
+        for name, budget in SYNC_BUDGETS.items():
+            self.assertEqual(small[name][0], large[name][0], f"{name} reads grow with the data")
+            self.assertLessEqual(large[name][0], budget, name)
+            self.assertLessEqual(
+                large[name][1], SYNC_WRITE_BASE + sizes[1] // SYNC_ROWS_PER_WRITE, name
+            )
@@ -0,0 +1,90 @@
+"""
+Tests for the search backends
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+
+from corp_inventory.models import Corporation, HangarItem, ItemType, Location
+from corp_inventory.search import (
+    FullTextSearchBackend,
+    LikeSearchBackend,
+    get_search_backend,
+)
+
+
+class LikeSearchBackendTest(TestCase):
+    """Test the portable LIKE search"""
+
+    def setUp(self):
+        """Set up test data"""
+        corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        jita = Location.objects.create(
+            location_id=60003760,
+            location_name="Jita IV - Moon 4 - Caldari Navy Assembly Plant",
+            location_type="station",
+        )
+        amarr = Location.objects.create(
+            location_id=60008494,
+            location_name="Amarr VIII (Oris) - Emperor Family Academy",
+            location_type="station",
+        )
+        for item_id, type_name, location in (
+            (1, "Tritanium", jita),
+            (2, "Nestor", amarr),
+            (3, "Caldari Navy Hookbill", amarr),
+        ):
+            HangarItem.objects.create(
+                corporation=corporation,
+                item_id=item_id,
+                type=ItemType.objects.create(type_id=item_id, name=type_name),
+                location=location,
+            )
+
+    def test_matches_any_field(self):
+        """Test a term matches item or location names"""
+        qs = LikeSearchBackend().filter(
+            HangarItem.objects.all(), "caldari", ["type__name", "location__location_name"]
+        )
+        self.assertEqual(sorted(qs.values_list("item_id", flat=True)), [1, 3])
+
+    def test_blank_query_is_noop(self):
+        """Test a blank query returns the queryset unchanged"""
+        qs = LikeSearchBackend().filter(HangarItem.objects.all(), "  ", ["type__name"])
+        self.assertEqual(qs.count(), 3)
+
+    def test_auto_backend_falls_back_to_like(self):
+        """Test 'auto' resolves to LIKE on databases without search indexes"""
+        with mock.patch("corp_inventory.search.connection") as conn:
+            conn.vendor = "sqlite"
+            self.assertIsInstance(get_search_backend(), LikeSearchBackend)
+            conn.vendor = "mysql"
+            self.assertIsInstance(get_search_backend(), FullTextSearchBackend)
+
+
+class FullTextSearchBackendTest(TestCase):
+    """Test FULLTEXT query building"""
+
+    def test_builds_prefix_terms(self):
+        """Test each word becomes a required prefix term"""
+        condition = FullTextSearchBackend().condition("cap +nav", ["type__name"])
+        match = condition.children[0]
+        self.assertEqual(match.source_expressions[1].value, "+cap* +nav*")
+
+    def test_short_words_fall_back_to_like(self):
+        """Test words below the FULLTEXT token size use LIKE"""
+        condition = FullTextSearchBackend().condition("EM ammo", ["type__name"])
+        self.assertEqual(condition.children, [("type__name__icontains", "EM ammo")])
+
+    def test_other_fields_use_like(self):
+        """Test only the first field uses FULLTEXT, the joined location LIKE"""
+        condition = FullTextSearchBackend().condition(
+            "jita", ["type__name", "location__location_name"]
+        )
+        match, like = condition.children
+        self.assertEqual(match.source_expressions[1].value, "+jita*")
+        self.assertEqual(like, ("location__location_name__icontains", "jita"))
@@ -0,0 +1,443 @@
+"""
+Tests for the sync tasks
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from corp_inventory.models import (
+    AlertRule,
+    ContainerLog,
+    Corporation,
+    HangarDivision,
+    HangarItem,
+    HangarTransaction,
+    HangarTypeTotal,
+    ItemType,
+    Location,
+)
+from corp_inventory.tasks import (
+    DELETION_PROGRESS_KEY,
+    coalesce_transactions,
+    delete_corporation_data,
+    process_assets,
+    store_container_logs,
+    sync_corporation_hangar,
+)
+
+
+class CoalesceTransactionsTest(TestCase):
+    """Test netting of per-item transactions"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        self.location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        self.division = HangarDivision.objects.create(
+            corporation=self.corporation,
+            division_id=1,
+            division_name="Main",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        ItemType.objects.create(type_id=35, name="Pyerite")
+
+    def _transaction(
+        self, transaction_type, type_id, quantity_change, division=None, item_id=None
+    ):
+        return HangarTransaction(
+            corporation=self.corporation,
+            transaction_type=transaction_type,
+            type_id=type_id,
+            quantity_change=quantity_change,
+            old_quantity=0,
+            new_quantity=quantity_change,
+            location=self.location,
+            division=division,
+            estimated_value=Decimal("1.50") * quantity_change,
+            item_id=item_id,
+        )
+
+    def test_nets_same_type_location_division(self):
+        """Test rows sharing type, location, division and kind are merged"""
+        transactions = [
+            self._transaction("ADD", 34, 100, self.division, item_id=1),
+            self._transaction("ADD", 34, 50, self.division, item_id=2),
+            self._transaction("ADD", 34, 10, item_id=3),
+            self._transaction("ADD", 35, 5, self.division, item_id=4),
+            self._transaction("CHANGE", 34, 7, self.division, item_id=5),
+        ]
+        result = coalesce_transactions(transactions)
+
+        self.assertEqual(len(result), 4)
+        merged = result[0]
+        self.assertEqual(merged.quantity_change, 150)
+        self.assertEqual(merged.new_quantity, 150)
+        self.assertEqual(merged.estimated_value, Decimal("225.00"))
+        self.assertEqual(merged.item_ids, [1, 2])
+        self.assertIsNone(merged.item_id)
+        self.assertEqual([t.item_ids for t in result[1:]], [[3], [4], [5]])
+        self.assertEqual([t.item_id for t in result[1:]], [3, 4, 5])
+
+        HangarTransaction.objects.bulk_create(result)
+        self.assertEqual(
+            HangarTransaction.objects.get(quantity_change=150).item_ids, [1, 2]
+        )
+
+
+class DeleteCorporationDataTest(TestCase):
+    """Test background deletion of a corporation"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        self.corporation = self._corporation(123456789, pending_delete=True)
+        self.other = self._corporation(987654321)
+
+    def _corporation(self, corporation_id, pending_delete=False):
+        corporation = Corporation.objects.create(
+            corporation_id=corporation_id,
+            corporation_name=f"Corp {corporation_id}",
+            pending_delete=pending_delete,
+        )
+        division = HangarDivision.objects.create(
+            corporation=corporation, division_id=1, division_name="Main"
+        )
+        for offset in range(5):
+            HangarItem.objects.create(
+                corporation=corporation,
+                item_id=corporation_id * 10 + offset,
+                type_id=34,
+                quantity=1,
+                location=self.location,
+                division=division,
+            )
+            HangarTransaction.objects.create(
+                corporation=corporation,
+                transaction_type="ADD",
+                type_id=34,
+                quantity_change=1,
+                location=self.location,
+                division=division,
+            )
+        return corporation
+
+    def test_deletes_in_batches(self):
+        """Test child rows go in bounded batches and other corps are untouched"""
+        with mock.patch("corp_inventory.tasks.DELETE_BATCH_SIZE", 2):
+            result = delete_corporation_data(self.corporation.pk)
+
+        self.assertEqual(result["deleted"]["Hangar Items"], 5)
+        self.assertEqual(result["deleted"]["Hangar Transactions"], 5)
+        self.assertFalse(Corporation.objects.filter(pk=self.corporation.pk).exists())
+        self.assertEqual(HangarItem.objects.count(), 5)
+        self.assertEqual(HangarTransaction.objects.filter(corporation=self.other).count(), 5)
+        self.assertIsNone(cache.get(DELETION_PROGRESS_KEY.format(self.corporation.pk)))
+
+    def test_requires_pending_delete(self):
+        """Test a corporation not marked for removal is left alone"""
+        self.assertEqual(delete_corporation_data(self.other.pk)["status"], "skipped")
+        self.assertTrue(Corporation.objects.filter(pk=self.other.pk).exists())
+
+
+class SyncDuringDeletionTest(TestCase):
+    """Test a sync never undoes a deletion started while it runs"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        self.assets = [{
+            "item_id": 1, "type_id": 34, "quantity": 10,
+            "location_id": 60003760, "location_flag": "CorpSAG1",
+        }]
+
+    def _mark_for_deletion(self, *args):
+        Corporation.objects.filter(pk=self.corporation.pk).update(
+            pending_delete=True, tracking_enabled=False
+        )
+
+    def _sync(self, **esi):
+        with mock.patch("corp_inventory.tasks.get_corporation_token"), \
+                mock.patch("corp_inventory.tasks.sync_divisions"), \
+                mock.patch("corp_inventory.tasks.sync_container_logs"), \
+                mock.patch("corp_inventory.tasks.PriceManager.get_market_prices",
+                           return_value={34: 5.0}), \
+                mock.patch.multiple("corp_inventory.tasks.CorpInventoryManager", **esi):
+            return sync_corporation_hangar(self.corporation.corporation_id)
+
+    def test_deleted_before_processing(self):
+        """Test no assets are written once the corporation is being removed"""
+        def assets(*args):
+            self._mark_for_deletion()
+            return self.assets
+
+        result = self._sync(get_corporation_assets=mock.Mock(side_effect=assets))
+        self.assertEqual(result["status"], "skipped")
+        self.assertFalse(HangarItem.objects.exists())
+        self.corporation.refresh_from_db()
+        self.assertTrue(self.corporation.pending_delete)
+
+    def test_deleted_after_processing(self):
+        """Test the final save does not write back the deletion flags"""
+        def wallets(*args):
+            self._mark_for_deletion()
+            return [{"division": 1, "balance": 1000}]
+
+        self._sync(
+            get_corporation_assets=mock.Mock(return_value=self.assets),
+            get_corporation_wallets=mock.Mock(side_effect=wallets),
+        )
+        self.corporation.refresh_from_db()
+        self.assertTrue(self.corporation.pending_delete)
+        self.assertFalse(self.corporation.tracking_enabled)
+        self.assertEqual(delete_corporation_data(self.corporation.pk)["status"], "success")
+
+
+class ProcessAssetsAlertTest(TestCase):
+    """Test alert rules are matched inline during a sync"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        ItemType.objects.create(type_id=35, name="Pyerite")
+        self.rule = AlertRule.objects.create(
+            corporation=self.corporation,
+            name="Tritanium added",
+            alert_type="ITEM_ADDED",
+            type_id=34,
+        )
+
+    def test_matches_are_handed_to_notification_task(self):
+        """Test only matches are dispatched, after commit, already flagged"""
+        assets = [
+            {"item_id": 1, "type_id": 34, "quantity": 100,
+             "location_id": 60003760, "location_flag": "CorpSAG1"},
+            {"item_id": 2, "type_id": 35, "quantity": 100,
+             "location_id": 60003760, "location_flag": "CorpSAG1"},
+        ]
+        with mock.patch("corp_inventory.tasks.send_alert_notifications") as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                process_assets(self.corporation, assets, {34: 5.0}, None)
+
+        corporation_pk, alerts = task.delay.call_args[0]
+        self.assertEqual(corporation_pk, self.corporation.pk)
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["rule_id"], self.rule.pk)
+        self.assertEqual(alerts[0]["item_id"], 1)
+        self.assertNotIn("transaction_id", alerts[0])
+        self.assertEqual(alerts[0]["estimated_value"], 500.0)
+        self.assertEqual(
+            list(HangarTransaction.objects.filter(notification_sent=True).values_list(
+                "type_id", flat=True
+            )),
+            [34],
+        )
+
+
+class TypeTotalsTest(TestCase):
+    """Test running totals and the aggregate alerts built on them"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        self.staging = Location.objects.create(
+            location_id=60003760,
+            location_name="Staging",
+            location_type="station",
+        )
+        Location.objects.create(
+            location_id=60008494,
+            location_name="Amarr VIII",
+            location_type="station",
+        )
+        ItemType.objects.create(type_id=16275, name="Strontium Clathrates")
+        ItemType.objects.create(type_id=34, name="Tritanium")
+
+    def _sync(self, stacks, prices=None):
+        assets = [
+            {"item_id": item_id, "type_id": type_id, "quantity": quantity,
+             "location_id": location_id, "location_flag": "CorpSAG1"}
+            for item_id, type_id, quantity, location_id in stacks
+        ]
+        with mock.patch("corp_inventory.tasks.send_alert_notifications") as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                process_assets(self.corporation, assets, prices or {16275: 100.0, 34: 5.0}, None)
+        return task.delay.call_args[0][1] if task.delay.called else []
+
+    def _totals(self):
+        return sorted(
+            HangarTypeTotal.objects.values_list("type_id", "location__location_id", "quantity")
+        )
+
+    def test_totals_follow_sync_diff(self):
+        """Test adds, changes, moves and removals keep totals equal to the items"""
+        self._sync([(1, 16275, 40000, 60003760), (2, 16275, 20000, 60003760), (3, 34, 10, 60003760)])
+        self.assertEqual(
+            self._totals(), [(34, 60003760, 10), (16275, 60003760, 60000)]
+        )
+
+        self._sync([(1, 16275, 35000, 60003760), (3, 34, 10, 60008494)])
+        self.assertEqual(
+            self._totals(), [(34, 60008494, 10), (16275, 60003760, 35000)]
+        )
+        self.assertEqual(
+            HangarTypeTotal.objects.get(type_id=16275).value, Decimal("3500000.00")
+        )
+
+    def test_quantity_below_is_edge_triggered(self):
+        """Test the alert fires once, when the total first drops below"""
+        AlertRule.objects.create(
+            corporation=self.corporation,
+            name="Stront low",
+            alert_type="QUANTITY_BELOW",
+            type_id=16275,
+            type_name="Strontium Clathrates",
+            location=self.staging,
+            quantity_threshold=50000,
+        )
+        self.assertEqual(self._sync([(1, 16275, 60000, 60003760)]), [])
+
+        alerts = self._sync([(1, 16275, 45000, 60003760)])
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["previous_quantity"], 60000)
+        self.assertIn("Strontium Clathrates at Staging: 45,000 units", alerts[0]["summary"])
+
+        self.assertEqual(self._sync([(1, 16275, 40000, 60003760)]), [])
+
+    def test_value_drop(self):
+        """Test a hangar-wide value drop beyond the percentage alerts"""
+        AlertRule.objects.create(
+            corporation=self.corporation,
+            name="Value drop",
+            alert_type="VALUE_DROP",
+            percent_threshold=Decimal("10"),
+        )
+        stacks = [(1, 16275, 1000, 60003760), (2, 34, 1000, 60003760)]
+        self._sync(stacks)
+        self.assertEqual(self._sync(stacks, {16275: 95.0, 34: 5.0}), [])
+        alerts = self._sync(stacks, {16275: 50.0, 34: 5.0})
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["previous_value"], 100000.0)
+
+    def test_one_total_per_key(self):
+        """Test a second row for a total is rejected, with or without a division"""
+        self._sync([(1, 34, 10, 60003760)])
+        total = HangarTypeTotal.objects.get()
+        self.assertIsNone(total.division_id)
+
+        for division in (None, HangarDivision.objects.create(
+            corporation=self.corporation, division_id=1, division_name="Main"
+        )):
+            HangarTypeTotal.objects.get_or_create(
+                corporation=self.corporation, type_id=34,
+                location=self.staging, division=division, defaults={"quantity": 1},
+            )
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                HangarTypeTotal.objects.create(
+                    corporation=self.corporation, type_id=34,
+                    location=self.staging, division=division, quantity=1,
+                )
+
+    def test_removal_recorded_once(self):
+        """Test a vanished stack gets one REMOVE, not one per later sync"""
+        self._sync([(1, 34, 10, 60003760), (2, 34, 20, 60003760)])
+        self._sync([(1, 34, 10, 60003760)])
+        self._sync([(1, 34, 10, 60003760)])
+
+        self.assertEqual(
+            HangarTransaction.objects.filter(transaction_type="REMOVE").count(), 1
+        )
+        self.assertFalse(HangarItem.objects.get(item_id=2).is_active)
+
+    def test_unchanged_items_not_rewritten(self):
+        """Test a sync without changes writes no item rows"""
+        stacks = [(1, 34, 3, 60003760), (2, 16275, 7, 60003760)]
+        self._sync(stacks, {16275: 100.0, 34: 0.333})
+        self.assertEqual(HangarItem.objects.get(item_id=1).estimated_value, Decimal("1.00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            self._sync(stacks, {16275: 100.0, 34: 0.333})
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE") and "corp_inventory_hangaritem" in query["sql"]
+        ])
+
+    def test_type_index_rebuilt_when_held_types_change(self):
+        """Test the type-ahead index is only rebuilt when a type is gained or lost"""
+        with mock.patch("corp_inventory.tasks.rebuild_type_index") as rebuild:
+            self._sync([(1, 34, 10, 60003760)])
+            self.assertEqual(rebuild.call_count, 1)
+
+            self._sync([(1, 34, 5, 60003760), (2, 34, 5, 60008494)])
+            self.assertEqual(rebuild.call_count, 1)
+
+            self._sync([(1, 16275, 10, 60003760)])
+            self.assertEqual(rebuild.call_count, 2)
+
+
+class StoreContainerLogsTest(TestCase):
+    """Test container log entries are stored once"""
+
+    def test_deduplicates(self):
+        """Test entries fetched again are not stored twice"""
+        corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        ItemType.objects.create(type_id=34, name="Tritanium")
+        now = timezone.now()
+        entries = [
+            {"character_id": 1, "action": "add", "type_id": 34, "quantity": 10,
+             "container_id": 5, "logged_at": now - timedelta(minutes=minutes)}
+            for minutes in (1, 2)
+        ]
+
+        self.assertEqual(store_container_logs(corporation, entries + entries[:1]), 2)
+        later = {"character_id": 2, "action": "lock", "container_id": 5, "logged_at": now}
+        self.assertEqual(store_container_logs(corporation, entries + [later]), 1)
+        self.assertEqual(ContainerLog.objects.count(), 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            store_container_logs(corporation, entries * 100)
+        # Types, character names, stored events; nothing new to insert
+        self.assertLessEqual(len(queries), 3)
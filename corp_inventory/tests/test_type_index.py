@@ -0,0 +1,85 @@
+"""
+Tests for the type name prefix index
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from corp_inventory.models import Corporation, HangarItem, ItemType, Location
+from corp_inventory.type_index import rebuild_type_index, search_types
+
+
+class TypeIndexTest(TestCase):
+    """Test building and querying the index"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        location = Location.objects.create(
+            location_id=60003760,
+            location_name="Test Station",
+            location_type="station",
+        )
+        names = {
+            1: "Nestor",
+            2: "Nestor Blueprint",
+            3: "Large Shield Extender II",
+            4: "Medium Shield Extender II",
+            5: "Shield Boost Amplifier I",
+        }
+        for type_id, name in names.items():
+            HangarItem.objects.create(
+                corporation=corporation,
+                item_id=type_id,
+                type=ItemType.objects.create(type_id=type_id, name=name),
+                quantity=1,
+                location=location,
+            )
+        # In the catalog but not held anywhere
+        ItemType.objects.create(type_id=6, name="Nestor Crate")
+        rebuild_type_index()
+
+    def test_matches_word_prefixes(self):
+        """Test any word of the name can start the match, names first"""
+        self.assertEqual(
+            [name for _, name in search_types("shield")],
+            ["Shield Boost Amplifier I", "Large Shield Extender II", "Medium Shield Extender II"],
+        )
+        self.assertEqual(
+            [type_id for type_id, _ in search_types("SHIELD  ext")], [3, 4]
+        )
+        self.assertEqual(search_types("hield"), [])
+
+    def test_only_held_types(self):
+        """Test types no tracked corporation holds are left out"""
+        self.assertEqual([type_id for type_id, _ in search_types("nest")], [1, 2])
+        self.assertEqual(search_types("nest", limit=1), [(1, "Nestor")])
+
+    def test_ranks_every_match(self):
+        """Test a name starting with the query wins over many earlier matches"""
+        corporation = Corporation.objects.get()
+        location = Location.objects.get()
+        types = ItemType.objects.bulk_create(
+            ItemType(type_id=100 + number, name=f"Widget {number} II") for number in range(600)
+        )
+        types.append(ItemType.objects.create(type_id=99, name="Iitala Crate"))
+        HangarItem.objects.bulk_create(
+            HangarItem(corporation=corporation, item_id=item_type.type_id,
+                       type=item_type, quantity=1, location=location)
+            for item_type in types
+        )
+        rebuild_type_index()
+        self.assertEqual(search_types("ii", limit=1), [(99, "Iitala Crate")])
+
+    def test_lookup_does_not_query_database(self):
+        """Test type-ahead is answered from the cached index"""
+        search_types("nest")
+        with CaptureQueriesContext(connection) as queries:
+            search_types("nestor b")
+        self.assertEqual(len(queries), 0)
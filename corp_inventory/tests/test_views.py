@@ -0,0 +1,439 @@
+"""
+Tests for Corp Inventory views
+"""
+
+import json
+from unittest import mock
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from corp_inventory.caching import bump_generation
+from corp_inventory.models import (
+    Corporation,
+    HangarDivision,
+    HangarItem,
+    HangarTransaction,
+    ItemType,
+    Location,
+)
+
+
+class HangarViewTestCase(TestCase):
+    """Hangar with five items, two without a division, and a logged-in admin"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.user)
+
+        self.corporation = Corporation.objects.create(
+            corporation_id=123456789,
+            corporation_name="Test Corp",
+        )
+        location = Location.objects.create(
+            location_id=60003760,
+            location_name="Jita IV - Moon 4",
+            location_type="station",
+        )
+        self.division = HangarDivision.objects.create(
+            corporation=self.corporation,
+            division_id=1,
+            division_name="Main",
+        )
+        names = ["Tritanium", "Pyerite", "Mexallon", "Isogen", "Nocxium"]
+        for item_id, name in enumerate(names, start=1):
+            HangarItem.objects.create(
+                corporation=self.corporation,
+                item_id=item_id,
+                type=ItemType.objects.create(type_id=item_id, name=name),
+                quantity=item_id * 10,
+                location=location,
+                division=self.division if item_id % 2 else None,
+            )
+
+
+class HangarDataTableTest(HangarViewTestCase):
+    """Test the server-side DataTables endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        self.url = reverse(
+            "corp_inventory:api_hangar_datatable", args=[self.corporation.corporation_id]
+        )
+
+    def test_pages_and_orders_in_sql(self):
+        """Test only the requested page comes back, in the requested order"""
+        response = self.client.get(self.url, {
+            "draw": "3",
+            "start": "1",
+            "length": "2",
+            "order[0][column]": "1",
+            "order[0][dir]": "desc",
+        })
+        payload = response.json()
+        self.assertEqual(payload["draw"], 3)
+        self.assertEqual(payload["recordsTotal"], 5)
+        self.assertEqual(payload["recordsFiltered"], 5)
+        self.assertEqual([row["quantity"] for row in payload["data"]], [40, 30])
+
+    def test_searches_and_page_filters(self):
+        """Test global search combines with the hangar division filter"""
+        response = self.client.get(self.url, {
+            "division": str(self.division.pk),
+            "search[value]": "ium",
+            "start": "0",
+            "length": "10",
+        })
+        payload = response.json()
+        self.assertEqual(payload["recordsTotal"], 3)
+        self.assertEqual(payload["recordsFiltered"], 2)
+        self.assertEqual(
+            [row["type_name"] for row in payload["data"]], ["Nocxium", "Tritanium"]
+        )
+
+    def test_column_search(self):
+        """Test a per-column search narrows on that column only"""
+        response = self.client.get(self.url, {
+            "columns[0][search][value]": "ite",
+            "length": "-1",
+        })
+        payload = response.json()
+        self.assertEqual([row["type_name"] for row in payload["data"]], ["Pyerite"])
+
+
+class GroupedHangarTest(HangarViewTestCase):
+    """Test the per-type hangar totals"""
+
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        # Two more Tritanium stacks, one of them outside any division
+        tritanium = HangarItem.objects.get(item_id=1)
+        for item_id, division in ((101, self.division), (102, None)):
+            HangarItem.objects.create(
+                corporation=self.corporation,
+                item_id=item_id,
+                type=tritanium.type,
+                quantity=5,
+                estimated_value=2,
+                location=tritanium.location,
+                division=division,
+            )
+
+    def test_groups_by_type(self):
+        """Test stacks of one type collapse into one row"""
+        response = self.client.get(
+            reverse("corp_inventory:api_hangar_datatable", args=[self.corporation.corporation_id]),
+            {"group": "type", "order[0][column]": "5", "order[0][dir]": "desc"},
+        )
+        payload = response.json()
+        self.assertEqual(payload["recordsTotal"], 5)
+        first = payload["data"][0]
+        self.assertEqual(first["type_name"], "Tritanium")
+        self.assertEqual(first["quantity"], 20)
+        self.assertEqual(first["stacks"], 3)
+        self.assertEqual(first["value"], 4.0)
+
+    def test_drill_down_to_stacks(self):
+        """Test a division group links to exactly its own stacks"""
+        response = self.client.get(
+            reverse("corp_inventory:api_hangar_data", args=[self.corporation.corporation_id]),
+            {"group": "division"},
+        )
+        groups = [g for g in response.json()["groups"] if g["type_name"] == "Tritanium"]
+        self.assertEqual(sorted(g["stacks"] for g in groups), [1, 2])
+
+        no_division = next(g for g in groups if not g["division"])
+        query = no_division["stacks_url"].split("?", 1)[1]
+        response = self.client.get(
+            reverse("corp_inventory:api_hangar_datatable", args=[self.corporation.corporation_id])
+            + "?" + query
+        )
+        self.assertEqual([row["item_id"] for row in response.json()["data"]], [102])
+
+
+class ExportTest(HangarViewTestCase):
+    """Test the streaming exports"""
+
+    def test_hangar_csv_uses_page_filters(self):
+        """Test the CSV export applies the hangar filters and streams rows"""
+        response = self.client.get(
+            reverse("corp_inventory:export_hangar", args=[self.corporation.corporation_id]),
+            {"division": str(self.division.pk), "format": "csv"},
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith("item_id,type_id,type_name"))
+        self.assertEqual([line.split(",")[2] for line in lines[1:]],
+                         ["Mexallon", "Nocxium", "Tritanium"])
+
+    def test_hangar_ndjson(self):
+        """Test the NDJSON export writes one object per line"""
+        response = self.client.get(
+            reverse("corp_inventory:export_hangar", args=[self.corporation.corporation_id]),
+            {"search": "Pyerite", "format": "ndjson"},
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row["type_name"], "Pyerite")
+        self.assertEqual(row["quantity"], 20)
+
+
+class StatisticsApiTest(HangarViewTestCase):
+    """Test the daily statistics series"""
+
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        item = HangarItem.objects.get(item_id=1)
+        now = timezone.now()
+        for days_ago, trans_type, value in (
+            (0, "ADD", 100),
+            (0, "ADD", 50),
+            (0, "REMOVE", 30),
+            (2, "CHANGE", 0),
+            (60, "ADD", 999),
+        ):
+            trans = HangarTransaction.objects.create(
+                corporation=self.corporation,
+                transaction_type=trans_type,
+                type_id=item.type_id,
+                quantity_change=1,
+                location=item.location,
+                estimated_value=value,
+            )
+            HangarTransaction.objects.filter(pk=trans.pk).update(
+                detected_at=now - timedelta(days=days_ago)
+            )
+
+    def test_daily_buckets(self):
+        """Test one row per day with per-type counts and value flows"""
+        response = self.client.get(
+            reverse(
+                "corp_inventory:api_statistics_transactions",
+                args=[self.corporation.corporation_id],
+            ),
+            {"days": "30"},
+        )
+        series = response.json()["series"]
+        self.assertEqual(len(series), 2)
+        today = series[-1]
+        self.assertEqual((today["ADD"], today["REMOVE"], today["CHANGE"]), (2, 1, 0))
+        self.assertEqual(today["value_added"], 150.0)
+        self.assertEqual(today["value_removed"], 30.0)
+        self.assertEqual(series[0]["CHANGE"], 1)
+
+    def test_range_is_clamped(self):
+        """Test the range covers older history but is capped"""
+        url = reverse(
+            "corp_inventory:api_statistics_transactions",
+            args=[self.corporation.corporation_id],
+        )
+        self.assertEqual(len(self.client.get(url, {"days": "90"}).json()["series"]), 3)
+        self.assertEqual(self.client.get(url, {"days": "100000"}).json()["days"], 365)
+
+
+class ConditionalGetTest(HangarViewTestCase):
+    """Test ETag / Last-Modified handling on the JSON API"""
+
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        cache.clear()
+        self.corporation.last_sync = timezone.now() - timedelta(minutes=5)
+        self.corporation.save()
+        self.url = reverse(
+            "corp_inventory:api_hangar_data", args=[self.corporation.corporation_id]
+        )
+
+    def test_unchanged_poll_is_not_modified(self):
+        """Test a matching If-None-Match gets 304 without reading the hangar"""
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Last-Modified", first)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertFalse(
+            any("corp_inventory_hangaritem" in q["sql"] for q in queries.captured_queries)
+        )
+
+        third = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(third.status_code, 304)
+
+    def test_sync_changes_etag(self):
+        """Test a new sync or different query string invalidates the ETag"""
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(self.client.get(self.url, {"group": "type"})["ETag"], etag)
+
+        bump_generation(self.corporation.pk)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class LocationItemsTest(HangarViewTestCase):
+    """Test the lazily loaded location item pages"""
+
+    def url(self, **params):
+        return reverse(
+            "corp_inventory:location_items",
+            args=[60003760, self.corporation.corporation_id],
+        ), params
+
+    def test_paginates_by_value(self):
+        """Test one page of a corporation's items is rendered"""
+        with mock.patch("corp_inventory.views.LOCATION_ITEMS_PER_PAGE", 2):
+            url, params = self.url(page="2")
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        page = response.context["page"]
+        self.assertEqual(page.paginator.count, 5)
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page.object_list), 2)
+        self.assertContains(response, "Page 2 of 3")
+
+    def test_division_filter(self):
+        """Test a division section only lists that division's items"""
+        url, params = self.url(division="none")
+        response = self.client.get(url, params)
+        self.assertEqual(
+            sorted(item.item_id for item in response.context["page"]), [2, 4]
+        )
+
+
+class ItemHistoryTest(HangarViewTestCase):
+    """Test the per-stack lineage endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        item = HangarItem.objects.get(item_id=1)
+        amarr = Location.objects.create(
+            location_id=60008494,
+            location_name="Amarr VIII",
+            location_type="station",
+        )
+        for trans_type, location, from_location, item_id in (
+            ("ADD", amarr, None, 1),
+            ("MOVE", item.location, amarr, 1),
+            ("ADD", item.location, None, 2),
+            ("CHANGE", item.location, None, None),
+        ):
+            HangarTransaction.objects.create(
+                corporation=self.corporation,
+                transaction_type=trans_type,
+                type_id=item.type_id,
+                quantity_change=0,
+                location=location,
+                from_location=from_location,
+                item_id=item_id,
+            )
+
+    def test_history_follows_moves(self):
+        """Test only the stack's own rows are returned, newest first"""
+        response = self.client.get(reverse("corp_inventory:api_item_history", args=[1]))
+        history = response.json()["history"]
+        self.assertEqual([row["transaction_type"] for row in history], ["MOVE", "ADD"])
+        self.assertEqual(history[0]["from_location"], "Amarr VIII")
+        self.assertEqual(history[0]["location"], "Jita IV - Moon 4")
+        self.assertEqual(history[1]["from_location_id"], None)
+
+    def test_lookup_uses_item_index(self):
+        """Test the history is a single query on item_id"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("corp_inventory:api_item_history", args=[1]))
+        history_queries = [
+            q["sql"] for q in queries.captured_queries
+            if "corp_inventory_hangartransaction" in q["sql"]
+        ]
+        self.assertEqual(len(history_queries), 1)
+        self.assertIn('"item_id" = 1', history_queries[0])
+
+
+class GlobalSearchTest(HangarViewTestCase):
+    """Test the cross-corporation item search"""
+
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        cache.clear()
+        other = Corporation.objects.create(
+            corporation_id=987654321,
+            corporation_name="Other Corp",
+        )
+        HangarItem.objects.create(
+            corporation=other,
+            item_id=6,
+            type_id=1,
+            quantity=5,
+            location=Location.objects.get(location_id=60003760),
+        )
+
+    def test_autocomplete(self):
+        """Test type-ahead returns held type names"""
+        response = self.client.get(reverse("corp_inventory:api_type_search"), {"q": "tri"})
+        self.assertEqual(response.json()["results"], [{"type_id": 1, "name": "Tritanium"}])
+
+    def test_totals_per_corporation_and_location(self):
+        """Test results are aggregated across corporations"""
+        with mock.patch(
+            "corp_inventory.views.render", return_value=HttpResponse()
+        ) as render:
+            self.client.get(reverse("corp_inventory:search"), {"q": "Tritanium"})
+        results = render.call_args[0][2]["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["total_quantity"], 15)
+        self.assertEqual(
+            [row["corporation__corporation_name"] for row in results[0]["holdings"]],
+            ["Test Corp", "Other Corp"],
+        )
+
+
+class DeleteCorporationTest(HangarViewTestCase):
+    """Test corporation removal from the manage page"""
+
+    def test_marks_pending_and_queues_task(self):
+        """Test the request only flags the corporation and hides it"""
+        with mock.patch("corp_inventory.views.delete_corporation_data") as task, \
+                mock.patch("corp_inventory.views.refresh_type_index") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse(
+                        "corp_inventory:delete_corporation",
+                        args=[self.corporation.corporation_id],
+                    )
+                )
+        task.delay.assert_called_once_with(self.corporation.pk)
+        refresh.delay.assert_called_once_with()
+        self.corporation.refresh_from_db()
+        self.assertTrue(self.corporation.pending_delete)
+        self.assertFalse(self.corporation.tracking_enabled)
+        self.assertEqual(HangarItem.objects.count(), 5)
+
+        response = self.client.get(
+            reverse("corp_inventory:api_hangar_data", args=[self.corporation.corporation_id])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_does_not_delete(self):
+        """Test only a POST starts the deletion"""
+        url = reverse("corp_inventory:delete_corporation", args=[self.corporation.corporation_id])
+        with mock.patch("corp_inventory.views.delete_corporation_data") as task:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 405)
+        task.delay.assert_not_called()
+        self.corporation.refresh_from_db()
+        self.assertFalse(self.corporation.pending_delete)
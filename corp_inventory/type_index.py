@@ -0,0 +1,139 @@
+"""
+Prefix index of held item type names for the global search
+
+Type-ahead has to answer on every keystroke, so it never queries the
+database. The index is a sorted list of lower-cased name suffixes starting at
+each word ("large shield extender ii", "shield extender ii", "extender ii",
+"ii"), so a ``bisect`` finds every type with a word starting with the typed
+text in O(log n).
+
+Only types some tracked corporation currently holds are indexed. The index is
+rebuilt when a sync changes the set of types a corporation holds, and shared
+through the Django cache; each process keeps its own unpickled copy and only
+reloads it when the version stored in the cache changes.
+"""
+
+import heapq
+import logging
+import re
+import time
+from bisect import bisect_left
+from typing import List, Tuple
+
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from .models import HangarItem, ItemType
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = "corp_inventory:type_index"
+VERSION_KEY = "corp_inventory:type_index:version"
+
+_WORD_START = re.compile(r"(?:^|(?<=[\s\-(/]))\S")
+
+# (version, index) of the copy loaded into this process
+_local = (None, None)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _suffixes(name: str) -> List[str]:
+    """Lower-cased suffixes of ``name`` starting at each word."""
+    name = normalize(name)
+    return [name[match.start():] for match in _WORD_START.finditer(name)]
+
+
+def build_type_index() -> dict:
+    """
+    Build the index from the type catalog.
+
+    Returns:
+        Dict with the sorted ``keys``, the ``type_ids`` in the same order and
+        ``names`` by type ID
+    """
+    held = HangarItem.objects.filter(
+        type_id=OuterRef("type_id"),
+        is_active=True,
+        corporation__tracking_enabled=True,
+    )
+    names = dict(
+        ItemType.objects.filter(Exists(held)).values_list("type_id", "name")
+    )
+    entries = sorted(
+        (suffix, type_id)
+        for type_id, name in names.items()
+        for suffix in _suffixes(name)
+    )
+    return {
+        "keys": [suffix for suffix, _ in entries],
+        "type_ids": [type_id for _, type_id in entries],
+        "names": names,
+    }
+
+
+def rebuild_type_index() -> dict:
+    """Rebuild the index and publish it to every process through the cache."""
+    global _local
+    index = build_type_index()
+    version = time.time_ns()
+    cache.set(INDEX_KEY, (version, index), None)
+    cache.set(VERSION_KEY, version, None)
+    _local = (version, index)
+    logger.debug(f"Rebuilt type index with {len(index['names'])} type(s)")
+    return index
+
+
+def get_type_index() -> dict:
+    """Current index, reloaded from the cache only when it has changed."""
+    global _local
+    version = cache.get(VERSION_KEY)
+    if version is not None and version == _local[0]:
+        return _local[1]
+    stored = cache.get(INDEX_KEY)
+    if stored is None:
+        return rebuild_type_index()
+    _local = stored
+    return stored[1]
+
+
+def search_types(query: str, limit: int = 10) -> List[Tuple[int, str]]:
+    """
+    Held item types with a word starting with ``query``.
+
+    Names starting with the query rank first, then shorter names.
+
+    Args:
+        query: Text typed so far
+        limit: Maximum number of results
+
+    Returns:
+        List of (type_id, name)
+    """
+    query = normalize(query)
+    if not query:
+        return []
+    index = get_type_index()
+    keys = index["keys"]
+
+    # Every match is ranked before cutting to ``limit``, so a short query
+    # still returns the best names rather than the first ones alphabetically
+    start = bisect_left(keys, query)
+    end = start
+    while end < len(keys) and keys[end].startswith(query):
+        end += 1
+    found = set(index["type_ids"][start:end])
+
+    names = index["names"]
+    ranked = heapq.nsmallest(
+        limit,
+        found,
+        key=lambda type_id: (
+            not normalize(names[type_id]).startswith(query),
+            len(names[type_id]),
+            names[type_id],
+        ),
+    )
+    return [(type_id, names[type_id]) for type_id in ranked]
@@ -40,8 +40,16 @@ urlpatterns = [
     # Item details
     path('item/<int:item_id>/', views.item_details, name='item_details'),
     
+    # Global item search
+    path('search/', views.global_search, name='search'),
+    
     # Location view
     path('location/<int:location_id>/', views.location_view, name='location'),
+    path(
+        'location/<int:location_id>/corporation/<int:corporation_id>/items/',
+        views.location_items,
+        name='location_items'
+    ),
     
     # API endpoints
     path(
@@ -49,6 +57,45 @@ urlpatterns = [
         views.api_hangar_data,
         name='api_hangar_data'
     ),
+    path(
+        'api/statistics/<int:corporation_id>/transactions/',
+        views.api_statistics_transactions,
+        name='api_statistics_transactions'
+    ),
+    path(
+        'api/statistics/<int:corporation_id>/value/',
+        views.api_statistics_value,
+        name='api_statistics_value'
+    ),
+    path(
+        'api/hangar/<int:corporation_id>/datatable/',
+        views.api_hangar_datatable,
+        name='api_hangar_datatable'
+    ),
+    path('api/search/types/', views.api_type_search, name='api_type_search'),
+    path(
+        'api/item/<int:item_id>/history/',
+        views.api_item_history,
+        name='api_item_history'
+    ),
+    
+    # Exports (CSV / NDJSON)
+    path(
+        'export/hangar/<int:corporation_id>/',
+        views.export_hangar,
+        name='export_hangar'
+    ),
+    path('export/transactions/', views.export_transactions, name='export_transactions'),
+    path(
+        'export/transactions/<int:corporation_id>/',
+        views.export_transactions,
+        name='export_corporation_transactions'
+    ),
+    path(
+        'export/container-logs/<int:corporation_id>/',
+        views.export_container_logs,
+        name='export_container_logs'
+    ),
     
     # Corporation management
     path('manage/', views.manage_corporations, name='manage_corporations'),
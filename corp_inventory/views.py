@@ -6,16 +6,33 @@ import logging
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, permission_required
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
+from django.contrib.humanize.templatetags.humanize import naturaltime
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncDay
 from django.http import JsonResponse
 from django.urls import NoReverseMatch, reverse
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from datetime import timedelta
+from urllib.parse import urlencode
 
 from esi.decorators import token_required
 
 from . import app_settings
+from .caching import bump_generation, cached_view_context, sync_validators
+from .diagnostics import estimated_row_count, tail_lines
+from .exports import (
+    CONTAINER_LOG_EXPORT_COLUMNS,
+    HANGAR_EXPORT_COLUMNS,
+    TRANSACTION_EXPORT_COLUMNS,
+    streaming_export,
+)
+from .pagination import keyset_paginate
+from .search import get_search_backend
 from .models import (
     Corporation,
     ContainerLog,
@@ -25,8 +42,15 @@ from .models import (
     HangarTransaction,
     HangarSnapshot,
     AlertRule,
+    ItemType,
+)
+from .tasks import (
+    delete_corporation_data,
+    get_deletion_progress,
+    refresh_type_index,
+    sync_corporation_hangar,
 )
-from .tasks import sync_corporation_hangar
+from .type_index import search_types
 
 logger = logging.getLogger(__name__)
 
@@ -62,42 +86,58 @@ def index(request):
     Main dashboard view showing overview of tracked corporations
     """
 
-    corporations = Corporation.objects.filter(tracking_enabled=True)
+    corporations = list(Corporation.objects.filter(tracking_enabled=True))
 
-    corp_stats = []
-    for corp in corporations:
-        active_items = HangarItem.objects.filter(
-            corporation=corp,
-            is_active=True
-        ).count()
+    def build():
+        return {'corp_stats': _dashboard_stats(corporations)}
+
+    context = cached_view_context('index', request, corporations, build)
+    context.update({
+        'title': 'Corp Inventory Dashboard',
+        'one_hour_ago': timezone.now() - timedelta(hours=1),
+    })
+
+    return render(request, 'corp_inventory/index.html', context)
 
-        total_value = HangarItem.objects.filter(
-            corporation=corp,
-            is_active=True
-        ).aggregate(total=Sum('estimated_value'))['total'] or 0
 
-        recent_transactions = HangarTransaction.objects.filter(
-            corporation=corp,
+def _dashboard_stats(corporations):
+    """
+    Per-corporation totals shown on the dashboard.
+
+    Item totals and recent transaction counts are grouped per corporation,
+    two queries however many corporations are tracked.
+    """
+    corp_pks = [corp.pk for corp in corporations]
+    item_totals = {
+        row['corporation_id']: row
+        for row in HangarItem.objects.filter(
+            corporation_id__in=corp_pks,
+            is_active=True
+        ).values('corporation_id').annotate(
+            count=Count('id'), total=Sum('estimated_value')
+        ).order_by()
+    }
+    transaction_counts = dict(
+        HangarTransaction.objects.filter(
+            corporation_id__in=corp_pks,
             detected_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
+        ).values_list('corporation_id').annotate(count=Count('id')).order_by()
+    )
 
+    corp_stats = []
+    for corp in corporations:
+        totals = item_totals.get(corp.pk, {})
+        total_value = totals.get('total') or 0
         corp_stats.append({
             'corporation': corp,
-            'active_items': active_items,
+            'active_items': totals.get('count', 0),
             'total_value': total_value,
             'total_value_display': isk_abbrev(total_value),
             'wallet_display': isk_full(corp.wallet_balance) if corp.wallet_balance else None,
-            'recent_transactions': recent_transactions,
+            'recent_transactions': transaction_counts.get(corp.pk, 0),
             'last_sync': corp.last_sync,
         })
-
-    context = {
-        'corp_stats': corp_stats,
-        'title': 'Corp Inventory Dashboard',
-        'one_hour_ago': timezone.now() - timedelta(hours=1),
-    }
-
-    return render(request, 'corp_inventory/index.html', context)
+    return corp_stats
 
 
 @login_required
@@ -105,58 +145,149 @@ def index(request):
 def corporation_hangar(request, corporation_id):
     """
     View hangar contents for a specific corporation
+
+    The item table itself is filled page by page from api_hangar_datatable.
     """
-    corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     
     # Get filter parameters
     division_filter = request.GET.get('division')
     location_filter = request.GET.get('location')
     search_query = request.GET.get('search')
+    group = request.GET.get('group', '')
+    if group not in HANGAR_GROUPINGS:
+        group = ''
+    type_filter = request.GET.get('type', '')
+    selected_type = None
+    if type_filter.isdigit():
+        selected_type = ItemType.objects.filter(type_id=type_filter).first()
+    
+    def build():
+        items = _filtered_hangar_items(corporation, request.GET)
+        
+        # Get available divisions and locations for filters
+        divisions = list(HangarDivision.objects.filter(corporation=corporation))
+        locations = list(Location.objects.filter(
+            items__corporation=corporation,
+            items__is_active=True
+        ).distinct())
+        
+        # Calculate totals
+        totals = items.aggregate(total=Sum('estimated_value'), count=Count('id'))
+        return {
+            'divisions': divisions,
+            'locations': locations,
+            'total_value': totals['total'] or 0,
+            'total_items': totals['count'],
+        }
+    
+    context = cached_view_context(
+        'corporation_hangar', request, [corporation], build
+    )
+    context.update({
+        'corporation': corporation,
+        'title': f'{corporation.corporation_name} Hangar',
+        'selected_division': division_filter,
+        'selected_location': location_filter,
+        'selected_type': selected_type,
+        'search_query': search_query,
+        'group': group,
+    })
     
-    # Base queryset
+    return render(request, 'corp_inventory/hangar.html', context)
+
+
+def _filtered_hangar_items(corporation, params):
+    """
+    Active hangar items for a corporation, narrowed by the hangar page filters
+    (``division``, ``location``, ``type`` and ``search`` GET parameters).
+    ``division=none`` selects items outside any hangar division.
+    """
     items = HangarItem.objects.filter(
         corporation=corporation,
         is_active=True
-    ).select_related('location', 'division')
+    )
+    
+    division_filter = params.get('division')
+    location_filter = params.get('location')
+    type_filter = params.get('type')
+    search_query = params.get('search')
     
-    # Apply filters
-    if division_filter:
+    if division_filter == 'none':
+        items = items.filter(division__isnull=True)
+    elif division_filter:
         items = items.filter(division_id=division_filter)
     
     if location_filter:
         items = items.filter(location_id=location_filter)
     
+    if type_filter and type_filter.isdigit():
+        items = items.filter(type_id=type_filter)
+    
     if search_query:
-        items = items.filter(
-            Q(type_name__icontains=search_query) |
-            Q(location__location_name__icontains=search_query)
+        items = get_search_backend().filter(
+            items, search_query, ['type__name', 'location__location_name']
         )
     
-    # Get available divisions and locations for filters
-    divisions = HangarDivision.objects.filter(corporation=corporation)
-    locations = Location.objects.filter(
-        items__corporation=corporation,
-        items__is_active=True
-    ).distinct()
-    
-    # Calculate totals
-    total_value = items.aggregate(total=Sum('estimated_value'))['total'] or 0
-    total_items = items.count()
-    
-    context = {
-        'corporation': corporation,
-        'items': items,
-        'divisions': divisions,
-        'locations': locations,
-        'total_value': total_value,
-        'total_items': total_items,
-        'title': f'{corporation.corporation_name} Hangar',
-        'selected_division': division_filter,
-        'selected_location': location_filter,
-        'search_query': search_query,
+    return items
+
+
+# ``group`` GET parameter -> columns the hangar is grouped on
+HANGAR_GROUPINGS = {
+    'type': ('type_id', 'type__name'),
+    'location': (
+        'type_id', 'type__name',
+        'location_id', 'location__location_id', 'location__location_name',
+        'location__solar_system_name',
+    ),
+    'division': (
+        'type_id', 'type__name',
+        'location_id', 'location__location_id', 'location__location_name',
+        'location__solar_system_name',
+        'division_id', 'division__division_name',
+    ),
+}
+
+
+def _grouped_hangar_items(items, group):
+    """
+    Aggregate hangar items per type (and optionally location and division)
+    with a single GROUP BY.
+
+    Returns:
+        values() QuerySet of the grouped columns plus ``total_quantity``,
+        ``total_value`` and ``stacks``
+    """
+    return items.values(*HANGAR_GROUPINGS[group]).annotate(
+        total_quantity=Sum('quantity'),
+        total_value=Sum('estimated_value'),
+        stacks=Count('id'),
+    )
+
+
+def _hangar_group_row(corporation, group, row):
+    """Serialize one grouped hangar row, with a drill-down link to its stacks."""
+    drill = {'type': row['type_id']}
+    data = {
+        'type_id': row['type_id'],
+        'type_name': row['type__name'],
+        'quantity': row['total_quantity'],
+        'value': float(row['total_value'] or 0),
+        'stacks': row['stacks'],
     }
-    
-    return render(request, 'corp_inventory/hangar.html', context)
+    if 'location_id' in row:
+        drill['location'] = row['location_id']
+        data['location_id'] = row['location__location_id']
+        data['location'] = row['location__location_name']
+        data['solar_system'] = row['location__solar_system_name'] or ''
+    if 'division_id' in row:
+        drill['division'] = row['division_id'] or 'none'
+        data['division'] = row['division__division_name'] or ''
+    data['stacks_url'] = (
+        reverse('corp_inventory:corporation_hangar', args=[corporation.corporation_id])
+        + '?' + urlencode(drill)
+    )
+    return data
 
 
 @login_required
@@ -165,16 +296,10 @@ def transaction_log(request, corporation_id=None):
     """
     View transaction history
     """
-    # Base queryset
-    transactions = HangarTransaction.objects.all().select_related(
-        'corporation', 'location', 'division'
-    )
-    
     # Filter by corporation if specified
     corporation = None
     if corporation_id:
-        corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
-        transactions = transactions.filter(corporation=corporation)
+        corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     
     # Get filter parameters
     transaction_type = request.GET.get('type')
@@ -182,31 +307,19 @@ def transaction_log(request, corporation_id=None):
     item_search = request.GET.get('search')
     character_search = request.GET.get('character')
     
-    # Apply filters
-    if transaction_type:
-        transactions = transactions.filter(transaction_type=transaction_type)
-    
-    try:
-        days = int(days_back)
-        cutoff_date = timezone.now() - timedelta(days=days)
-        transactions = transactions.filter(detected_at__gte=cutoff_date)
-    except ValueError:
-        pass
-    
-    if item_search:
-        transactions = transactions.filter(type_name__icontains=item_search)
-    
-    if character_search:
-        transactions = transactions.filter(character_name__icontains=character_search)
+    transactions = _filtered_transactions(corporation, request.GET).select_related(
+        'type', 'corporation', 'location', 'division'
+    )
     
-    # Order by most recent first
-    transactions = transactions.order_by('-detected_at')[:500]  # Limit to 500
+    # Most recent first, one keyset page at a time
+    page = keyset_paginate(transactions, 'detected_at', request.GET)
     
     # Get available corporations for filter
     corporations = Corporation.objects.filter(tracking_enabled=True)
     
     context = {
-        'transactions': transactions,
+        'transactions': page.object_list,
+        'page': page,
         'corporation': corporation,
         'corporations': corporations,
         'title': 'Transaction Log',
@@ -219,30 +332,214 @@ def transaction_log(request, corporation_id=None):
     return render(request, 'corp_inventory/transactions.html', context)
 
 
+def _filtered_transactions(corporation, params):
+    """
+    Transactions narrowed by the transaction log filters (``type``, ``days``,
+    ``search`` and ``character`` GET parameters).
+
+    Args:
+        corporation: Corporation to restrict to, or None for all
+        params: request.GET
+    """
+    transactions = HangarTransaction.objects.all()
+    if corporation:
+        transactions = transactions.filter(corporation=corporation)
+    
+    transaction_type = params.get('type')
+    days_back = params.get('days', '7')
+    item_search = params.get('search')
+    character_search = params.get('character')
+    
+    if transaction_type:
+        transactions = transactions.filter(transaction_type=transaction_type)
+    
+    try:
+        days = int(days_back)
+        cutoff_date = timezone.now() - timedelta(days=days)
+        transactions = transactions.filter(detected_at__gte=cutoff_date)
+    except ValueError:
+        pass
+    
+    search_backend = get_search_backend()
+    if item_search:
+        transactions = search_backend.filter(transactions, item_search, ['type__name'])
+    
+    if character_search:
+        transactions = search_backend.filter(
+            transactions, character_search, ['character_name']
+        )
+    
+    return transactions
+
+
 @login_required
 @permission_required("corp_inventory.view_hangar", raise_exception=True)
 def item_details(request, item_id):
     """
     View details and history for a specific item
     """
-    item = get_object_or_404(HangarItem, item_id=item_id)
+    item = get_object_or_404(
+        HangarItem.objects.select_related('type', 'corporation', 'location', 'division'),
+        item_id=item_id,
+        corporation__pending_delete=False,
+    )
     
-    # Get transaction history for this item type at this location
-    transactions = HangarTransaction.objects.filter(
-        corporation=item.corporation,
-        type_id=item.type_id,
-        location=item.location
-    ).order_by('-detected_at')[:50]
+    transactions = _item_history(item.item_id)[:ITEM_HISTORY_LIMIT]
+    
+    # Nested-set lookups: no recursion however deep the containers go
+    containers = list(item.containers().select_related('type'))
+    contents = list(
+        item.contents().select_related('type')[:CONTAINER_CONTENTS_LIMIT]
+    )
     
     context = {
         'item': item,
         'transactions': transactions,
+        'containers': containers,
+        'contents': contents,
+        'contents_truncated': len(contents) == CONTAINER_CONTENTS_LIMIT,
         'title': f'Item Details: {item.type_name}',
     }
     
     return render(request, 'corp_inventory/item_details.html', context)
 
 
+ITEM_HISTORY_LIMIT = 50
+
+CONTAINER_CONTENTS_LIMIT = 500
+
+
+def _item_history(item_id):
+    """
+    Transactions recorded for one item stack, newest first.
+
+    Served by the ``(item_id, -detected_at)`` index. Rows coalesced from
+    several stacks carry no item_id and only list it in ``item_ids``.
+    """
+    return HangarTransaction.objects.filter(
+        item_id=item_id
+    ).select_related(
+        'type', 'location', 'from_location', 'division'
+    ).order_by('-detected_at', '-id')
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+def api_item_history(request, item_id):
+    """
+    API endpoint with the movement and quantity history of one item stack
+
+    Works for stacks that have since left the hangar as well.
+    """
+    limit = min(max(_int_param(request.GET, 'limit', ITEM_HISTORY_LIMIT), 1), 500)
+    transactions = _item_history(item_id)[:limit]
+    
+    history = []
+    for trans in transactions:
+        history.append({
+            'detected_at': trans.detected_at.isoformat(),
+            'transaction_type': trans.transaction_type,
+            'type_id': trans.type_id,
+            'type_name': trans.type.name,
+            'quantity_change': trans.quantity_change,
+            'old_quantity': trans.old_quantity,
+            'new_quantity': trans.new_quantity,
+            'location_id': trans.location.location_id if trans.location else None,
+            'location': trans.location.location_name if trans.location else '',
+            'from_location_id': (
+                trans.from_location.location_id if trans.from_location else None
+            ),
+            'from_location': (
+                trans.from_location.location_name if trans.from_location else ''
+            ),
+            'division': trans.division.division_name if trans.division else '',
+            'value': float(trans.estimated_value),
+            'character_name': trans.character_name,
+        })
+    
+    return JsonResponse({'item_id': item_id, 'history': history})
+
+
+GLOBAL_SEARCH_MAX_TYPES = 20
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+def api_type_search(request):
+    """
+    Type-ahead for the global search, answered from the in-memory type index
+    """
+    limit = min(max(_int_param(request.GET, 'limit', 10), 1), GLOBAL_SEARCH_MAX_TYPES)
+    results = search_types(request.GET.get('q', ''), limit=limit)
+    return JsonResponse({
+        'results': [{'type_id': type_id, 'name': name} for type_id, name in results],
+    })
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+def global_search(request):
+    """
+    Find where an item type is held across all tracked corporations
+
+    ``?type=<type_id>`` shows one type; ``?q=`` shows every held type with a
+    word starting with the query. Results are per-corporation, per-location
+    totals from one GROUP BY query.
+    """
+    query = request.GET.get('q', '').strip()
+    type_filter = request.GET.get('type', '')
+    corporations = list(Corporation.objects.filter(tracking_enabled=True))
+    
+    def build():
+        if type_filter.isdigit():
+            type_ids = [int(type_filter)]
+        else:
+            type_ids = [
+                type_id for type_id, _ in search_types(query, limit=GLOBAL_SEARCH_MAX_TYPES)
+            ]
+        if not type_ids:
+            return {'results': []}
+        
+        results = []
+        by_type = {}
+        for row in HangarItem.objects.filter(
+            corporation__in=corporations,
+            type_id__in=type_ids,
+            is_active=True,
+        ).values(
+            'type_id', 'type__name',
+            'corporation__corporation_id', 'corporation__corporation_name',
+            'location__location_id', 'location__location_name',
+            'location__solar_system_name',
+        ).annotate(
+            total_quantity=Sum('quantity'),
+            total_value=Sum('estimated_value'),
+            stacks=Count('id'),
+        ).order_by('type__name', '-total_value'):
+            result = by_type.get(row['type_id'])
+            if result is None:
+                result = by_type[row['type_id']] = {
+                    'type_id': row['type_id'],
+                    'type_name': row['type__name'],
+                    'total_quantity': 0,
+                    'total_value': 0,
+                    'holdings': [],
+                }
+                results.append(result)
+            result['total_quantity'] += row['total_quantity']
+            result['total_value'] += row['total_value'] or 0
+            result['holdings'].append(row)
+        return {'results': results}
+    
+    context = cached_view_context('global_search', request, corporations, build)
+    context.update({
+        'query': query,
+        'title': 'Item Search',
+    })
+    
+    return render(request, 'corp_inventory/search.html', context)
+
+
 @login_required
 def sync_corporation(request, corporation_id):
     """
@@ -253,7 +550,7 @@ def sync_corporation(request, corporation_id):
         or request.user.has_perm('corp_inventory.manage_tracking')
     ):
         raise PermissionDenied
-    corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     
     # Trigger sync task
     sync_corporation_hangar.delay(corporation_id)
@@ -273,33 +570,103 @@ def sync_corporation(request, corporation_id):
 def location_view(request, location_id):
     """
     View all items at a specific location across all corporations
+
+    Only per-corporation and per-division totals are computed here (two
+    GROUP BY queries); each corporation's item list is loaded page by page
+    from location_items when its section is opened.
+    """
+    location = get_object_or_404(Location, location_id=location_id)
+    
+    def build():
+        items = HangarItem.objects.filter(
+            location=location,
+            is_active=True,
+            corporation__pending_delete=False,
+        )
+        
+        corp_sections = []
+        sections_by_pk = {}
+        for row in items.values(
+            'corporation_id', 'corporation__corporation_id', 'corporation__corporation_name'
+        ).annotate(
+            item_count=Count('id'), value=Sum('estimated_value')
+        ).order_by('corporation__corporation_name'):
+            section = {
+                'corporation_id': row['corporation__corporation_id'],
+                'corporation_name': row['corporation__corporation_name'],
+                'item_count': row['item_count'],
+                'value': row['value'] or 0,
+                'divisions': [],
+            }
+            corp_sections.append(section)
+            sections_by_pk[row['corporation_id']] = section
+        
+        for row in items.values(
+            'corporation_id', 'division_id', 'division__division_name'
+        ).annotate(
+            item_count=Count('id'), value=Sum('estimated_value')
+        ).order_by('corporation_id', 'division__division_name'):
+            sections_by_pk[row['corporation_id']]['divisions'].append({
+                'division': row['division_id'] or 'none',
+                'division_name': row['division__division_name'],
+                'item_count': row['item_count'],
+                'value': row['value'] or 0,
+            })
+        
+        return {
+            'corp_sections': corp_sections,
+            'total_items': sum(section['item_count'] for section in corp_sections),
+            'total_value': sum(section['value'] for section in corp_sections),
+        }
+    
+    # Any corporation may hold items here
+    context = cached_view_context(
+        'location_view', request, Corporation.objects.filter(pending_delete=False),
+        build, location_id
+    )
+    context.update({
+        'location': location,
+        'title': f'Location: {location.location_name}',
+    })
+    
+    return render(request, 'corp_inventory/location.html', context)
+
+
+LOCATION_ITEMS_PER_PAGE = 50
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+def location_items(request, location_id, corporation_id):
+    """
+    One page of a corporation's items at a location, rendered as an HTML
+    fragment for the location page (optionally narrowed to a ``division``)
     """
     location = get_object_or_404(Location, location_id=location_id)
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     
     items = HangarItem.objects.filter(
         location=location,
+        corporation=corporation,
         is_active=True
-    ).select_related('corporation', 'division')
-    
-    # Group by corporation
-    corp_items = {}
-    for item in items:
-        corp_name = item.corporation.corporation_name
-        if corp_name not in corp_items:
-            corp_items[corp_name] = []
-        corp_items[corp_name].append(item)
+    )
+    division_filter = request.GET.get('division', '')
+    if division_filter == 'none':
+        items = items.filter(division__isnull=True)
+    elif division_filter.isdigit():
+        items = items.filter(division_id=division_filter)
+    items = items.select_related('type', 'division').order_by('-estimated_value', 'id')
     
-    total_value = items.aggregate(total=Sum('estimated_value'))['total'] or 0
+    page = Paginator(items, LOCATION_ITEMS_PER_PAGE).get_page(request.GET.get('page'))
     
     context = {
         'location': location,
-        'corp_items': corp_items,
-        'total_items': items.count(),
-        'total_value': total_value,
-        'title': f'Location: {location.location_name}',
+        'corporation': corporation,
+        'page': page,
+        'division_filter': division_filter,
     }
     
-    return render(request, 'corp_inventory/location.html', context)
+    return render(request, 'corp_inventory/location_items.html', context)
 
 
 @login_required
@@ -308,66 +675,176 @@ def statistics(request, corporation_id):
     """
     View statistics and charts for a corporation
     """
-    corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
-    
-    # Get recent snapshots
-    snapshots = HangarSnapshot.objects.filter(
-        corporation=corporation
-    ).order_by('-snapshot_time')[:30]
-    
-    # Top items by value
-    top_items = HangarItem.objects.filter(
-        corporation=corporation,
-        is_active=True
-    ).order_by('-estimated_value')[:10]
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     
-    # Transaction summary
-    transaction_summary = {}
-    for trans_type, label in HangarTransaction.TRANSACTION_TYPE_CHOICES:
-        count = HangarTransaction.objects.filter(
+    def build():
+        # Top items by value
+        top_items = list(HangarItem.objects.filter(
+            corporation=corporation,
+            is_active=True
+        ).select_related('type', 'location').order_by('-estimated_value')[:10])
+        
+        # Transaction summary: one conditional COUNT per type in a single query
+        counts = HangarTransaction.objects.filter(
             corporation=corporation,
-            transaction_type=trans_type,
             detected_at__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        transaction_summary[label] = count
-    
-    # Active alert rules
-    alert_rules = AlertRule.objects.filter(
-        corporation=corporation,
-        is_active=True
-    )
+        ).aggregate(**_transaction_type_counts())
+        transaction_summary = {
+            label: counts[trans_type]
+            for trans_type, label in HangarTransaction.TRANSACTION_TYPE_CHOICES
+        }
+        
+        # Active alert rules
+        alert_rules = list(AlertRule.objects.filter(
+            corporation=corporation,
+            is_active=True
+        ))
+        return {
+            'top_items': top_items,
+            'transaction_summary': transaction_summary,
+            'alert_rules': alert_rules,
+        }
     
-    context = {
+    context = cached_view_context('statistics', request, [corporation], build)
+    context.update({
         'corporation': corporation,
-        'snapshots': snapshots,
-        'top_items': top_items,
-        'transaction_summary': transaction_summary,
-        'alert_rules': alert_rules,
+        'stats_ranges': STATISTICS_RANGES,
         'title': f'{corporation.corporation_name} Statistics',
-    }
+    })
     
     return render(request, 'corp_inventory/statistics.html', context)
 
 
+# Selectable chart ranges on the statistics page (days)
+STATISTICS_RANGES = (30, 90, 180, 365)
+STATISTICS_MAX_DAYS = 365
+
+
+def _transaction_type_counts():
+    """``aggregate()``/``annotate()`` kwargs counting rows per transaction type."""
+    return {
+        trans_type: Count('id', filter=Q(transaction_type=trans_type))
+        for trans_type, _ in HangarTransaction.TRANSACTION_TYPE_CHOICES
+    }
+
+
+# Conditional GET: JSON endpoints answer 304 until the corporation syncs again.
+# no-cache makes clients revalidate instead of guessing freshness from
+# Last-Modified.
+_sync_etag, _sync_last_modified = sync_validators()
+_daily_etag, _daily_last_modified = sync_validators(per_day=True)
+
+
+def _statistics_since(params):
+    """Start of the requested ``days`` range, clamped to 1..STATISTICS_MAX_DAYS."""
+    days = min(max(_int_param(params, 'days', 30), 1), STATISTICS_MAX_DAYS)
+    since = timezone.now() - timedelta(days=days)
+    return days, since
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_daily_etag, last_modified_func=_daily_last_modified)
+def api_statistics_transactions(request, corporation_id):
+    """
+    Daily transaction counts per type, value added and value removed over the
+    last ``days`` days, bucketed in SQL
+    """
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
+    days, since = _statistics_since(request.GET)
+    
+    rows = HangarTransaction.objects.filter(
+        corporation=corporation,
+        detected_at__gte=since,
+    ).annotate(
+        day=TruncDay('detected_at')
+    ).values('day').annotate(
+        **_transaction_type_counts(),
+        value_added=Sum('estimated_value', filter=Q(transaction_type='ADD')),
+        value_removed=Sum('estimated_value', filter=Q(transaction_type='REMOVE')),
+    ).order_by('day')
+    
+    series = []
+    for row in rows:
+        entry = {'day': row['day'].date().isoformat()}
+        for trans_type, _ in HangarTransaction.TRANSACTION_TYPE_CHOICES:
+            entry[trans_type] = row[trans_type]
+        entry['value_added'] = float(row['value_added'] or 0)
+        entry['value_removed'] = float(row['value_removed'] or 0)
+        series.append(entry)
+    
+    return JsonResponse({'days': days, 'series': series})
+
+
 @login_required
 @permission_required("corp_inventory.view_hangar", raise_exception=True)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_daily_etag, last_modified_func=_daily_last_modified)
+def api_statistics_value(request, corporation_id):
+    """
+    Daily hangar value and item count from snapshots over the last ``days``
+    days (average of the day's snapshots), bucketed in SQL
+    """
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
+    days, since = _statistics_since(request.GET)
+    
+    rows = HangarSnapshot.objects.filter(
+        corporation=corporation,
+        snapshot_time__gte=since,
+    ).annotate(
+        day=TruncDay('snapshot_time')
+    ).values('day').annotate(
+        total_value=Avg('total_value'),
+        total_items=Avg('total_items'),
+    ).order_by('day')
+    
+    series = [
+        {
+            'day': row['day'].date().isoformat(),
+            'total_value': float(row['total_value'] or 0),
+            'total_items': round(row['total_items'] or 0),
+        }
+        for row in rows
+    ]
+    
+    return JsonResponse({'days': days, 'series': series})
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_sync_etag, last_modified_func=_sync_last_modified)
 def api_hangar_data(request, corporation_id):
     """
     API endpoint to get hangar data as JSON for AJAX requests
+
+    With ``?group=type|location|division`` returns per-type totals (optionally
+    per location and division) under ``groups`` instead of individual stacks.
     """
-    corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     
     items = HangarItem.objects.filter(
         corporation=corporation,
         is_active=True
-    ).select_related('location', 'division')
+    )
+    
+    group = request.GET.get('group')
+    if group in HANGAR_GROUPINGS:
+        groups = _grouped_hangar_items(items, group).order_by(*HANGAR_GROUPINGS[group])
+        return JsonResponse({
+            'group': group,
+            'groups': [_hangar_group_row(corporation, group, row) for row in groups],
+        })
+    
+    items = items.select_related('type', 'location', 'division')
     
     data = []
     for item in items:
         data.append({
             'item_id': item.item_id,
             'type_id': item.type_id,
-            'type_name': item.type_name,
+            'type_name': item.type.name,
             'quantity': item.quantity,
             'location': item.location.location_name,
             'division': item.division.division_name if item.division else '',
@@ -377,6 +854,194 @@ def api_hangar_data(request, corporation_id):
     return JsonResponse({'items': data})
 
 
+# DataTables column index -> (ORDER BY field, searched field) for the hangar table
+HANGAR_DATATABLE_COLUMNS = [
+    ('type__name', 'type__name'),
+    ('quantity', None),
+    ('location__location_name', 'location__location_name'),
+    ('division__division_name', 'division__division_name'),
+    ('estimated_value', None),
+    ('last_seen', None),
+    (None, None),  # Actions
+]
+# Same columns when the table is grouped (see HANGAR_GROUPINGS)
+HANGAR_GROUPED_DATATABLE_COLUMNS = [
+    ('type__name', 'type__name'),
+    ('total_quantity', None),
+    ('location__location_name', 'location__location_name'),
+    ('division__division_name', 'division__division_name'),
+    ('total_value', None),
+    ('stacks', None),
+    (None, None),  # Drill-down
+]
+HANGAR_DATATABLE_MAX_LENGTH = 500
+
+
+def _int_param(params, key, default):
+    try:
+        return int(params.get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+def api_hangar_datatable(request, corporation_id):
+    """
+    DataTables server-side processing endpoint for the hangar table.
+
+    Paging, ordering, the global search box and per-column searches are all
+    applied in SQL on top of the hangar page filters, and only the requested
+    page of rows is serialized. With a ``group`` parameter the rows are
+    per-type aggregates (see HANGAR_GROUPINGS) rather than item stacks.
+    """
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
+    params = request.GET
+    group = params.get('group')
+    if group not in HANGAR_GROUPINGS:
+        group = None
+    columns = HANGAR_GROUPED_DATATABLE_COLUMNS if group else HANGAR_DATATABLE_COLUMNS
+    
+    items = _filtered_hangar_items(corporation, params)
+    if group:
+        records_total = _grouped_hangar_items(items, group).count()
+    else:
+        records_total = items.count()
+    
+    search_backend = get_search_backend()
+    searched = False
+    global_search = params.get('search[value]', '').strip()
+    if global_search:
+        items = search_backend.filter(
+            items, global_search, ['type__name', 'location__location_name']
+        )
+        searched = True
+    for index, (_, search_field) in enumerate(columns):
+        column_search = params.get(f'columns[{index}][search][value]', '').strip()
+        if search_field and column_search:
+            items = search_backend.filter(items, column_search, [search_field])
+            searched = True
+    
+    if group:
+        # Only grouped columns and aggregates can be sorted on without
+        # changing the GROUP BY
+        sortable = set(HANGAR_GROUPINGS[group]) | {'total_quantity', 'total_value', 'stacks'}
+        items = _grouped_hangar_items(items, group)
+        tie_break = [key for key in HANGAR_GROUPINGS[group] if key.endswith('_id')]
+    else:
+        sortable = None
+        tie_break = ['id']
+    records_filtered = items.count() if searched else records_total
+    
+    ordering = []
+    index = 0
+    while f'order[{index}][column]' in params:
+        column = _int_param(params, f'order[{index}][column]', -1)
+        if 0 <= column < len(columns):
+            order_field = columns[column][0]
+            if order_field and (sortable is None or order_field in sortable):
+                prefix = '-' if params.get(f'order[{index}][dir]') == 'desc' else ''
+                ordering.append(f'{prefix}{order_field}')
+        index += 1
+    # Unique tie-break keeps rows from repeating or vanishing across pages
+    items = items.order_by(*(ordering or ['type__name']), *tie_break)
+    
+    start = max(_int_param(params, 'start', 0), 0)
+    length = _int_param(params, 'length', 50)
+    if length < 1 or length > HANGAR_DATATABLE_MAX_LENGTH:
+        length = HANGAR_DATATABLE_MAX_LENGTH
+    
+    if group:
+        data = [
+            _hangar_group_row(corporation, group, row)
+            for row in items[start:start + length]
+        ]
+    else:
+        data = [
+            _hangar_item_row(item)
+            for item in items.select_related('type', 'location', 'division')[start:start + length]
+        ]
+    
+    return JsonResponse({
+        'draw': _int_param(params, 'draw', 0),
+        'recordsTotal': records_total,
+        'recordsFiltered': records_filtered,
+        'data': data,
+    })
+
+
+def _hangar_item_row(item):
+    """Serialize one hangar item stack for the hangar table."""
+    return {
+        'item_id': item.item_id,
+        'type_id': item.type_id,
+        'type_name': item.type.name,
+        'is_blueprint_copy': item.is_blueprint_copy,
+        'quantity': item.quantity,
+        'location_id': item.location.location_id,
+        'location': item.location.location_name,
+        'solar_system': item.location.solar_system_name or '',
+        'division': item.division.division_name if item.division else '',
+        'value': float(item.estimated_value),
+        'last_seen': naturaltime(item.last_seen),
+    }
+
+
+@login_required
+@permission_required("corp_inventory.view_hangar", raise_exception=True)
+def export_hangar(request, corporation_id):
+    """
+    Stream a corporation's hangar as CSV or NDJSON (``?format=``), using the
+    same filters as the hangar page
+    """
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
+    items = _filtered_hangar_items(corporation, request.GET).order_by('type__name', 'id')
+    return streaming_export(
+        items,
+        HANGAR_EXPORT_COLUMNS,
+        request.GET.get('format', 'csv'),
+        f'hangar-{corporation.corporation_id}',
+    )
+
+
+@login_required
+@permission_required("corp_inventory.view_transactions", raise_exception=True)
+def export_transactions(request, corporation_id=None):
+    """
+    Stream transactions as CSV or NDJSON (``?format=``), using the same
+    filters as the transaction log
+    """
+    corporation = None
+    if corporation_id:
+        corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
+    transactions = _filtered_transactions(corporation, request.GET).order_by(
+        '-detected_at', '-id'
+    )
+    return streaming_export(
+        transactions,
+        TRANSACTION_EXPORT_COLUMNS,
+        request.GET.get('format', 'csv'),
+        f'transactions-{corporation.corporation_id}' if corporation else 'transactions',
+    )
+
+
+@login_required
+@permission_required("corp_inventory.basic_access", raise_exception=True)
+def export_container_logs(request, corporation_id):
+    """
+    Stream container logs as CSV or NDJSON (``?format=``), using the same
+    filters as the container log page
+    """
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
+    logs = _filtered_container_logs(corporation, request.GET).order_by('-logged_at', '-id')
+    return streaming_export(
+        logs,
+        CONTAINER_LOG_EXPORT_COLUMNS,
+        request.GET.get('format', 'csv'),
+        f'container-logs-{corporation.corporation_id}',
+    )
+
+
 @login_required
 @permission_required("corp_inventory.manage_corporations", raise_exception=True)
 @token_required(scopes=app_settings.CORPINVENTORY_ESI_SCOPES)
@@ -454,6 +1119,12 @@ def manage_corporations(request):
                     )
                     # Trigger initial sync
                     sync_corporation_hangar.delay(int(corp_id))
+                elif corporation.pending_delete:
+                    messages.warning(
+                        request,
+                        f'{corp_name} is still being removed; add it again once '
+                        f'the removal has finished.'
+                    )
                 else:
                     messages.info(
                         request,
@@ -472,8 +1143,12 @@ def manage_corporations(request):
     
     # GET request - show all corporations
     corporations = list(Corporation.objects.all().order_by('-tracking_enabled', 'corporation_name'))
+    deletion_progress = get_deletion_progress(
+        corp.pk for corp in corporations if corp.pending_delete
+    )
     for corp in corporations:
         corp.wallet_display = isk_full(corp.wallet_balance) if corp.wallet_balance is not None else None
+        corp.deletion_progress = deletion_progress.get(corp.pk)
     
     # Determine ESI token URL - try user setting first, then auto-detect, then fallback
     from django.conf import settings
@@ -515,9 +1190,11 @@ def toggle_corporation_tracking(request, corporation_id):
     Enable or disable tracking for a corporation
     """
     if request.method == 'POST':
-        corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
+        corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
         corporation.tracking_enabled = not corporation.tracking_enabled
         corporation.save()
+        # Only tracked corporations' types are offered in the type-ahead
+        transaction.on_commit(refresh_type_index.delay)
         
         status = 'enabled' if corporation.tracking_enabled else 'disabled'
         messages.success(
@@ -532,24 +1209,36 @@ def toggle_corporation_tracking(request, corporation_id):
 
 @login_required
 @permission_required("corp_inventory.manage_corporations", raise_exception=True)
+@require_POST
 def delete_corporation(request, corporation_id):
     """
     Delete a corporation and all associated data
+
+    The corporation is hidden and its tracking stopped immediately; the rows
+    themselves are deleted in batches by a background task.
     """
-    corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
     corp_name = corporation.corporation_name
     
-    # Delete the corporation (cascade will handle related objects)
-    corporation.delete()
+    Corporation.objects.filter(pk=corporation.pk).update(
+        pending_delete=True, tracking_enabled=False
+    )
+    bump_generation(corporation.pk)
+    transaction.on_commit(refresh_type_index.delay)
+    delete_corporation_data.delay(corporation.pk)
     
     messages.success(
         request,
-        f'Successfully removed {corp_name} and all associated data.'
+        f'Removing {corp_name} and all associated data in the background.'
     )
     
     return redirect('corp_inventory:manage_corporations')
 
 
+# Window for the per-corporation transaction counts on the diagnostics page
+DIAGNOSTICS_TRANSACTION_DAYS = 30
+
+
 @login_required
 @permission_required("corp_inventory.manage_corporations", raise_exception=True)
 def view_logs(request):
@@ -561,41 +1250,54 @@ def view_logs(request):
     import logging.handlers
     import os
     
-    corporations = Corporation.objects.all()
+    corporations = list(Corporation.objects.all())
+    corp_ids = [corp.corporation_id for corp in corporations]
+    
+    # Characters per corporation (one query)
+    corp_characters = {}
+    for corp_id, character_id in EveCharacter.objects.filter(
+        corporation_id__in=corp_ids
+    ).values_list('corporation_id', 'character_id'):
+        corp_characters.setdefault(corp_id, set()).add(character_id)
+    
+    # Valid tokens with the required scopes, checked once for all characters
+    all_characters = set().union(*corp_characters.values())
+    token_characters = list(
+        Token.objects.filter(character_id__in=all_characters)
+        .require_scopes(app_settings.CORPINVENTORY_ESI_SCOPES)
+        .require_valid()
+        .values_list('character_id', flat=True)
+    ) if all_characters else []
+    
+    # Item counts and recent transaction counts, grouped per corporation.
+    # An exact per-corp COUNT over all history is a full scan of the largest
+    # table, so the page shows a 30-day count plus a whole-table estimate.
+    item_counts = dict(
+        HangarItem.objects.filter(is_active=True)
+        .values_list('corporation_id')
+        .annotate(count=Count('id'))
+    )
+    recent_cutoff = timezone.now() - timedelta(days=DIAGNOSTICS_TRANSACTION_DAYS)
+    transaction_counts = dict(
+        HangarTransaction.objects.filter(detected_at__gte=recent_cutoff)
+        .values_list('corporation_id')
+        .annotate(count=Count('id'))
+    )
     
     # Build diagnostic information
     diagnostics = []
     for corp in corporations:
-        # Check for valid characters
-        characters = EveCharacter.objects.filter(
-            corporation_id=corp.corporation_id
-        )
-        
-        # Check for valid tokens
-        required_scopes = app_settings.CORPINVENTORY_ESI_SCOPES
-        tokens = Token.objects.filter(
-            character_id__in=characters.values_list('character_id', flat=True)
-        ).require_scopes(required_scopes).require_valid()
-        
-        # Get item and transaction counts
-        item_count = HangarItem.objects.filter(
-            corporation=corp,
-            is_active=True
-        ).count()
-        
-        transaction_count = HangarTransaction.objects.filter(
-            corporation=corp
-        ).count()
-        
+        characters = corp_characters.get(corp.corporation_id, set())
+        token_count = sum(1 for character_id in token_characters if character_id in characters)
         diagnostics.append({
             'corporation': corp,
-            'character_count': characters.count(),
-            'token_count': tokens.count(),
-            'has_valid_token': tokens.exists(),
+            'character_count': len(characters),
+            'token_count': token_count,
+            'has_valid_token': token_count > 0,
             'last_sync': corp.last_sync,
             'tracking_enabled': corp.tracking_enabled,
-            'item_count': item_count,
-            'transaction_count': transaction_count,
+            'item_count': item_counts.get(corp.pk, 0),
+            'transaction_count': transaction_counts.get(corp.pk, 0),
         })
     
     # Get recent log entries from the logger
@@ -606,10 +1308,7 @@ def view_logs(request):
             if isinstance(handler, logging.handlers.RotatingFileHandler):
                 log_file = handler.baseFilename
                 if os.path.exists(log_file):
-                    with open(log_file, 'r') as f:
-                        lines = f.readlines()
-                        log_entries = lines[-100:]  # Last 100 lines
-                        log_entries.reverse()
+                    log_entries = tail_lines(log_file, 100)  # Last 100 lines
     except Exception as e:
         logger.warning(f"Could not read log file: {e}")
     
@@ -622,6 +1321,8 @@ def view_logs(request):
         'corporation_id': corporation_id,
         'required_scopes': app_settings.CORPINVENTORY_ESI_SCOPES,
         'log_entries': log_entries,
+        'transaction_days': DIAGNOSTICS_TRANSACTION_DAYS,
+        'transaction_estimate': estimated_row_count(HangarTransaction),
         'title': 'Sync Logs & Diagnostics',
     }
     
@@ -635,32 +1336,27 @@ def container_logs(request, corporation_id: int):
     Show container access logs for a corporation with character attribution.
     Displays who added/took/moved items to/from locked containers.
     """
-    corporation = get_object_or_404(Corporation, corporation_id=corporation_id)
-
-    # Build queryset — newest first
-    qs = ContainerLog.objects.filter(corporation=corporation).order_by("-logged_at")
+    corporation = get_object_or_404(Corporation, corporation_id=corporation_id, pending_delete=False)
 
     # Optional filters
     action_filter = request.GET.get("action", "")
     character_filter = request.GET.get("character", "").strip()
     type_filter = request.GET.get("item", "").strip()
 
-    if action_filter:
-        qs = qs.filter(action=action_filter)
-    if character_filter:
-        qs = qs.filter(character_name__icontains=character_filter)
-    if type_filter:
-        qs = qs.filter(type_name__icontains=type_filter)
+    qs = _filtered_container_logs(corporation, request.GET).select_related(
+        "type", "container_type"
+    )
 
-    # Paginate: up to 500 per page is fine for container logs
-    qs = qs[:500]
+    # Newest first, one keyset page at a time
+    page = keyset_paginate(qs, "logged_at", request.GET)
 
     # Unique action choices for filter dropdown
     action_choices = ContainerLog._meta.get_field("action").choices
 
     context = {
         "corporation": corporation,
-        "logs": qs,
+        "logs": page.object_list,
+        "page": page,
         "action_choices": action_choices,
         "selected_action": action_filter,
         "character_filter": character_filter,
@@ -668,3 +1364,24 @@ def container_logs(request, corporation_id: int):
         "title": f"Container Logs — {corporation.corporation_name}",
     }
     return render(request, "corp_inventory/container_logs.html", context)
+
+
+def _filtered_container_logs(corporation, params):
+    """
+    A corporation's container logs narrowed by the container log filters
+    (``action``, ``character`` and ``item`` GET parameters).
+    """
+    qs = ContainerLog.objects.filter(corporation=corporation)
+
+    action_filter = params.get("action", "")
+    character_filter = params.get("character", "").strip()
+    type_filter = params.get("item", "").strip()
+
+    if action_filter:
+        qs = qs.filter(action=action_filter)
+    search_backend = get_search_backend()
+    if character_filter:
+        qs = search_backend.filter(qs, character_filter, ["character_name"])
+    if type_filter:
+        qs = search_backend.filter(qs, type_filter, ["type__name"])
+    return qs